@@ -9,7 +9,7 @@
 //
 // Author: RZ
 // Start Date: 20250504
-// Version: 0.7
+// Version: 0.12
 //
 // Changelog
 // ============================================================
@@ -20,6 +20,11 @@
 // [20250505-1] RZ: Added comments and cleaned up code for readability.
 // [20250506-1] RZ: Finalized the module and cleaned up unused signals.
 // [20250507-1] RZ: Added header comments and cleaned up formatting. 
+// [20261018-1] RZ: Optional file-backed stimulus (FILE_STIMULUS) in place of the input ports.
+// [20261018-2] RZ: VCD dump skipped under Verilator.
+// [20261018-3] RZ: Dump only on +WAVES (VCD or FST), gated by dump_enable for windowed capture.
+// [20261018-4] RZ: All packet_invalid pins connected; trade_side is 1 bit like the decoder port (Verilator PINMISSING / WIDTH).
+// [20261018-5] RZ: Waveform comment names the Makefile's --trace / --trace-fst flags.
 // ============================================================
 
 
@@ -69,24 +74,46 @@ module integrated (
     logic [31:0] replace_shares;
     logic [31:0] replace_price;
 
+    logic        exec_packet_invalid;
     logic [63:0] exec_order_ref;
     logic [31:0] exec_shares;
     logic [63:0] exec_match_id;
     logic [47:0] exec_timestamp;
 
+    logic        trade_packet_invalid;
     logic [47:0] trade_timestamp;
     logic [63:0] trade_order_ref;
-    logic [7:0]  trade_side;
+    logic        trade_side;
     logic [31:0] trade_shares;
     logic [63:0] trade_match_id;
     logic [31:0] trade_price;
     logic [63:0] trade_stock_symbol;
 
+    // Decoder input stream: the ports, or the file-backed driver in simulation
+    logic        stream_valid;
+    logic [7:0]  stream_byte;
+
+    `ifdef FILE_STIMULUS
+    logic        stim_start;
+    logic        stim_done;
+
+    stream_stimulus u_stimulus (
+        .clk      (clk),
+        .start    (stim_start),
+        .valid_out(stream_valid),
+        .byte_out (stream_byte),
+        .done     (stim_done)
+    );
+    `else
+    assign stream_valid = valid_in;
+    assign stream_byte  = byte_in;
+    `endif
+
     add_order_decoder u_add (
         .clk(clk),
         .rst(rst),
-        .byte_in(byte_in),
-        .valid_in(valid_in),
+        .byte_in(stream_byte),
+        .valid_in(stream_valid),
         .add_internal_valid(add_internal_valid),
         .add_packet_invalid(add_packet_invalid),
         .add_order_ref(add_order_ref),
@@ -100,8 +127,8 @@ module integrated (
     cancel_order_decoder u_cancel (
         .clk(clk),
         .rst(rst),
-        .byte_in(byte_in),
-        .valid_in(valid_in),
+        .byte_in(stream_byte),
+        .valid_in(stream_valid),
         .cancel_internal_valid(cancel_internal_valid),
         .cancel_packet_invalid(cancel_packet_invalid),
         .cancel_order_ref(cancel_order_ref),
@@ -112,9 +139,10 @@ module integrated (
     delete_order_decoder u_delete_order_decoder (
         .clk                   (clk),
         .rst                   (rst),
-        .byte_in               (byte_in),
-        .valid_in              (valid_in),
+        .byte_in               (stream_byte),
+        .valid_in              (stream_valid),
         .delete_internal_valid(delete_internal_valid),
+        .delete_packet_invalid (delete_packet_invalid),
         .delete_parsed_type(delete_parsed_type),
         .delete_order_ref      (delete_order_ref)
     );
@@ -122,9 +150,10 @@ module integrated (
     replace_order_decoder u_replace_order_decoder (
         .clk                   (clk),
         .rst                   (rst),
-        .byte_in               (byte_in),
-        .valid_in              (valid_in),
+        .byte_in               (stream_byte),
+        .valid_in              (stream_valid),
         .replace_internal_valid(replace_internal_valid),
+        .replace_packet_invalid(replace_packet_invalid),
         .replace_old_order_ref (replace_old_order_ref),
         .replace_new_order_ref (replace_new_order_ref),
         .replace_shares        (replace_shares),
@@ -135,9 +164,10 @@ module integrated (
     executed_order_decoder u_executed_order_decoder (
         .clk                 (clk),
         .rst                 (rst),
-        .byte_in             (byte_in),
-        .valid_in            (valid_in),
+        .byte_in             (stream_byte),
+        .valid_in            (stream_valid),
         .exec_internal_valid (exec_internal_valid),
+        .exec_packet_invalid (exec_packet_invalid),
         .exec_order_ref      (exec_order_ref),
         .exec_shares         (exec_shares),
         .exec_match_id       (exec_match_id),
@@ -148,9 +178,10 @@ module integrated (
     trade_decoder u_trade_decoder (
         .clk                (clk),
         .rst                (rst),
-        .byte_in            (byte_in),
-        .valid_in           (valid_in),
+        .byte_in            (stream_byte),
+        .valid_in           (stream_valid),
         .trade_internal_valid (trade_internal_valid),
+        .trade_packet_invalid (trade_packet_invalid),
         .trade_timestamp    (trade_timestamp),
         .trade_order_ref    (trade_order_ref),
         .trade_side         (trade_side),
@@ -162,11 +193,34 @@ module integrated (
     );
 
     // ======================= Waveform Dump =======================
+    // Off unless +WAVES=vcd|fst. +WAVE_GATED starts with the dump off and lets the
+    // testbench switch it with dump_enable (helpers/wave_helper.py). Verilator
+    // traces the whole run from C++ instead (make WAVE=vcd|fst adds --trace /
+    // --trace-fst to COMPILE_ARGS)
     `ifdef COCOTB_SIM
+    `ifndef VERILATOR
+    logic dump_enable = 1'b0;
+    reg [8*8-1:0] wave_format;
+
     initial begin
-        $dumpfile("dump.vcd");
-        $dumpvars(0, integrated);
+        if ($value$plusargs("WAVES=%s", wave_format)) begin
+            if (wave_format == "fst")
+                $dumpfile("dump.fst");
+            else
+                $dumpfile("dump.vcd");
+            $dumpvars(0, integrated);
+            if ($test$plusargs("WAVE_GATED"))
+                $dumpoff;
+        end
+    end
+
+    always @(dump_enable) begin
+        if (dump_enable)
+            $dumpon;
+        else
+            $dumpoff;
     end
     `endif
+    `endif
 
 endmodule
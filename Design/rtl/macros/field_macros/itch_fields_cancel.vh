@@ -5,13 +5,16 @@
 // Description: Signal name indirection and reset assignment macro for Cancel Order decoder.
 // Author: RZ
 // Start Date: 20250505
-// Version: 0.1
+// Version: 0.2
 //
 // Changelog
 // =============================================
 // [20250505-1] RZ: Initial field mapping for cancel_order_decoder.
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: REDEFMACRO waived: the field names are redefined by every decoder on purpose.
 
+// Each decoder redefines the shared field names (REDEFMACRO is expected)
+/* verilator lint_off REDEFMACRO */
 `define internal_valid    cancel_internal_valid
 `define packet_invalid    cancel_packet_invalid
 `define order_ref         cancel_order_ref
@@ -25,3 +28,5 @@
     `packet_invalid    <= 0;     \
     `order_ref         <= 0;     \
     `canceled_shares   <= 0;
+
+/* verilator lint_on REDEFMACRO */
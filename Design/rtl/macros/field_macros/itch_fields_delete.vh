@@ -5,13 +5,16 @@
 // Description: Signal name indirection and reset assignment macro for Delete Order decoder.
 // Author: RZ
 // Start Date: 20250505
-// Version: 0.2
+// Version: 0.3
 //
 // Changelog
 // =============================================
 // [20250505-1] RZ: Initial field mapping for delete_order_decoder.
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: REDEFMACRO waived: the field names are redefined by every decoder on purpose.
 
+// Each decoder redefines the shared field names (REDEFMACRO is expected)
+/* verilator lint_off REDEFMACRO */
 `define internal_valid   delete_internal_valid
 `define packet_invalid   delete_packet_invalid
 `define parsed_type      delete_parsed_type
@@ -21,5 +24,7 @@
 `define ITCH_RESET_FIELDS        \
     `internal_valid <= 0;        \
     `packet_invalid <= 0;        \
-    `parsed_type    <= 0;        \ 
+    `parsed_type    <= 0;        \
     `order_ref      <= 0;
+
+/* verilator lint_on REDEFMACRO */
@@ -5,13 +5,16 @@
 // Description: Signal name indirection and reset assignment macro for Executed Order decoder.
 // Author: RZ
 // Start Date: 20250505
-// Version: 0.2
+// Version: 0.3
 //
 // Changelog
 // =============================================
 // [20250505-1] RZ: Initial field mapping for executed_order_decoder.
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: REDEFMACRO waived: the field names are redefined by every decoder on purpose.
 
+// Each decoder redefines the shared field names (REDEFMACRO is expected)
+/* verilator lint_off REDEFMACRO */
 `define internal_valid   exec_internal_valid
 `define packet_invalid   exec_packet_invalid
 `define parsed_type      exec_parsed_type
@@ -29,3 +32,5 @@
     `shares         <= 0;        \
     `match_id       <= 0;        \
     `timestamp      <= 0;
+
+/* verilator lint_on REDEFMACRO */
@@ -5,12 +5,15 @@
 // Description: Signal name indirection and reset assignment macro for Replace Order decoder.
 // Author: RZ
 // Start Date: 20250505
-// Version: 0.1
+// Version: 0.2
 //
 // Changelog
 // =============================================
 // [20250505-1] RZ: Initial field mapping for replace_order_decoder.
+// [20261018-1] RZ: REDEFMACRO waived: the field names are redefined by every decoder on purpose.
 
+// Each decoder redefines the shared field names (REDEFMACRO is expected)
+/* verilator lint_off REDEFMACRO */
 `define internal_valid    replace_internal_valid
 `define packet_invalid    replace_packet_invalid
 `define parsed_type       replace_parsed_type
@@ -28,3 +31,5 @@
     `new_order_ref     <= 0;       \
     `shares            <= 0;       \
     `price             <= 0;
+
+/* verilator lint_on REDEFMACRO */
@@ -5,13 +5,16 @@
 // Description: Signal name indirection and reset assignment macro for Trade decoder.
 // Author: RZ
 // Start Date: 20250505
-// Version: 0.2
+// Version: 0.3
 //
 // Changelog
 // =============================================
 // [20250505-1] RZ: Initial field mapping for trade_decoder.
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: REDEFMACRO waived: the field names are redefined by every decoder on purpose.
 
+// Each decoder redefines the shared field names (REDEFMACRO is expected)
+/* verilator lint_off REDEFMACRO */
 `define internal_valid    trade_internal_valid
 `define packet_invalid    trade_packet_invalid
 `define parsed_type       trade_parsed_type
@@ -35,3 +38,5 @@
     `stock_symbol      <= 0;         \
     `price             <= 0;         \
     `match_id          <= 0;
+
+/* verilator lint_on REDEFMACRO */
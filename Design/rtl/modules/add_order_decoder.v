@@ -6,7 +6,7 @@
 //              Begins decoding at byte 0 and maps order_ref from byte 1.
 // Author: RZ
 // Start Date: 20250430
-// Version: 0.8
+// Version: 0.9
 //
 // Changelog
 // =============================================
@@ -18,6 +18,7 @@
 // [20250502-1] RZ: Added self disable and zeroing of signals after message parsing completion.
 // [20250505-1] RZ: Updated to use macros
 // [20250506-1] RZ: Added parsed type output
+// [20261018-1] RZ: Indentation of the parsed_type assignment matches its (unconditional) scope; Verilator MISINDENT.
 // =============================================
 
 // ------------------------------------------------------------------------------------------------
@@ -110,7 +111,7 @@ module add_order_decoder (
 
                 if (byte_index == MSG_LENGTH - 1)
                     `internal_valid <= 1;
-                    `parsed_type    <= 4'd0; 
+                `parsed_type <= 4'd0;  // Every byte of the message, not only the last
                     
             end
 
@@ -5,7 +5,7 @@
 // Description: Module to decode Cancel Order ('X') messages from ITCH payloads.
 // Author: RZ
 // Start Date: 04172025
-// Version: 0.7
+// Version: 0.8
 // Changelog
 // =============================================
 // [20250427-1] RZ: Initial version created for Cancel Order payload decoding.
@@ -15,6 +15,7 @@
 // [20250502-1] RZ: Added self disable and zeroing of signals after message parsing completion.
 // [20250505-1] RZ: Updated to use macros
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: Indentation of the parsed_type assignment matches its (unconditional) scope; Verilator MISINDENT.
 // =============================================
 // ------------------------------------------------------------------------------------------------
 // Architecture Notes:
@@ -86,7 +87,7 @@ module cancel_order_decoder (
                 if (byte_index == MSG_LENGTH - 1)
                    
                     `internal_valid <= 1;
-                    `parsed_type    <= 4'd1;
+                `parsed_type <= 4'd1;  // Every byte of the message, not only the last
             end
 
             if (byte_index >= MSG_LENGTH && is_cancel_order)
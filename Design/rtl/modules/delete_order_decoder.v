@@ -6,7 +6,7 @@
 //              Parses 9-byte ITCH 'D' messages from a raw byte stream.
 // Author: RZ
 // Start Date: 04172025
-// Version: 0.6
+// Version: 0.7
 //
 // Changelog
 // =============================================
@@ -16,6 +16,7 @@
 // [20250502-1] RZ: Added self disable and zeroing of signals after message parsing completion.
 // [20250505-1] RZ: Updated to use macros
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: Indentation of the parsed_type assignment matches its (unconditional) scope; Verilator MISINDENT.
 // =============================================
 // ------------------------------------------------------------------------------------------------
 // Protocol Version Note:
@@ -104,7 +105,7 @@ module delete_order_decoder (
                 if (byte_index == MSG_LENGTH - 1)
               
                     `internal_valid <= 1;
-                    `parsed_type    <= 4'd2;
+                `parsed_type <= 4'd2;  // Every byte of the message, not only the last
             end
 
             if (byte_index >= MSG_LENGTH && is_delete_order)
@@ -7,7 +7,7 @@
 //
 // Author: RZ
 // Start Date: 20250501
-// Version: 0.5
+// Version: 0.6
 //
 // Changelog
 // =============================================
@@ -16,6 +16,7 @@
 // [20250504-1] RZ: Fixed timestamp width to 48-bit and corrected field byte ranges.
 // [20250505-1] RZ: Updated to use macros
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: Indentation of the parsed_type assignment matches its (unconditional) scope; Verilator MISINDENT.
 // =============================================
 
 // ------------------------------------------------------------------------------------------------
@@ -114,7 +115,7 @@ module executed_order_decoder (
                 if (byte_index == MSG_LENGTH - 1)
                
                     `internal_valid <= 1;
-                    `parsed_type    <= 4'd3;
+                `parsed_type <= 4'd3;  // Every byte of the message, not only the last
             end
 
             if (byte_index >= MSG_LENGTH && is_exec_order)
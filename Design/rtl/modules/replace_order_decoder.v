@@ -7,7 +7,7 @@
 //
 // Author: RZ
 // Start Date: 20250428
-// Version: 0.6
+// Version: 0.7
 //
 // Changelog
 // =============================================
@@ -17,6 +17,7 @@
 // [20250502-1] RZ: Added self disable and zeroing of signals after message parsing completion.
 // [20250505-1] RZ: Updated to use macros
 // [20250506-1] RZ: Added parsed type
+// [20261018-1] RZ: Indentation of the parsed_type assignment matches its (unconditional) scope; Verilator MISINDENT.
 // =============================================
 
 // ------------------------------------------------------------------------------------------------
@@ -117,7 +118,7 @@ module replace_order_decoder (
                 if (byte_index == MSG_LENGTH - 1)
                     
                     `internal_valid <= 1;
-                    `parsed_type    <= 4'd4;
+                `parsed_type <= 4'd4;  // Every byte of the message, not only the last
             end
 
             if (byte_index >= MSG_LENGTH && is_replace_order)
@@ -7,7 +7,7 @@
 //
 // Author: RZ
 // Start Date: 20250501
-// Version: 0.4
+// Version: 0.5
 //
 // Changelog
 // =============================================
@@ -15,6 +15,7 @@
 // [20250501-2] RZ: Added self disable and zeroing of signals after message parsing completion.
 // [20250502-1] RZ: Updated msg structure
 // [20250505-1] RZ: Updated to use macros
+// [20261018-1] RZ: Indentation of the parsed_type assignment matches its (unconditional) scope; Verilator MISINDENT.
 // =============================================
 // ------------------------------------------------------------------------------------------------
 // Protocol Version Note:
@@ -140,7 +141,7 @@ module trade_decoder (
 
                 if (byte_index == MSG_LENGTH - 1)
                     `internal_valid <= 1;
-                    `parsed_type    <= 4'd5;
+                `parsed_type <= 4'd5;  // Every byte of the message, not only the last
                     
             end
 
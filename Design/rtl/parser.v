@@ -8,7 +8,7 @@
 //
 // Author: RZ
 // Start Date: 20250507
-// Version: 0.4
+// Version: 0.5
 //
 // Changelog
 // ============================================================
@@ -16,6 +16,7 @@
 // [20250507-2] RZ: Added one-hot valid check for decoder outputs.
 // [20250507-3] RZ: Added output selection logic for parsed fields.
 // [20250507-4] RZ: Added comments and cleaned up code formatting.
+// [20261018-1] RZ: Unused decoder outputs left open explicitly; 48-bit timestamp default (Verilator PINMISSING / WIDTH).
 // ============================================================
 
 
@@ -61,9 +62,11 @@ module parser (
     // ==========================
     // Decoder instantiations
     // ==========================
+    // packet_invalid and the trade symbol are not used by the parser (left open explicitly)
     add_order_decoder add_dec (
         .clk(clk), .rst(rst), .byte_in(byte_in), .valid_in(valid_in),
         .add_internal_valid(add_internal_valid),
+        .add_packet_invalid(),
         .add_parsed_type(add_parsed_type),
         .add_order_ref(add_order_ref),
         .add_side(add_side),
@@ -75,6 +78,7 @@ module parser (
     cancel_order_decoder cancel_dec (
         .clk(clk), .rst(rst), .byte_in(byte_in), .valid_in(valid_in),
         .cancel_internal_valid(cancel_internal_valid),
+        .cancel_packet_invalid(),
         .cancel_parsed_type(cancel_parsed_type),
         .cancel_order_ref(cancel_order_ref),
         .cancel_canceled_shares(cancel_canceled_shares)
@@ -83,6 +87,7 @@ module parser (
     delete_order_decoder delete_dec (
         .clk(clk), .rst(rst), .byte_in(byte_in), .valid_in(valid_in),
         .delete_internal_valid(delete_internal_valid),
+        .delete_packet_invalid(),
         .delete_parsed_type(delete_parsed_type),
         .delete_order_ref(delete_order_ref)
     );
@@ -90,6 +95,7 @@ module parser (
     replace_order_decoder replace_dec (
         .clk(clk), .rst(rst), .byte_in(byte_in), .valid_in(valid_in),
         .replace_internal_valid(replace_internal_valid),
+        .replace_packet_invalid(),
         .replace_parsed_type(replace_parsed_type),
         .replace_old_order_ref(replace_old_order_ref),
         .replace_new_order_ref(replace_new_order_ref),
@@ -100,6 +106,7 @@ module parser (
     executed_order_decoder exec_dec (
         .clk(clk), .rst(rst), .byte_in(byte_in), .valid_in(valid_in),
         .exec_internal_valid(exec_internal_valid),
+        .exec_packet_invalid(),
         .exec_parsed_type(exec_parsed_type),
         .exec_order_ref(exec_order_ref),
         .exec_shares(exec_shares),
@@ -110,13 +117,15 @@ module parser (
     trade_decoder trade_dec (
         .clk(clk), .rst(rst), .byte_in(byte_in), .valid_in(valid_in),
         .trade_internal_valid(trade_internal_valid),
+        .trade_packet_invalid(),
         .trade_parsed_type(trade_parsed_type),
         .trade_order_ref(trade_order_ref),
         .trade_side(trade_side),
         .trade_shares(trade_shares),
         .trade_price(trade_price),
         .trade_match_id(trade_match_id),
-        .trade_timestamp(trade_timestamp)
+        .trade_timestamp(trade_timestamp),
+        .trade_stock_symbol()
     );
 
     // ==========================
@@ -179,7 +188,7 @@ module parser (
 
     assign timestamp =
         exec_internal_valid    ? exec_timestamp    :
-        trade_internal_valid   ? trade_timestamp   : 32'd0;
+        trade_internal_valid   ? trade_timestamp   : 48'd0;
 
     assign misc_data =
         add_internal_valid     ? add_stock_symbol      :
@@ -0,0 +1,69 @@
+// ============================================================
+// stream_stimulus.v
+// ============================================================
+//
+// Description: Simulation-only stimulus block that streams a prepared workload
+//              file into `byte_in` + `valid_in`, one record per clock, so the
+//              testbench does not round-trip through Python for every byte.
+//              File format: 2 bytes per cycle, {flags, data}; flags[0] = valid.
+//              Path from the +STIM_FILE=<path> plusarg, default stimulus.bin.
+//
+// Author: RZ
+// Start Date: 20261018
+// Version: 0.2
+//
+// Changelog
+// ============================================================
+// [20261018-1] RZ: File-backed byte/valid driver started by `start`, reports `done`.
+// [20261018-2] RZ: Verilator INITIALDLY waived for the intended NBAs of the initial block.
+// ============================================================
+
+
+module stream_stimulus (
+    input  logic        clk,
+    input  logic        start,      // Set by the testbench once the file is written
+
+    output logic        valid_out,
+    output logic [7:0]  byte_out,
+    output logic        done        // High after the last record has been clocked
+);
+
+    integer fd;
+    integer flags;
+    integer data;
+    reg [8*256-1:0] stim_path;
+
+    // NBAs in this initial block are intended (record timing above)
+    /* verilator lint_off INITIALDLY */
+    initial begin
+        valid_out = 1'b0;
+        byte_out  = 8'h00;
+        done      = 1'b0;
+        if (!$value$plusargs("STIM_FILE=%s", stim_path))
+            stim_path = "stimulus.bin";
+
+        wait (start === 1'b1);
+        fd = $fopen(stim_path, "rb");
+        if (fd == 0) begin
+            $display("stream_stimulus: cannot open %0s", stim_path);
+            $finish;
+        end
+
+        // Records are applied with NBAs right after an edge, like cocotb writes,
+        // so record i is sampled on the i-th edge after `start`
+        flags = $fgetc(fd);
+        while (flags != -1) begin
+            data = $fgetc(fd);
+            valid_out <= flags[0];
+            byte_out  <= data[7:0];
+            @(posedge clk);
+            flags = $fgetc(fd);
+        end
+        $fclose(fd);
+
+        valid_out <= 1'b0;
+        done      <= 1'b1;
+    end
+    /* verilator lint_on INITIALDLY */
+
+endmodule
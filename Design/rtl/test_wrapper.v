@@ -8,7 +8,7 @@
 //
 // Author: RZ
 // Start Date: 20250507
-// Version: 0.4
+// Version: 0.8
 //
 // Changelog
 // ============================================================
@@ -16,6 +16,10 @@
 // [20250507-2] RZ: Added latch stage to capture output signals for inspection.
 // [20250507-3] RZ: Added waveform dump functionality for simulation inspection.
 // [20250507-4] RZ: Added comments for clarity and maintainability.
+// [20261018-1] RZ: Optional file-backed stimulus (FILE_STIMULUS) driving byte_in/valid_in.
+// [20261018-2] RZ: VCD dump skipped under Verilator.
+// [20261018-3] RZ: Dump only on +WAVES (VCD or FST), gated by dump_enable for windowed capture.
+// [20261018-4] RZ: Waveform comment names the Makefile's --trace / --trace-fst flags.
 // ============================================================
 
 
@@ -49,6 +53,20 @@ module test_wrapper;
     logic [47:0] latched_timestamp;
     logic [63:0] latched_misc_data;
 
+    // ======================= File Stimulus =======================
+    `ifdef FILE_STIMULUS
+    logic        stim_start;
+    logic        stim_done;
+
+    stream_stimulus stimulus (
+        .clk(clk),
+        .start(stim_start),
+        .valid_out(valid_in),
+        .byte_out(byte_in),
+        .done(stim_done)
+    );
+    `endif
+
     // DUT instantiation
     parser dut (
         .clk(clk),
@@ -91,10 +109,33 @@ module test_wrapper;
     );
 
     // ======================= Waveform Dump =======================
+    // Off unless +WAVES=vcd|fst. +WAVE_GATED starts with the dump off and lets the
+    // testbench switch it with dump_enable (helpers/wave_helper.py). Verilator
+    // traces the whole run from C++ instead (make WAVE=vcd|fst adds --trace /
+    // --trace-fst to COMPILE_ARGS)
     `ifdef COCOTB_SIM
+    `ifndef VERILATOR
+    logic dump_enable = 1'b0;
+    reg [8*8-1:0] wave_format;
+
     initial begin
-        $dumpfile("dump.vcd");
-        $dumpvars(0, test_wrapper);
+        if ($value$plusargs("WAVES=%s", wave_format)) begin
+            if (wave_format == "fst")
+                $dumpfile("dump.fst");
+            else
+                $dumpfile("dump.vcd");
+            $dumpvars(0, test_wrapper);
+            if ($test$plusargs("WAVE_GATED"))
+                $dumpoff;
+        end
+    end
+
+    always @(dump_enable) begin
+        if (dump_enable)
+            $dumpon;
+        else
+            $dumpoff;
     end
     `endif
+    `endif
 endmodule
@@ -5,15 +5,190 @@
 # Description: Centralized configuration for ITCH message format and type lengths.
 #              Used by both payload generators and validators.
 #              Supports speculative parsing via static message length lookup.
+#              ITCH_MESSAGES holds the per-type field layout table.
 # Author: RZ
 # Start Date: 20250505
+import struct
+
+# Wire layout of every supported message type; the single source for the payload
+# encoders, the expected-event builders, the recorder signal maps and the reference model.
+#
+#   type_byte:   ITCH message type character
+#   parsed_type: parsed_type code driven by the decoder / parser.v
+#   prefix:      RTL signal prefix (<prefix>_internal_valid, <prefix>_parsed_type)
+#   fields:      (name, offset, width, kind, RTL signal, SIM_HEADERS column, PARSER_HEADERS column)
+#
+# Field kinds:
+#   uint  - big-endian unsigned integer
+#   side  - 'B'/'S' ASCII byte, decoded to the RTL flag (1 for 'S')
+#   alpha - space-padded ASCII, decoded as a big-endian integer like the RTL register
+#   pad   - reserved bytes, zero on the wire and not decoded
+ITCH_MESSAGES = {
+    "add": {
+        "type_byte": ord('A'), "parsed_type": 0, "prefix": "add",
+        "fields": (
+            ("msg_type",       0,  1, "uint",  None,                     None,                    None),
+            ("order_ref",      1,  8, "uint",  "add_order_ref",          "add_order_ref",         "order_ref"),
+            ("side",           9,  1, "side",  "add_side",               "add_side",              "side"),
+            ("shares",        10,  4, "uint",  "add_shares",             "add_shares",            "shares"),
+            ("symbol",        14,  8, "alpha", "add_stock_symbol",       None,                    "misc_data"),
+            ("price",         22,  4, "uint",  "add_price",              "add_price",             "price"),
+            ("padding",       26, 10, "pad",   None,                     None,                    None),
+        ),
+    },
+    "cancel": {
+        "type_byte": ord('X'), "parsed_type": 1, "prefix": "cancel",
+        "fields": (
+            ("msg_type",       0,  1, "uint",  None,                     None,                    None),
+            ("order_ref",      1,  8, "uint",  "cancel_order_ref",       "cancel_order_ref",      "order_ref"),
+            ("shares",         9,  4, "uint",  "cancel_canceled_shares", "cancel_shares",         "shares"),
+            ("padding",       13, 10, "pad",   None,                     None,                    None),
+        ),
+    },
+    "replace": {
+        "type_byte": ord('U'), "parsed_type": 4, "prefix": "replace",
+        "fields": (
+            ("msg_type",       0,  1, "uint",  None,                     None,                    None),
+            ("old_order_ref",  1,  8, "uint",  "replace_old_order_ref",  "replace_old_order_ref", "misc_data"),
+            ("new_order_ref",  9,  8, "uint",  "replace_new_order_ref",  "replace_new_order_ref", "new_order_ref"),
+            ("shares",        17,  4, "uint",  "replace_shares",         "replace_shares",        "shares"),
+            ("price",         21,  4, "uint",  "replace_price",          "replace_price",         "price"),
+            ("reserved",      25,  2, "pad",   None,                     None,                    None),
+        ),
+    },
+    "delete": {
+        "type_byte": ord('D'), "parsed_type": 2, "prefix": "delete",
+        "fields": (
+            ("msg_type",       0,  1, "uint",  None,                     None,                    None),
+            ("order_ref",      1,  8, "uint",  "delete_order_ref",       "delete_order_ref",      "order_ref"),
+        ),
+    },
+    "executed": {
+        "type_byte": ord('E'), "parsed_type": 3, "prefix": "exec",
+        "fields": (
+            ("msg_type",       0,  1, "uint",  None,                     None,                    None),
+            ("timestamp",      1,  6, "uint",  "exec_timestamp",         "exec_timestamp",        "timestamp"),
+            ("order_ref",      7,  8, "uint",  "exec_order_ref",         "exec_order_ref",        "order_ref"),
+            ("shares",        15,  4, "uint",  "exec_shares",            "exec_shares",           "shares"),
+            ("match_id",      19,  8, "uint",  "exec_match_id",          "exec_match_id",         "misc_data"),
+            ("reserved",      27,  3, "pad",   None,                     None,                    None),
+        ),
+    },
+    "trade": {
+        "type_byte": ord('P'), "parsed_type": 5, "prefix": "trade",
+        "fields": (
+            ("msg_type",       0,  1, "uint",  None,                     None,                    None),
+            ("timestamp",      1,  6, "uint",  "trade_timestamp",        "trade_timestamp",       "timestamp"),
+            ("order_ref",      7,  8, "uint",  "trade_order_ref",        "trade_order_ref",       "order_ref"),
+            ("side",          15,  1, "side",  "trade_side",             "trade_side",            "side"),
+            ("shares",        16,  4, "uint",  "trade_shares",           "trade_shares",          "shares"),
+            ("symbol",        20,  8, "alpha", "trade_stock_symbol",     "trade_stock_symbol",    None),
+            ("price",         28,  4, "uint",  "trade_price",            "trade_price",           "price"),
+            ("match_id",      32,  8, "uint",  "trade_match_id",         "trade_match_id",        "misc_data"),
+        ),
+    },
+}
+
+# NASDAQ TotalView-ITCH 5.0 wire layouts of the message types the DUT decodes, used to
+# translate real captures (helpers/itch_replay_helper.py). Field names match ITCH_MESSAGES
+# wherever the value maps onto a DUT field.
+#   (name, offset, width)
+ITCH50_MESSAGES = {
+    "add": {
+        "type_byte": ord('A'),
+        "fields": (
+            ("msg_type",         0, 1),
+            ("stock_locate",     1, 2),
+            ("tracking_number",  3, 2),
+            ("timestamp",        5, 6),
+            ("order_ref",       11, 8),
+            ("side",            19, 1),
+            ("shares",          20, 4),
+            ("symbol",          24, 8),
+            ("price",           32, 4),
+        ),
+    },
+    "cancel": {
+        "type_byte": ord('X'),
+        "fields": (
+            ("msg_type",         0, 1),
+            ("stock_locate",     1, 2),
+            ("tracking_number",  3, 2),
+            ("timestamp",        5, 6),
+            ("order_ref",       11, 8),
+            ("shares",          19, 4),
+        ),
+    },
+    "replace": {
+        "type_byte": ord('U'),
+        "fields": (
+            ("msg_type",         0, 1),
+            ("stock_locate",     1, 2),
+            ("tracking_number",  3, 2),
+            ("timestamp",        5, 6),
+            ("old_order_ref",   11, 8),
+            ("new_order_ref",   19, 8),
+            ("shares",          27, 4),
+            ("price",           31, 4),
+        ),
+    },
+    "delete": {
+        "type_byte": ord('D'),
+        "fields": (
+            ("msg_type",         0, 1),
+            ("stock_locate",     1, 2),
+            ("tracking_number",  3, 2),
+            ("timestamp",        5, 6),
+            ("order_ref",       11, 8),
+        ),
+    },
+    "executed": {
+        "type_byte": ord('E'),
+        "fields": (
+            ("msg_type",         0, 1),
+            ("stock_locate",     1, 2),
+            ("tracking_number",  3, 2),
+            ("timestamp",        5, 6),
+            ("order_ref",       11, 8),
+            ("shares",          19, 4),
+            ("match_id",        23, 8),
+        ),
+    },
+    "trade": {
+        "type_byte": ord('P'),
+        "fields": (
+            ("msg_type",         0, 1),
+            ("stock_locate",     1, 2),
+            ("tracking_number",  3, 2),
+            ("timestamp",        5, 6),
+            ("order_ref",       11, 8),
+            ("side",            19, 1),
+            ("shares",          20, 4),
+            ("symbol",          24, 8),
+            ("price",           32, 4),
+            ("match_id",        36, 8),
+        ),
+    },
+}
+
 MSG_LENGTHS = {
-    "add": 36,
-    "cancel": 23,
-    "replace": 27,
-    "delete": 9,
-    "executed": 30,
-    "trade": 40
+    msg_type: sum(field[2] for field in spec["fields"]) for msg_type, spec in ITCH_MESSAGES.items()
+}
+
+# Precompiled big-endian struct per message type (6-byte integers unpack as raw bytes)
+_STRUCT_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+def _struct_code(width, kind):
+    if kind == "uint" and width in _STRUCT_CODES:
+        return _STRUCT_CODES[width]
+    if kind == "side":
+        return "B"
+    return f"{width}s"
+
+MSG_STRUCTS = {
+    msg_type: struct.Struct(">" + "".join(_struct_code(width, kind)
+                                          for _, _, width, kind, *_ in spec["fields"]))
+    for msg_type, spec in ITCH_MESSAGES.items()
 }
 
 
@@ -75,6 +250,7 @@ PARSER_HEADERS = [
     "side",
     "shares",
     "price",
+    "new_order_ref",
     "timestamp",
     "misc_data"
 ]
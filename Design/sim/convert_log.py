@@ -0,0 +1,41 @@
+# ============================================================
+# convert_log.py
+# ============================================================
+#
+# Description: Converts a binary recorded log (RECORD_STREAM=bin, written by
+#              helpers/log_writer_helper.py) into the CSV layout of a normal
+#              run, for diffing or spreadsheet use.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Binary column log to CSV converter.
+# ============================================================
+#
+# Usage:
+#   python3 convert_log.py parser_recorded_log.bin
+#   python3 convert_log.py regression/seed0001_shard000/recorded_log.bin -o shard0.csv
+
+import argparse
+import os
+import sys
+
+from helpers.log_writer_helper import binary_log_to_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a binary recorded log to CSV.")
+    parser.add_argument("log", help="binary log (.bin)")
+    parser.add_argument("-o", "--out", help="CSV output (default: the log's name with .csv)")
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.splitext(args.log)[0] + ".csv"
+    rows = binary_log_to_csv(args.log, out)
+    print(f"{args.log}: {rows} rows -> {out} ({os.path.getsize(args.log)} -> {os.path.getsize(out)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# ============================================================
+# benchmark_helper.py
+# ============================================================
+#
+# Description: Measurements for the protocol-level benchmark suite.
+#              Attributes recorded parsed_valid cycles to the injected messages
+#              to get first-byte-to-parsed_valid latency per message type, and
+#              collects sustained throughput, simulation speed and peak RSS
+#              into one JSON-serializable record per benchmark point.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Latency attribution, throughput/speed/RSS benchmark record.
+# ============================================================
+
+import json
+import resource
+import sys
+
+import numpy as np
+
+from sim_config import LATENCY_WINDOW
+from ITCH_config import ITCH_MESSAGES
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MiB. Under cocotb this is the
+    simulator process with the embedded Python interpreter.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def measure_latencies(schedule, columns, window=LATENCY_WINDOW):
+    """
+    Matches every scheduled message to the first parsed_valid of its type
+    within `window` cycles of its expected valid cycle.
+
+    Args:
+        schedule: Injection schedule ('type', 'payload', 'expected_valid_cycle').
+        columns: Recorded parser columns (recorder_parser.get_recorded_columns()),
+                 at least 'cycle', 'parsed_valid' and 'parsed_type'.
+        window (int): Attribution window in cycles.
+
+    Returns:
+        Dict[msg_type, np.ndarray] of latencies in cycles, from the edge that
+        clocks in the type byte to the cycle parsed_valid is recorded high,
+        plus Dict[msg_type, int] of messages without a parsed_valid.
+    """
+    cycles = np.asarray(columns["cycle"], dtype=np.int64)
+    valid = np.asarray(columns["parsed_valid"], dtype=np.int64) == 1
+    event_cycles = cycles[valid]
+    event_types = np.asarray(columns["parsed_type"], dtype=np.int64)[valid]
+
+    latencies = {}
+    dropped = {}
+    for msg_type, spec in ITCH_MESSAGES.items():
+        mine = [(event["expected_valid_cycle"], len(event["payload"])) for event in schedule
+                if event["type"] == msg_type]
+        if not mine:
+            continue
+        earliest, lengths = np.array(mine, dtype=np.int64).T
+        first_byte = earliest - lengths
+
+        candidates = event_cycles[event_types == spec["parsed_type"]]
+        idx = np.searchsorted(candidates, earliest)
+        hit = idx < len(candidates)
+        hit[hit] = candidates[idx[hit]] <= earliest[hit] + window
+
+        latencies[msg_type] = candidates[idx[hit]] - first_byte[hit]
+        dropped[msg_type] = int(len(mine) - hit.sum())
+    return latencies, dropped
+
+
+def summarize_latencies(latencies):
+    """
+    Returns count/min/mean/p50/p99/max of a latency array (None fields if empty).
+    """
+    if len(latencies) == 0:
+        return {"count": 0, "min": None, "mean": None, "p50": None, "p99": None, "max": None}
+    return {
+        "count": int(len(latencies)),
+        "min": int(latencies.min()),
+        "mean": float(latencies.mean()),
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": int(latencies.max()),
+    }
+
+
+def build_benchmark_record(mix, schedule, columns, injected_bytes, injected_cycles,
+                           sim_cycles, wall_s, window=LATENCY_WINDOW):
+    """
+    Builds the JSON record of one benchmark point.
+
+    Args:
+        mix (str): Message mix name (BENCH_MIXES key).
+        schedule: Injection schedule of the run.
+        columns: Recorded parser columns.
+        injected_bytes (int): Payload bytes injected.
+        injected_cycles (int): Cycles spent injecting (bytes plus gaps).
+        sim_cycles (int): Simulated cycles from injection start to end of drain.
+        wall_s (float): Wall-clock seconds for the same span.
+
+    Returns:
+        Dict with latency per type, throughput, speed and memory figures.
+    """
+    latencies, dropped = measure_latencies(schedule, columns, window)
+    all_latencies = np.concatenate(list(latencies.values())) if latencies else np.array([], dtype=np.int64)
+    delivered = int(len(all_latencies))
+
+    return {
+        "mix": mix,
+        "messages": len(schedule),
+        "bytes": injected_bytes,
+        "injected_cycles": injected_cycles,
+        "latency_cycles": {
+            **{msg_type: summarize_latencies(values) for msg_type, values in latencies.items()},
+            "all": summarize_latencies(all_latencies),
+        },
+        "delivered_messages": delivered,
+        "dropped_messages": dropped,
+        "offered_messages_per_cycle": len(schedule) / injected_cycles if injected_cycles else 0.0,
+        "sustained_messages_per_cycle": delivered / injected_cycles if injected_cycles else 0.0,
+        "sim_cycles": sim_cycles,
+        "wall_s": wall_s,
+        "cycles_per_second": sim_cycles / wall_s if wall_s else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def format_benchmark_record(record):
+    lines = [
+        f"Benchmark {record['mix']}: {record['messages']} messages, {record['bytes']} bytes, "
+        f"{record['sim_cycles']} cycles in {record['wall_s']:.2f} s "
+        f"({record['cycles_per_second']:.0f} cycles/s, peak RSS {record['peak_rss_mb']:.0f} MiB)",
+        f"  sustained {record['sustained_messages_per_cycle']:.4f} of "
+        f"{record['offered_messages_per_cycle']:.4f} messages/cycle offered",
+    ]
+    for msg_type, stats in record["latency_cycles"].items():
+        if stats["count"]:
+            lines.append(f"  {msg_type:<10} latency min {stats['min']} / mean {stats['mean']:.1f} / "
+                         f"p99 {stats['p99']:.0f} / max {stats['max']} cycles over {stats['count']}")
+    return "\n".join(lines)
+
+
+def write_benchmark_record(record, path):
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
@@ -7,43 +7,381 @@
 #              Supports CSV logging, mismatch reporting, and validation.
 # Author: RZ
 # Start Date: 20250505
-# Version: 0.2
+# Version: 0.12
 #
 # Changelog
 # ============================================================
 # [20250505-1] RZ: Initial implementation for benchmark signal matching.
 # [20250506-1] RZ: Added support for parser mode and unified key generation.
+# [20261018-1] RZ: Vectorized integer scoreboard with full mismatch report and extra-valid check.
+# [20261018-2] RZ: Expected rows built from the ITCH_MESSAGES layout table (layout_helper.py).
+# [20261018-3] RZ: write_mismatch_report() for merging sharded regression results.
+# [20261018-4] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# [20261018-5] RZ: build_mismatch_report() accepts columnar expectations (software decoder).
+# [20261018-6] RZ: Header fallback for empty expectations follows the recorded layout.
+# [20261018-7] RZ: expected_to_columns() / concat_expected_columns() for columnar expected events.
+# [20261018-8] RZ: expected_to_columns() passes columnar events (workload cache) through.
+# [20261018-9] RZ: build_windowed_mismatch_report(): batched logs compared cycle window by window.
+# [20261018-10] RZ: Dropped the unused SIM_CLK_PERIOD_NS import.
 # ============================================================
 
+import json
+
+import numpy as np
+
 from helpers.payload_generator_helper import (
     generate_add_order_payload, generate_cancel_order_payload, 
     generate_delete_order_payload, generate_replace_order_payload, 
     generate_executed_order_payload, generate_trade_payload)
 from helpers.full_workload_helper import MSG_LENGTHS
-from sim_config import RESET_CYCLES, SIM_CLK_PERIOD_NS
-from ITCH_config import SIM_HEADERS
+from helpers.layout_helper import build_expected_row
+from helpers.profile_helper import profiled
+from sim_config import RESET_CYCLES
+from ITCH_config import SIM_HEADERS, PARSER_HEADERS, ITCH_MESSAGES
 
-def compare_against_expected(recorded_log, expected_events):
+# Valid column -> message type, for the integrated (SIM_HEADERS) layout
+_VALID_TYPES = {f"{msg_type}_internal_valid": msg_type for msg_type in ITCH_MESSAGES}
+
+# parsed_type code -> message type, for the parser (PARSER_HEADERS) layout
+_PARSED_TYPES = {spec["parsed_type"]: msg_type for msg_type, spec in ITCH_MESSAGES.items()}
+
+_PAYLOAD_GENERATORS = {
+    "add":      generate_add_order_payload,
+    "cancel":   generate_cancel_order_payload,
+    "delete":   generate_delete_order_payload,
+    "replace":  generate_replace_order_payload,
+    "executed": generate_executed_order_payload,
+    "trade":    generate_trade_payload,
+}
+
+
+def _rows_to_columns(rows, headers):
     """
-    Compares the actual signal log vs expected events, field by field.
+    Converts row dicts (hex strings / ints / blanks) into integer columns.
+
+    Returns:
+        (cycles, {header: (values uint64, present bool)})
+    """
+    cycles = np.array([row["cycle"] for row in rows], dtype=np.int64)
+    columns = {}
+    for key in headers:
+        if key == "cycle":
+            continue
+        raw = [row.get(key, "") for row in rows]
+        present = np.array([value != "" for value in raw], dtype=bool)
+        values = np.array([int(value, 16) if isinstance(value, str) else int(value)
+                           for value in raw if value != ""], dtype=np.uint64)
+        full = np.zeros(len(raw), dtype=np.uint64)
+        full[present] = values
+        columns[key] = (full, present)
+    return cycles, columns
+
+
+def valid_headers(headers):
+    """
+    The valid flag columns of a layout: parsed_valid, or the *_internal_valid
+    of every decoder.
+    """
+    return ["parsed_valid"] if "parsed_valid" in headers else [key for key in headers if key in _VALID_TYPES]
+
+
+def expected_to_columns(events, headers):
     """
-    for expected in expected_events:
-        cycle = expected["cycle"]
-        actual = recorded_log.get(cycle, {})
+    Converts a chunk of expected rows into the columnar layout
+    build_mismatch_report() accepts, so long runs keep integer arrays instead
+    of row dicts of hex strings. Events that are already columnar (cached
+    workloads, software decoder) are returned as they are.
 
-        for key in SIM_HEADERS:
+    Returns:
+        {'cycle': np.ndarray[int64], header: (values uint64, present bool)}
+    """
+    if isinstance(events, dict):
+        return events
+    cycles, columns = _rows_to_columns(events, headers)
+    return {"cycle": cycles, **columns}
+
+
+def concat_expected_columns(parts, headers):
+    """
+    Joins per-chunk expected_to_columns() results (in cycle order).
+    """
+    if not parts:
+        return expected_to_columns([], headers)
+    columns = {"cycle": np.concatenate([part["cycle"] for part in parts])}
+    for key in headers:
+        if key != "cycle":
+            columns[key] = (np.concatenate([part[key][0] for part in parts]),
+                            np.concatenate([part[key][1] for part in parts]))
+    return columns
+
+
+def _recorded_to_columns(recorded, headers):
+    """
+    Accepts either a {cycle: row} log or raw integer columns
+    (recorder.get_recorded_columns()) and returns sorted integer columns.
+    """
+    if "cycle" in recorded:
+        cycles = np.frombuffer(recorded["cycle"], dtype=np.uint64).astype(np.int64)
+        columns = {}
+        for key in headers:
             if key == "cycle":
-                continue  # Skip cycle field
+                continue
+            if key in recorded:
+                columns[key] = (np.frombuffer(recorded[key], dtype=np.uint64),
+                                np.ones(len(cycles), dtype=bool))
+            else:
+                columns[key] = (np.zeros(len(cycles), dtype=np.uint64),
+                                np.zeros(len(cycles), dtype=bool))
+    else:
+        cycles, columns = _rows_to_columns([recorded[cycle] for cycle in recorded], headers)
+
+    order = np.argsort(cycles, kind="stable")
+    return cycles[order], {key: (vals[order], present[order]) for key, (vals, present) in columns.items()}
+
+
+def _event_types(headers, columns):
+    """
+    Message type of every row, taken from the asserted valid (integrated layout)
+    or from parsed_type (parser layout).
+    """
+    n = len(next(iter(columns.values()))[0]) if columns else 0
+    types = np.full(n, "unknown", dtype=object)
+    if "parsed_type" in columns:
+        values, present = columns["parsed_type"]
+        for code, msg_type in _PARSED_TYPES.items():
+            types[present & (values == code)] = msg_type
+    else:
+        for key, msg_type in _VALID_TYPES.items():
+            if key in columns:
+                values, present = columns[key]
+                types[present & (values == 1)] = msg_type
+    return types
+
+
+@profiled("compare")
+def build_mismatch_report(recorded, expected_events, headers=None, max_examples=10,
+                          check_unexpected=True):
+    """
+    Scoreboards a whole run at once instead of stopping at the first mismatch.
+    Recorded and expected columns are aligned by cycle and compared as integers.
+
+    Args:
+        recorded: {cycle: row} log or raw integer columns from a recorder.
+        expected_events: List[Dict] from any generate_expected_events_* function,
+                         or columns {'cycle': array, header: (values, present)}
+                         from software_decoder_helper.decoded_expected_columns().
+        headers: Column layout; defaults to the keys of the expected rows
+                 (to the recorded layout when nothing is expected).
+        max_examples: Number of example mismatches kept per category.
+        check_unexpected: Also flag recorded valids that no expected event accounts for.
+
+    Returns:
+        Dict with pass/fail, counts per field and per message type, and examples.
+    """
+    if headers is None:
+        if isinstance(expected_events, dict):
+            headers = list(expected_events.keys())
+        elif expected_events:
+            headers = list(expected_events[0].keys())
+        else:
+            # Nothing expected: the recording tells the layout
+            sample = recorded if "cycle" in recorded else next(iter(recorded.values()), {})
+            headers = PARSER_HEADERS if "parsed_valid" in sample else SIM_HEADERS
+    valid_keys = valid_headers(headers)
+
+    rec_cycles, rec_cols = _recorded_to_columns(recorded, headers)
+    if isinstance(expected_events, dict):
+        exp_cycles = np.asarray(expected_events["cycle"], dtype=np.int64)
+        exp_cols = {key: expected_events[key] for key in headers if key != "cycle"}
+    else:
+        exp_cycles, exp_cols = _rows_to_columns(expected_events, headers)
+    exp_types = _event_types(headers, exp_cols)
+
+    # Align expected rows onto recorded rows
+    idx = np.searchsorted(rec_cycles, exp_cycles)
+    idx_clipped = np.minimum(idx, max(len(rec_cycles) - 1, 0))
+    found = (idx < len(rec_cycles)) & (rec_cycles[idx_clipped] == exp_cycles) if len(rec_cycles) \
+        else np.zeros(len(exp_cycles), dtype=bool)
+
+    report = {
+        "passed": True,
+        "expected_events": len(exp_cycles),
+        "recorded_cycles": len(rec_cycles),
+        "missing_cycles": int((~found).sum()),
+        "field_mismatches": 0,
+        "unexpected_valids": 0,
+        "by_field": {},
+        "by_type": {},
+        "examples": [],
+        "unexpected_examples": [],
+    }
+
+    bad_rows = np.zeros(len(exp_cycles), dtype=bool)
+    for key in headers:
+        if key == "cycle":
+            continue
+        exp_vals, exp_present = exp_cols[key]
+        rec_vals, rec_present = rec_cols[key]
+        actual = rec_vals[idx_clipped]
+        actual_present = rec_present[idx_clipped] & found
+        mismatch = exp_present & (~actual_present | (actual != exp_vals))
+        count = int(mismatch.sum())
+        if not count:
+            continue
+
+        report["by_field"][key] = count
+        report["field_mismatches"] += count
+        bad_rows |= mismatch
+        for i in np.flatnonzero(mismatch)[:max_examples - len(report["examples"])]:
+            report["examples"].append({
+                "cycle": int(exp_cycles[i]),
+                "type": exp_types[i],
+                "field": key,
+                "expected": hex(int(exp_vals[i])),
+                "actual": hex(int(actual[i])) if actual_present[i] else None,
+            })
+
+    for msg_type in np.unique(exp_types[bad_rows]):
+        report["by_type"][msg_type] = int((exp_types[bad_rows] == msg_type).sum())
+
+    if check_unexpected:
+        rec_types = _event_types(headers, rec_cols)
+        for key in valid_keys:
+            rec_vals, rec_present = rec_cols[key]
+            exp_vals, exp_present = exp_cols[key]
+            expected_high = exp_cycles[exp_present & (exp_vals == 1)]
+            extra = rec_present & (rec_vals == 1) & ~np.isin(rec_cycles, expected_high)
+            count = int(extra.sum())
+            if not count:
+                continue
+            report["unexpected_valids"] += count
+            report["by_field"][key] = report["by_field"].get(key, 0) + count
+            for i in np.flatnonzero(extra)[:max_examples - len(report["unexpected_examples"])]:
+                report["unexpected_examples"].append({
+                    "cycle": int(rec_cycles[i]),
+                    "type": rec_types[i],
+                    "field": key,
+                })
+
+    report["passed"] = not (report["field_mismatches"] or report["unexpected_valids"])
+    return report
+
+
+def _split_rows(columns, end):
+    # (rows with cycle <= end, the rest) of sorted raw or expected columns
+    n = int(np.searchsorted(np.asarray(columns["cycle"], dtype=np.int64), end, side="right"))
+    head, tail = {}, {}
+    for key, column in columns.items():
+        if isinstance(column, tuple):
+            head[key], tail[key] = tuple(part[:n] for part in column), tuple(part[n:] for part in column)
+        else:
+            head[key], tail[key] = column[:n], column[n:]
+    return head, (tail if n < len(columns["cycle"]) else None)
+
+
+def _next_batch(batches):
+    # Next non-empty batch, or None
+    for batch in batches:
+        if len(batch["cycle"]):
+            return batch
+    return None
 
-            expected_val = expected.get(key, "")
-            actual_val = actual.get(key, "")
 
-            # Only assert if expected value is non-empty
-            if expected_val != "":
-                assert actual_val == expected_val, (
-                    f"Mismatch at cycle {cycle} for '{key}': expected {expected_val}, got {actual_val}"
-                )
+def _add_report(total, report, max_examples):
+    # Sums a window's report into the running total (examples capped)
+    for key in ("expected_events", "recorded_cycles", "missing_cycles", "field_mismatches", "unexpected_valids"):
+        total[key] += report[key]
+    for key in ("by_field", "by_type"):
+        for name, count in report[key].items():
+            total[key][name] = total[key].get(name, 0) + count
+    for key in ("examples", "unexpected_examples"):
+        total[key].extend(report[key][:max(max_examples - len(total[key]), 0)])
 
+
+def build_windowed_mismatch_report(recorded_batches, expected_batches, headers, max_examples=10):
+    """
+    build_mismatch_report() over batched logs: recorded batches
+    (log_writer_helper.iter_log_columns()) and expected batches
+    (log_writer_helper.iter_expected_columns()), both in cycle order, are
+    compared one cycle window at a time. A window ends at the earlier of the
+    two current batches' last cycles, so memory stays at about one batch of
+    each whatever the run length.
+
+    Returns:
+        The build_mismatch_report() layout, summed over the windows, plus
+        'windows' (number of windows compared).
+    """
+    recorded_batches, expected_batches = iter(recorded_batches), iter(expected_batches)
+    recorded, expected = _next_batch(recorded_batches), _next_batch(expected_batches)
+    no_expected = expected_to_columns([], headers)
+    total = build_mismatch_report({}, no_expected, headers=headers, max_examples=max_examples)
+    total["windows"] = 0
+    last_end = -1
+
+    while recorded is not None or expected is not None:
+        if expected is not None and int(expected["cycle"][0]) <= last_end:
+            raise ValueError(f"Expected events are not in cycle order (cycle {int(expected['cycle'][0])} "
+                             f"after window ending at {last_end})")
+        end = min(int(batch["cycle"][-1]) for batch in (recorded, expected) if batch is not None)
+        recorded_window, expected_window = {}, no_expected
+        if recorded is not None:
+            recorded_window, recorded = _split_rows(recorded, end)
+            recorded = recorded or _next_batch(recorded_batches)
+        if expected is not None:
+            expected_window, expected = _split_rows(expected, end)
+            expected = expected or _next_batch(expected_batches)
+
+        report = build_mismatch_report(recorded_window, expected_window, headers=headers, max_examples=max_examples)
+        _add_report(total, report, max_examples)
+        total["windows"] += 1
+        last_end = end
+
+    total["passed"] = not (total["field_mismatches"] or total["unexpected_valids"])
+    return total
+
+
+def format_mismatch_report(report):
+    """
+    Renders a mismatch report as a short multi-line summary.
+    """
+    lines = [
+        f"{'PASS' if report['passed'] else 'FAIL'}: {report['expected_events']} expected events, "
+        f"{report['recorded_cycles']} recorded cycles, {report['field_mismatches']} field mismatches "
+        f"({report['missing_cycles']} events not recorded), {report['unexpected_valids']} unexpected valids"
+    ]
+    if report["by_field"]:
+        lines.append("  by field: " + ", ".join(f"{k}={v}" for k, v in report["by_field"].items()))
+    if report["by_type"]:
+        lines.append("  by type:  " + ", ".join(f"{k}={v}" for k, v in report["by_type"].items()))
+    for ex in report["examples"]:
+        lines.append(f"  cycle {ex['cycle']} [{ex['type']}] '{ex['field']}': "
+                     f"expected {ex['expected']}, got {ex['actual']}")
+    for ex in report["unexpected_examples"]:
+        lines.append(f"  cycle {ex['cycle']} [{ex['type']}] unexpected '{ex['field']}'")
+    return "\n".join(lines)
+
+
+def write_mismatch_report(report, path):
+    """
+    Saves a mismatch report as JSON (read back by run_regression.py).
+    """
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+def compare_against_expected(recorded_log, expected_events):
+    """
+    Compares the actual signal log vs expected events, field by field.
+    Builds the full mismatch report, then asserts with its summary.
+
+    Returns:
+        The report from build_mismatch_report().
+    """
+    report = build_mismatch_report(recorded_log, expected_events)
+    assert report["passed"], format_mismatch_report(report)
+    return report
+
+@profiled("expected_events")
 def generate_expected_events_with_fields(message_plan, mode='set', parser_mode=False):
 
     """
@@ -61,316 +399,19 @@ def generate_expected_events_with_fields(message_plan, mode='set', parser_mode=F
     for msg_type in message_plan:
         msg_len = MSG_LENGTHS[msg_type]
         expected_valid_cycle = current_cycle + msg_len + RESET_CYCLES
-
-        if parser_mode:
-            from ITCH_config import PARSER_HEADERS
-            row = {key: "" for key in PARSER_HEADERS}
-        else:
-            row = {key: "" for key in SIM_HEADERS}
-        row["cycle"] = expected_valid_cycle
-
-        if parser_mode:
-            row["parsed_valid"] = 1
-            row["parsed_type"] = hex({
-                "add": 0,
-                "cancel": 1,
-                "delete": 2,
-                "executed": 3,
-                "replace": 4,
-                "trade": 5
-            }[msg_type])
-
-        if msg_type == "add":
-            payload = generate_add_order_payload(mode)
-            row["add_internal_valid"]           = 1
-            row["add_order_ref"]                = hex(int.from_bytes(payload[1:9], byteorder='big'))
-            row["add_side"]                     = hex(0) if payload[9] == ord('B') else hex(1)
-            row["add_shares"]                   = hex(int.from_bytes(payload[10:14], byteorder='big'))
-            row["add_price"]                    = hex(int.from_bytes(payload[22:26], byteorder='big'))
-
-        elif msg_type == "cancel":
-            payload = generate_cancel_order_payload(mode)
-            row["cancel_internal_valid"]        = 1
-            row["cancel_order_ref"]             = hex(int.from_bytes(payload[1:9], byteorder='big'))
-            row["cancel_shares"]                = hex(int.from_bytes(payload[9:13], byteorder='big'))
-
-        elif msg_type == "delete":
-            payload = generate_delete_order_payload(mode)
-            row["delete_internal_valid"]        = 1
-            row["delete_order_ref"]             = hex(int.from_bytes(payload[1:9], byteorder='big'))
-
-        elif msg_type == "replace":
-            payload = generate_replace_order_payload(mode)
-            row["replace_internal_valid"]       = 1
-            row["replace_old_order_ref"]        = hex(int.from_bytes(payload[1:9], byteorder='big'))
-            row["replace_new_order_ref"]        = hex(int.from_bytes(payload[9:17], byteorder='big'))
-            row["replace_shares"]               = hex(int.from_bytes(payload[17:21], byteorder='big'))
-            row["replace_price"]                = hex(int.from_bytes(payload[21:25], byteorder='big'))
-
-        elif msg_type == "executed":
-            payload = generate_executed_order_payload(mode)
-
-            row["executed_internal_valid"]      = 1
-            row["exec_timestamp"]               = hex(int.from_bytes(payload[1:7], byteorder='big'))
-            row["exec_order_ref"]               = hex(int.from_bytes(payload[7:15], byteorder='big'))
-            row["exec_shares"]                  = hex(int.from_bytes(payload[15:19], byteorder='big'))
-            row["exec_match_id"]                = hex(int.from_bytes(payload[19:27], byteorder='big'))
-
-        elif msg_type == "trade":
-            payload = generate_trade_payload(mode)
-            row["trade_internal_valid"]         = 1
-            row["trade_timestamp"]              = hex(int.from_bytes(payload[1:7], byteorder='big'))
-            row["trade_order_ref"]              = hex(int.from_bytes(payload[7:15], byteorder='big'))
-            row["trade_side"]                   = hex(0) if payload[15] == ord('B') else hex(1)
-            row["trade_shares"]                 = hex(int.from_bytes(payload[16:20], byteorder='big'))
-            row["trade_stock_symbol"]           = hex(int.from_bytes(payload[20:28], byteorder='big'))  
-            row["trade_price"]                  = hex(int.from_bytes(payload[28:32], byteorder='big'))
-            row["trade_match_id"]               = hex(int.from_bytes(payload[32:40], byteorder='big'))
-
-
- 
-
-
-        expected_events.append(row)
+        payload = _PAYLOAD_GENERATORS[msg_type](mode)
+        expected_events.append(build_expected_row(msg_type, payload, expected_valid_cycle, parser_mode))
         current_cycle += msg_len
 
     return expected_events
 
-from sim_config import SIM_HEADERS
-from helpers.payload_generator_helper import (
-    generate_add_order_payload,
-    generate_cancel_order_payload,
-    generate_delete_order_payload,
-    generate_replace_order_payload,
-    generate_executed_order_payload,
-    generate_trade_payload,
-)
-
-# def generate_expected_events_from_schedule(schedule, parser_mode=False):
-#     """
-#     Given the injection schedule (with fixed payloads), decode expected outputs.
-#     Returns a list of dicts with unified keys.
-#     """
-#     expected_events = []
-
-#     for item in schedule:
-#         msg_type = item["type"]
-#         payload = item["payload"]
-#         expected_valid_cycle = item["expected_valid_cycle"]
-
-#         if parser_mode:
-#             from ITCH_config import PARSER_HEADERS
-#             row = {key: "" for key in PARSER_HEADERS}
-#             row["cycle"] = expected_valid_cycle
-#             row["parsed_valid"] = 1
-#             row["parsed_type"] = hex({
-#                 "add": 0,
-#                 "cancel": 1,
-#                 "delete": 2,
-#                 "executed": 3,
-#                 "replace": 4,
-#                 "trade": 5
-#             }[msg_type])
-
-#             if msg_type == "add":
-#                 row["order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-#                 row["side"] = hex(0) if payload[9] == ord('B') else hex(1)
-#                 row["shares"] = hex(int.from_bytes(payload[10:14], byteorder='big'))
-#                 row["price"] = hex(int.from_bytes(payload[22:26], byteorder='big'))
-
-#             elif msg_type == "cancel":
-#                 row["order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-#                 row["shares"] = hex(int.from_bytes(payload[9:13], byteorder='big'))
-
-#             elif msg_type == "delete":
-#                 row["order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-
-#             elif msg_type == "replace":
-#                 row["order_ref"] = hex(int.from_bytes(payload[9:17], byteorder='big'))
-#                 row["shares"] = hex(int.from_bytes(payload[17:21], byteorder='big'))
-#                 row["price"] = hex(int.from_bytes(payload[21:25], byteorder='big'))
-
-#             elif msg_type == "executed":
-#                 row["timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-#                 row["order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-#                 row["shares"] = hex(int.from_bytes(payload[15:19], byteorder='big'))
-#                 row["match_id"] = hex(int.from_bytes(payload[19:27], byteorder='big'))
-
-#             elif msg_type == "trade":
-#                 row["timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-#                 row["order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-#                 row["side"] = hex(0) if payload[15] == ord('B') else hex(1)
-#                 row["shares"] = hex(int.from_bytes(payload[16:20], byteorder='big'))
-#                 row["stock_symbol"] = hex(int.from_bytes(payload[20:28], byteorder='big'))
-#                 row["price"] = hex(int.from_bytes(payload[28:32], byteorder='big'))
-#                 row["match_id"] = hex(int.from_bytes(payload[32:40], byteorder='big'))
-
-#         else:
-#             from ITCH_config import SIM_HEADERS
-#             row = {key: "" for key in SIM_HEADERS}
-#             row["cycle"] = expected_valid_cycle
-
-#             if msg_type == "add":
-#                 row["add_parsed_type"] = hex(0)
-#                 row["add_internal_valid"] = 1
-#                 row["add_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-#                 row["add_side"] = hex(0) if payload[9] == ord('B') else hex(1)
-#                 row["add_shares"] = hex(int.from_bytes(payload[10:14], byteorder='big'))
-#                 row["add_price"] = hex(int.from_bytes(payload[22:26], byteorder='big'))
-
-#             elif msg_type == "cancel":
-#                 row["cancel_parsed_type"] = hex(1)
-#                 row["cancel_internal_valid"] = 1
-#                 row["cancel_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-#                 row["cancel_shares"] = hex(int.from_bytes(payload[9:13], byteorder='big'))
-
-#             elif msg_type == "delete":
-#                 row["delete_parsed_type"] = hex(2)
-#                 row["delete_internal_valid"] = 1
-#                 row["delete_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-
-#             elif msg_type == "replace":
-#                 row["replace_parsed_type"] = hex(4)
-#                 row["replace_internal_valid"] = 1
-#                 row["replace_old_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-#                 row["replace_new_order_ref"] = hex(int.from_bytes(payload[9:17], byteorder='big'))
-#                 row["replace_shares"] = hex(int.from_bytes(payload[17:21], byteorder='big'))
-#                 row["replace_price"] = hex(int.from_bytes(payload[21:25], byteorder='big'))
-
-#             elif msg_type == "executed":
-#                 row["exec_parsed_type"] = hex(3)
-#                 row["executed_internal_valid"] = 1
-#                 row["exec_timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-#                 row["exec_order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-#                 row["exec_shares"] = hex(int.from_bytes(payload[15:19], byteorder='big'))
-#                 row["exec_match_id"] = hex(int.from_bytes(payload[19:27], byteorder='big'))
-
-#             elif msg_type == "trade":
-#                 row["trade_parsed_type"] = hex(5)
-#                 row["trade_internal_valid"] = 1
-#                 row["trade_timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-#                 row["trade_order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-#                 row["trade_side"] = hex(0) if payload[15] == ord('B') else hex(1)
-#                 row["trade_shares"] = hex(int.from_bytes(payload[16:20], byteorder='big'))
-#                 row["trade_stock_symbol"] = hex(int.from_bytes(payload[20:28], byteorder='big'))
-#                 row["trade_price"] = hex(int.from_bytes(payload[28:32], byteorder='big'))
-#                 row["trade_match_id"] = hex(int.from_bytes(payload[32:40], byteorder='big'))
-
-#         expected_events.append(row)
-
-#     return expected_events
-
 
+@profiled("expected_events")
 def generate_expected_events_from_schedule(schedule, parser_mode=False):
     """
     Given the injection schedule (with fixed payloads), decode expected outputs.
+    Field offsets and output columns come from ITCH_MESSAGES (ITCH_config.py).
     Returns a list of dicts with unified keys.
     """
-    expected_events = []
-
-    for item in schedule:
-        msg_type = item["type"]
-        payload = item["payload"]
-        expected_valid_cycle = item["expected_valid_cycle"]
-
-        if parser_mode:
-            from ITCH_config import PARSER_HEADERS
-            row = {key: "" for key in PARSER_HEADERS}
-            row["cycle"] = expected_valid_cycle
-            row["parsed_valid"] = 1
-            row["parsed_type"] = hex({
-                "add": 0,
-                "cancel": 1,
-                "delete": 2,
-                "executed": 3,
-                "replace": 4,
-                "trade": 5
-            }[msg_type])
-
-            if msg_type == "add":
-                row["order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-                row["side"] = hex(0) if payload[9] == ord('B') else hex(1)
-                row["shares"] = hex(int.from_bytes(payload[10:14], byteorder='big'))
-                row["price"] = hex(int.from_bytes(payload[22:26], byteorder='big'))
-                row["misc_data"] = hex(int.from_bytes(payload[14:22], byteorder='big'))  # stock_symbol
-
-            elif msg_type == "cancel":
-                row["order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-                row["shares"] = hex(int.from_bytes(payload[9:13], byteorder='big'))
-
-            elif msg_type == "delete":
-                row["order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-
-            elif msg_type == "replace":
-                row["order_ref"] = hex(int.from_bytes(payload[9:17], byteorder='big'))  # new_order_ref
-                row["shares"] = hex(int.from_bytes(payload[17:21], byteorder='big'))
-                row["price"] = hex(int.from_bytes(payload[21:25], byteorder='big'))
-                row["misc_data"] = hex(int.from_bytes(payload[1:9], byteorder='big'))    # old_order_ref
-
-            elif msg_type == "executed":
-                row["timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-                row["order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-                row["shares"] = hex(int.from_bytes(payload[15:19], byteorder='big'))
-                row["misc_data"] = hex(int.from_bytes(payload[19:27], byteorder='big'))  # match_id
-
-            elif msg_type == "trade":
-                row["timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-                row["order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-                row["side"] = hex(0) if payload[15] == ord('B') else hex(1)
-                row["shares"] = hex(int.from_bytes(payload[16:20], byteorder='big'))
-                row["price"] = hex(int.from_bytes(payload[28:32], byteorder='big'))
-                row["misc_data"] = hex(int.from_bytes(payload[32:40], byteorder='big'))  # match_id
-
-        else:
-            from ITCH_config import SIM_HEADERS
-            row = {key: "" for key in SIM_HEADERS}
-            row["cycle"] = expected_valid_cycle
-            if msg_type == "add":
-                row["add_parsed_type"] = hex(0)
-                row["add_internal_valid"] = 1
-                row["add_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-                row["add_side"] = hex(0) if payload[9] == ord('B') else hex(1)
-                row["add_shares"] = hex(int.from_bytes(payload[10:14], byteorder='big'))
-                row["add_price"] = hex(int.from_bytes(payload[22:26], byteorder='big'))
-
-            elif msg_type == "cancel":
-                row["cancel_parsed_type"] = hex(1)
-                row["cancel_internal_valid"] = 1
-                row["cancel_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-                row["cancel_shares"] = hex(int.from_bytes(payload[9:13], byteorder='big'))
-
-            elif msg_type == "delete":
-                row["delete_parsed_type"] = hex(2)
-                row["delete_internal_valid"] = 1
-                row["delete_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-
-            elif msg_type == "replace":
-                row["replace_parsed_type"] = hex(4)
-                row["replace_internal_valid"] = 1
-                row["replace_old_order_ref"] = hex(int.from_bytes(payload[1:9], byteorder='big'))
-                row["replace_new_order_ref"] = hex(int.from_bytes(payload[9:17], byteorder='big'))
-                row["replace_shares"] = hex(int.from_bytes(payload[17:21], byteorder='big'))
-                row["replace_price"] = hex(int.from_bytes(payload[21:25], byteorder='big'))
-
-            elif msg_type == "executed":
-                row["exec_parsed_type"] = hex(3)
-                row["executed_internal_valid"] = 1
-                row["exec_timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-                row["exec_order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-                row["exec_shares"] = hex(int.from_bytes(payload[15:19], byteorder='big'))
-                row["exec_match_id"] = hex(int.from_bytes(payload[19:27], byteorder='big'))
-
-            elif msg_type == "trade":
-                row["trade_parsed_type"] = hex(5)
-                row["trade_internal_valid"] = 1
-                row["trade_timestamp"] = hex(int.from_bytes(payload[1:7], byteorder='big'))
-                row["trade_order_ref"] = hex(int.from_bytes(payload[7:15], byteorder='big'))
-                row["trade_side"] = hex(0) if payload[15] == ord('B') else hex(1)
-                row["trade_shares"] = hex(int.from_bytes(payload[16:20], byteorder='big'))
-                row["trade_stock_symbol"] = hex(int.from_bytes(payload[20:28], byteorder='big'))
-                row["trade_price"] = hex(int.from_bytes(payload[28:32], byteorder='big'))
-                row["trade_match_id"] = hex(int.from_bytes(payload[32:40], byteorder='big'))
-
-        expected_events.append(row)
-
-    return expected_events
+    return [build_expected_row(item["type"], item["payload"], item["expected_valid_cycle"], parser_mode)
+            for item in schedule]
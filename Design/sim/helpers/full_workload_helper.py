@@ -7,17 +7,25 @@
 #              Supports stream injection with type and length alignment.
 # Author: RZ
 # Start Date: 20250505
-# Version: 0.1
+# Version: 0.6
 #
 # Changelog
 # ============================================================
 # [20250505-1] RZ: Created full-stream ITCH generator for benchmarking.
 # [20250506-1] RZ: Added support for multiple message types.
 # [20250506-1] RZ: Implemented cycle-based scheduling for message injection.
+# [20261018-1] RZ: Added run_batch_payload_workload() on top of the NumPy batch encoder.
+# [20261018-2] RZ: Added iter_payload_workload() for constant-memory chunked workloads.
+# [20261018-3] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# [20261018-4] RZ: Optional seed for run_full_payload_workload(); WORKLOAD_VERSION for the workload cache.
+# [20261018-5] RZ: Dropped the unused run_batch_payload_workload(); the unseeded stream and payloads are bytes like the seeded ones.
 # ============================================================
 
+import itertools
+
 from sim_config import SIM_CLK_PERIOD_NS, RESET_CYCLES, MSG_MODE
 from ITCH_config import SIM_HEADERS, MSG_LENGTHS
+from .profile_helper import profiled
 
 from .payload_generator_helper import (
     generate_add_order_payload, 
@@ -27,6 +35,10 @@ from .payload_generator_helper import (
     generate_executed_order_payload, 
     generate_trade_payload)
 
+# Bump whenever the bytes generated for a given plan, seed and mode change, so
+# stale entries of the on-disk workload cache (workload_cache_helper.py) are not reused
+WORKLOAD_VERSION = 1
+
 
 def generate_payload_by_type(msg_type, mode='set'):
     if msg_type == 'add':
@@ -55,31 +67,39 @@ def generate_payload_by_type(msg_type, mode='set'):
 #         raise ValueError(f"Unknown message type: {msg_type}")
 
 
-def run_full_payload_workload(message_plan):
+@profiled("workload_generation")
+def run_full_payload_workload(message_plan, seed=None):
 
     """
     Generates a full ITCH message stream and logs timing info.
 
     Args:
         message_plan: list of message types like ["add", "cancel", "add", ...]
+        seed: optional seed; payloads then come from the seeded batch encoder
+              (as iter_payload_workload() with a single chunk) and are
+              reproducible bit-for-bit
 
     Returns:
         {
-            'full_stream': List[int],
+            'full_stream': bytes, concatenated byte stream (iterates as ints),
             'injection_schedule': List[Dict] with keys:
-                'type', 'start_cycle', 'start_time_ns', 'expected_valid_cycle'
+                'type', 'payload' (bytes), 'expected_valid_cycle'
         }
     """
-    full_stream = []
+    if seed is not None:
+        return next(_iter_batch_workload(message_plan, chunk_messages=max(len(message_plan), 1), seed=seed),
+                    {"full_stream": b"", "injection_schedule": []})
+
+    full_stream = bytearray()
     schedule = []
     current_cycle = 0
 
     for msg_type in message_plan:
-        payload = generate_payload_by_type(msg_type, MSG_MODE)
+        payload = bytes(generate_payload_by_type(msg_type, MSG_MODE))
         msg_len = len(payload)
 
         expected_valid_cycle = current_cycle + msg_len + RESET_CYCLES
-        full_stream.extend(payload)  # Injected byte stream
+        full_stream += payload  # Injected byte stream
 
         schedule.append({
             "type": msg_type,
@@ -90,8 +110,64 @@ def run_full_payload_workload(message_plan):
         current_cycle += msg_len
 
     return {
-        "full_stream": full_stream,
+        "full_stream": bytes(full_stream),
         "injection_schedule": schedule
     }
 
 
+@profiled("workload_generation")
+def iter_payload_workload(message_plan, chunk_messages=4096, seed=None):
+
+    """
+    Lazily generates a workload in chunks so long soak runs use bounded memory.
+    Each chunk has the same shape as run_full_payload_workload()'s result, with
+    cycles continuing across chunks, and is only built when requested.
+
+    Args:
+        message_plan: iterable of message types (may itself be a generator)
+        chunk_messages: number of messages per chunk
+        seed: optional seed; the stream is reproducible for a given seed and chunk size
+
+    Yields:
+        {
+            'full_stream': bytes for this chunk,
+            'injection_schedule': List[Dict] with keys
+                'type', 'payload', 'expected_valid_cycle'
+        }
+    """
+    yield from _iter_batch_workload(message_plan, chunk_messages, seed)
+
+
+def _iter_batch_workload(message_plan, chunk_messages, seed):
+    # Untagged body of iter_payload_workload(), shared with the seeded
+    # run_full_payload_workload() so the phase is not counted twice
+    import numpy as np
+    from .payload_batch_helper import generate_payload_batch
+
+    rng = np.random.default_rng(seed)
+    plan = iter(message_plan)
+    current_cycle = 0
+
+    while True:
+        chunk_plan = list(itertools.islice(plan, chunk_messages))
+        if not chunk_plan:
+            return
+
+        # One generator is threaded through every chunk (default_rng passes it through)
+        batch = generate_payload_batch(chunk_plan, MSG_MODE, rng)
+        stream = batch["stream"].tobytes()
+        starts = batch["offsets"].tolist()
+        ends = starts[1:] + [len(stream)]
+
+        schedule = [{
+            "type": msg_type,
+            "payload": stream[start:end],
+            "expected_valid_cycle": current_cycle + end + RESET_CYCLES
+        } for msg_type, start, end in zip(chunk_plan, starts, ends)]
+
+        yield {
+            "full_stream": stream,
+            "injection_schedule": schedule
+        }
+
+        current_cycle += len(stream)
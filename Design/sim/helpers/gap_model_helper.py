@@ -0,0 +1,226 @@
+# ============================================================
+# gap_model_helper.py
+# ============================================================
+#
+# Description: valid_in gap (backpressure) injection for full workloads.
+#              Pluggable gap models insert idle cycles into a workload chunk,
+#              the injection schedule is re-timed to the gapped stream, and
+#              offered/delivered throughput is accounted per run.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.3
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Duty, Bernoulli and bursty on/off gap models with throughput report.
+# [20261018-2] RZ: No model keeps a chunk's own valid_mask (triage slices of gapped runs).
+# [20261018-3] RZ: Dropped gap_model_duty(): gapped runs are no longer sized from the mean duty cycle.
+# ============================================================
+
+# Gap models and their parameters (GAP_PARAMS in sim_config.py):
+#   "duty":      fixed duty cycle; "duty" = fraction of cycles with valid_in high
+#   "bernoulli": every cycle independently valid with probability "p_valid"
+#   "burst":     on/off bursts; geometric on-bursts of mean "burst_on" bytes,
+#                idle gaps of mean "burst_off" cycles
+#
+# Scope:
+#   "message":   gaps only before a message's type byte (feed handler delivering
+#                whole messages); every message is decoded
+#   "byte":      gaps anywhere; a gap inside a message aborts it in the RTL
+#                (itch_abort_on_valid_drop.vh), so it is not expected
+
+import numpy as np
+
+
+def _duty_gaps(state, rng, since, positions):
+    # Idle cycles owed after `positions` bytes, minus what was already inserted
+    duty = state["params"]["duty"]
+    owed = np.floor(positions * (1.0 - duty) / duty).astype(np.int64)
+    gaps = np.diff(owed, prepend=state["duty_owed"])
+    if len(owed):
+        state["duty_owed"] = int(owed[-1])
+    return gaps
+
+
+def _bernoulli_gaps(state, rng, since, positions):
+    # Idle cycles accumulated while `since` bytes went through: NB(since, p)
+    p = state["params"]["p_valid"]
+    return np.where(since > 0, rng.negative_binomial(np.maximum(since, 1), p), 0)
+
+
+def _burst_gaps(state, rng, since, positions):
+    # A burst ends after each byte with probability 1/burst_on; the gap it leaves
+    # is inserted at the next allowed point
+    params = state["params"]
+    ends = rng.random(len(since)) < 1.0 - (1.0 - 1.0 / params["burst_on"]) ** since
+    return np.where(ends, rng.geometric(1.0 / params["burst_off"], len(since)), 0)
+
+
+GAP_MODELS = {
+    "duty": _duty_gaps,
+    "bernoulli": _bernoulli_gaps,
+    "burst": _burst_gaps,
+}
+
+
+def new_gap_state(model=None, params=None, scope="message", seed=None):
+    """
+    Creates the gap injection state threaded through every chunk of a run.
+
+    Args:
+        model (str): Key of GAP_MODELS, or None for back-to-back valid_in.
+        params (dict): Model parameters (see above).
+        scope (str): "message" or "byte" (see above).
+        seed: Optional seed for the random models.
+
+    Returns:
+        Dict with the model, RNG and throughput counters.
+    """
+    if model is not None and model not in GAP_MODELS:
+        raise ValueError(f"Unknown gap model: {model}")
+    if scope not in ("message", "byte"):
+        raise ValueError(f"Unknown gap scope: {scope}")
+
+    return {
+        "model": model,
+        "params": dict(params or {}),
+        "scope": scope,
+        "rng": np.random.default_rng(seed),
+        "duty_owed": 0,
+        "last_point": 0,  # Absolute byte index of the last insertion point
+        "bytes": 0,
+        "cycles": 0,
+        "messages": 0,
+        "aborted_messages": 0,
+    }
+
+
+def apply_gap_model(state, chunk):
+    """
+    Inserts idle cycles into one workload chunk.
+
+    Args:
+        state: From new_gap_state().
+        chunk: A workload chunk ('full_stream', 'injection_schedule'), as from
+               run_full_payload_workload() or iter_payload_workload().
+
+    Returns:
+        New chunk with 'full_stream' (idle cycles carry byte 0), 'valid_mask'
+        (bytes of 0/1, or None when valid_in stays high) and the
+        'injection_schedule' re-timed to the gapped stream. Messages split by a
+        gap are dropped from the schedule and counted as aborted. Without a
+        model the chunk is passed through, keeping a 'valid_mask' it already
+        has (a triage slice cut from a gapped run).
+    """
+    stream = chunk["full_stream"]
+    schedule = chunk["injection_schedule"]
+    byte_base = state["bytes"]
+    cycle_base = state["cycles"]
+    n = len(stream)
+
+    if schedule is not None:
+        state["messages"] += len(schedule)
+
+    if state["model"] is None:
+        # Already gapped (or back-to-back): idle cycles are the mask's zeros
+        mask = chunk.get("valid_mask")
+        state["bytes"] += n if mask is None else int(np.count_nonzero(np.frombuffer(mask, dtype=np.uint8)))
+        state["cycles"] += n
+        return {**chunk, "valid_mask": mask}
+
+    state["bytes"] += n
+
+    if schedule is not None:
+        lengths = np.fromiter((len(event["payload"]) for event in schedule), dtype=np.int64, count=len(schedule))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    if state["scope"] == "byte":
+        points = np.arange(n, dtype=np.int64)
+    elif schedule is None:
+        raise ValueError("Message-scope gaps need an injection schedule (use GAP_SCOPE='byte')")
+    else:
+        points = starts
+
+    positions = points + byte_base
+    since = np.diff(positions, prepend=state["last_point"])
+    if len(positions):
+        state["last_point"] = int(positions[-1])
+    gaps = GAP_MODELS[state["model"]](state, state["rng"], since, positions)
+
+    idle_before = np.zeros(n, dtype=np.int64)
+    idle_before[points] = gaps
+    byte_cycles = np.arange(n, dtype=np.int64) + np.cumsum(idle_before)
+    total = int(byte_cycles[-1]) + 1 if n else 0
+
+    gapped = np.zeros(total, dtype=np.uint8)
+    gapped[byte_cycles] = np.frombuffer(bytes(stream), dtype=np.uint8)
+    valid_mask = np.zeros(total, dtype=np.uint8)
+    valid_mask[byte_cycles] = 1
+    state["cycles"] += total
+
+    if schedule is not None:
+        ends = starts + lengths - 1
+        shift = (byte_cycles[ends] - ends) + (cycle_base - byte_base)
+        intact = (byte_cycles[ends] - byte_cycles[starts]) == lengths - 1
+        retimed = [
+            {**event, "expected_valid_cycle": event["expected_valid_cycle"] + int(delta)}
+            for event, delta, ok in zip(schedule, shift.tolist(), intact.tolist()) if ok
+        ]
+        state["aborted_messages"] += len(schedule) - len(retimed)
+        schedule = retimed
+
+    return {
+        **chunk,
+        "full_stream": gapped.tobytes(),
+        "valid_mask": valid_mask.tobytes(),
+        "injection_schedule": schedule,
+    }
+
+
+def build_throughput_report(state, report=None):
+    """
+    Summarizes offered and delivered throughput of a run.
+
+    Args:
+        state: Gap state after every chunk went through apply_gap_model().
+        report: Optional mismatch report; delivered messages are the expected
+                events that were not missing.
+
+    Returns:
+        Dict with cycle/byte/message counts and per-cycle rates.
+    """
+    cycles = state["cycles"]
+    throughput = {
+        "gap_model": state["model"],
+        "gap_scope": state["scope"],
+        "gap_params": state["params"],
+        "injected_cycles": cycles,
+        "idle_cycles": cycles - state["bytes"],
+        "bytes": state["bytes"],
+        "messages": state["messages"],
+        "aborted_messages": state["aborted_messages"],
+        "bytes_per_cycle": state["bytes"] / cycles if cycles else 0.0,
+        "messages_per_cycle": state["messages"] / cycles if cycles else 0.0,
+    }
+    if report is not None:
+        delivered = report["expected_events"] - report["missing_cycles"]
+        throughput["delivered_events"] = delivered
+        throughput["delivered_per_cycle"] = delivered / cycles if cycles else 0.0
+        throughput["sustained"] = bool(report["passed"])
+    return throughput
+
+
+def format_throughput_report(throughput):
+    lines = [
+        f"Throughput ({throughput['gap_model'] or 'no gaps'}, {throughput['gap_scope']} scope): "
+        f"{throughput['bytes']} bytes / {throughput['messages']} messages in "
+        f"{throughput['injected_cycles']} cycles ({throughput['idle_cycles']} idle)",
+        f"  offered: {throughput['bytes_per_cycle']:.3f} bytes/cycle, "
+        f"{throughput['messages_per_cycle']:.4f} messages/cycle, "
+        f"{throughput['aborted_messages']} messages split by gaps",
+    ]
+    if "delivered_events" in throughput:
+        lines.append(f"  delivered: {throughput['delivered_events']} events "
+                     f"({throughput['delivered_per_cycle']:.4f}/cycle), "
+                     f"{'sustained' if throughput['sustained'] else 'NOT sustained'}")
+    return "\n".join(lines)
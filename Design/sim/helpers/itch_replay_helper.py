@@ -0,0 +1,177 @@
+# ============================================================
+# itch_replay_helper.py
+# ============================================================
+#
+# Description: Replays NASDAQ TotalView-ITCH 5.0 binary captures (2-byte
+#              big-endian length prefix per message) into the testbenches.
+#              The file is memory-mapped and walked in place; only one chunk
+#              of injected bytes is materialized at a time, so multi-GB
+#              captures stream with bounded memory.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial mmap replay with type filter and DUT-layout translation.
+# [20261018-2] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# ============================================================
+
+import mmap
+import struct
+
+from sim_config import RESET_CYCLES
+from ITCH_config import ITCH_MESSAGES, ITCH50_MESSAGES, MSG_LENGTHS
+from helpers.profile_helper import profiled
+
+_LENGTH_PREFIX = struct.Struct(">H")
+
+# ITCH type byte -> (message type, DUT length, [(source offset, DUT offset, width)])
+# Fields are matched by name between ITCH50_MESSAGES and ITCH_MESSAGES.
+_TRANSLATIONS = {}
+for _msg_type, _itch in ITCH50_MESSAGES.items():
+    _dut_fields = {name: (offset, width) for name, offset, width, *_ in ITCH_MESSAGES[_msg_type]["fields"]}
+    _copies = []
+    for _name, _offset, _width in _itch["fields"]:
+        if _name in _dut_fields:
+            _dut_offset, _dut_width = _dut_fields[_name]
+            if _dut_width != _width:
+                raise ValueError(f"ITCH 5.0 field {_msg_type}.{_name} is {_width} bytes, DUT expects {_dut_width}")
+            _copies.append((_offset, _dut_offset, _width))
+    _TRANSLATIONS[_itch["type_byte"]] = (_msg_type, MSG_LENGTHS[_msg_type], tuple(_copies))
+
+
+def translate_itch50_message(body):
+    """
+    Re-packs one ITCH 5.0 message body into the DUT wire layout (ITCH_MESSAGES).
+
+    Args:
+        body: Message bytes without the length prefix (bytes or memoryview).
+
+    Returns:
+        (msg_type, bytes) or None for message types the DUT does not decode.
+    """
+    translation = _TRANSLATIONS.get(body[0])
+    if translation is None:
+        return None
+    msg_type, msg_len, copies = translation
+    payload = bytearray(msg_len)
+    for src, dst, width in copies:
+        payload[dst:dst + width] = body[src:src + width]
+    return msg_type, bytes(payload)
+
+
+def iter_itch_messages(path, msg_types=None, max_messages=None):
+    """
+    Walks an ITCH 5.0 capture in place.
+
+    Args:
+        path (str): Binary capture, each message preceded by a 2-byte length.
+        msg_types: Optional ITCH type characters to keep (e.g. "AXDUEP");
+                   None passes every message through.
+        max_messages (int, optional): Stop after this many kept messages.
+
+    Yields:
+        (file offset of the length prefix, memoryview of the message body).
+        Views point into the mapping and are only valid until the next
+        message is requested.
+    """
+    wanted = None if msg_types is None else {ord(t) if isinstance(t, str) else t for t in msg_types}
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            pos = 0
+            end = len(mm)
+            kept = 0
+            while pos + 2 <= end:
+                (length,) = _LENGTH_PREFIX.unpack_from(mm, pos)
+                body_start = pos + 2
+                if body_start + length > end:
+                    raise ValueError(f"Truncated ITCH message at offset {pos}")
+                if length and (wanted is None or mm[body_start] in wanted):
+                    body = view[body_start:body_start + length]
+                    try:
+                        yield pos, body
+                    finally:
+                        body.release()  # The mapping can only be closed once no views remain
+                    kept += 1
+                    if max_messages is not None and kept >= max_messages:
+                        return
+                pos = body_start + length
+        finally:
+            view.release()
+
+
+@profiled("workload_generation")
+def iter_itch_replay(path, msg_types=None, translate=True, chunk_bytes=1 << 20, max_messages=None):
+    """
+    Replays an ITCH 5.0 capture as injection chunks for the testbench loop.
+
+    translate=True re-packs the six supported types (Add, Cancel, Delete,
+    Replace, Executed, Trade) into the DUT layout and drops everything else;
+    chunks carry an injection_schedule like iter_payload_workload(), cycles
+    continuing across chunks. translate=False injects the message bodies as
+    they are (length prefixes stripped). Real ITCH 5.0 offsets and lengths do
+    not match the DUT, so that stream has no schedule and expected events must
+    come from the reference model fed with the same chunk.
+
+    Args:
+        path (str): Binary capture.
+        msg_types: Optional ITCH type characters to keep; None keeps all.
+        translate (bool): DUT-layout translation (see above).
+        chunk_bytes (int): Injected bytes per chunk (approximate).
+        max_messages (int, optional): Stop after this many kept messages.
+
+    Yields:
+        {
+            'full_stream': bytes for this chunk,
+            'injection_schedule': List[Dict] ('type', 'payload',
+                                  'expected_valid_cycle'), or None in raw mode,
+            'file_offset': capture offset just after the chunk
+        }
+    """
+    parts = []
+    schedule = [] if translate else None
+    current_cycle = 0
+    chunk_len = 0
+    file_offset = 0
+
+    for pos, body in iter_itch_messages(path, msg_types, max_messages):
+        file_offset = pos + 2 + len(body)
+        if translate:
+            translated = translate_itch50_message(body)
+            if translated is None:
+                continue
+            msg_type, payload = translated
+            chunk_len += len(payload)
+            parts.append(payload)
+            schedule.append({
+                "type": msg_type,
+                "payload": payload,
+                "expected_valid_cycle": current_cycle + chunk_len + RESET_CYCLES
+            })
+        else:
+            parts.append(bytes(body))
+            chunk_len += len(body)
+
+        if chunk_len >= chunk_bytes:
+            yield {"full_stream": b"".join(parts), "injection_schedule": schedule, "file_offset": file_offset}
+            current_cycle += chunk_len
+            parts = []
+            schedule = [] if translate else None
+            chunk_len = 0
+
+    if parts:
+        yield {"full_stream": b"".join(parts), "injection_schedule": schedule, "file_offset": file_offset}
+
+
+def write_itch50_file(path, messages):
+    """
+    Writes ITCH 5.0 message bodies with 2-byte length prefixes (for building
+    small replay fixtures).
+    """
+    with open(path, "wb") as f:
+        for body in messages:
+            f.write(_LENGTH_PREFIX.pack(len(body)))
+            f.write(body)
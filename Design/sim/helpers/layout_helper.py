@@ -0,0 +1,152 @@
+# ============================================================
+# layout_helper.py
+# ============================================================
+#
+# Description: Encoders and decoders compiled from the ITCH_MESSAGES layout
+#              table in ITCH_config.py. Packs field values into payloads,
+#              unpacks payloads with the precompiled structs and builds expected
+#              SIM_HEADERS / PARSER_HEADERS rows without per-field slicing.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial table-driven pack/unpack and expected-row builder.
+# ============================================================
+
+from ITCH_config import ITCH_MESSAGES, MSG_STRUCTS, SIM_HEADERS, PARSER_HEADERS
+
+
+def _decode_int(raw):
+    return int.from_bytes(raw, byteorder='big')
+
+
+def _decode_side(raw):
+    return int(raw == ord('S'))
+
+
+def _decoder(width, kind):
+    if kind == "side":
+        return _decode_side
+    if kind == "alpha" or width not in (1, 2, 4, 8):
+        return _decode_int  # Raw bytes from the struct
+    return None
+
+
+# Per type: [(struct slot, field name, decoder or None, SIM column, PARSER column)] for decoded fields
+_DECODE_PLANS = {
+    msg_type: [
+        (slot, name, _decoder(width, kind), sim_column, parser_column)
+        for slot, (name, _, width, kind, _, sim_column, parser_column) in enumerate(spec["fields"])
+        if kind != "pad" and name != "msg_type"
+    ]
+    for msg_type, spec in ITCH_MESSAGES.items()
+}
+
+
+def _row_template(msg_type, parser_mode):
+    spec = ITCH_MESSAGES[msg_type]
+    if parser_mode:
+        row = {key: "" for key in PARSER_HEADERS}
+        row["parsed_valid"] = 1
+        row["parsed_type"] = hex(spec["parsed_type"])
+    else:
+        row = {key: "" for key in SIM_HEADERS}
+        row[f"{msg_type}_internal_valid"] = 1
+        row[f"{spec['prefix']}_parsed_type"] = hex(spec["parsed_type"])
+    return row
+
+
+# (msg_type, parser_mode) -> (blank row with valid/type set, [(struct slot, decoder, column)])
+_ROW_PLANS = {
+    (msg_type, parser_mode): (
+        _row_template(msg_type, parser_mode),
+        [(slot, decode, parser_column if parser_mode else sim_column)
+         for slot, _, decode, sim_column, parser_column in plan
+         if (parser_column if parser_mode else sim_column) is not None])
+    for msg_type, plan in _DECODE_PLANS.items()
+    for parser_mode in (False, True)
+}
+
+
+def pack_payload(msg_type, values):
+    """
+    Encodes field values into a payload following ITCH_MESSAGES.
+
+    Args:
+        msg_type (str): Key of ITCH_MESSAGES.
+        values (dict): Field name -> value. Integers for 'uint' fields, 'B'/'S'
+                       byte values for 'side', bytes for 'alpha' and 'pad'.
+                       Missing fields are zero; msg_type defaults to type_byte.
+
+    Returns:
+        List[int] payload bytes, as produced by payload_generator_helper.
+    """
+    spec = ITCH_MESSAGES[msg_type]
+    packed = []
+    for name, _, width, kind, *_ in spec["fields"]:
+        if name == "msg_type":
+            value = values.get(name, spec["type_byte"])
+        else:
+            value = values.get(name, 0 if kind in ("uint", "side") else bytes(width))
+        if kind == "uint" and width not in (1, 2, 4, 8):
+            value = value.to_bytes(width, byteorder='big')
+        packed.append(value)
+    return list(MSG_STRUCTS[msg_type].pack(*packed))
+
+
+def unpack_payload(msg_type, payload):
+    """
+    Decodes every non-padding field of a payload.
+
+    Returns:
+        Dict[str, int] keyed by field name; side is the RTL flag, alpha fields
+        are big-endian integers like the RTL registers.
+    """
+    raw = MSG_STRUCTS[msg_type].unpack_from(bytes(payload))
+    return {name: decode(raw[slot]) if decode else raw[slot]
+            for slot, name, decode, _, _ in _DECODE_PLANS[msg_type]}
+
+
+def build_expected_row(msg_type, payload, cycle, parser_mode=False):
+    """
+    Builds the expected output row of one message.
+
+    Args:
+        msg_type (str): Key of ITCH_MESSAGES.
+        payload: Message bytes (list, bytes or memoryview).
+        cycle (int): Cycle on which the valid is expected.
+        parser_mode (bool): PARSER_HEADERS layout instead of SIM_HEADERS.
+
+    Returns:
+        Dict with every header present (blank where nothing is expected).
+    """
+    template, plan = _ROW_PLANS[(msg_type, parser_mode)]
+    raw = MSG_STRUCTS[msg_type].unpack_from(payload if isinstance(payload, (bytes, memoryview)) else bytes(payload))
+    row = template.copy()
+    row["cycle"] = cycle
+    for slot, decode, column in plan:
+        row[column] = hex(decode(raw[slot]) if decode else raw[slot])
+    return row
+
+
+def layout_dtype(msg_type):
+    """
+    NumPy structured dtype matching the wire layout of one message type.
+    """
+    import numpy as np
+
+    descr = []
+    for name, _, width, kind, *_ in ITCH_MESSAGES[msg_type]["fields"]:
+        if kind == "pad":
+            descr.append((name, f"V{width}"))
+        elif kind == "alpha":
+            descr.append((name, f"S{width}"))
+        elif kind == "side" or width == 1:
+            descr.append((name, "u1"))
+        elif width in (2, 4, 8):
+            descr.append((name, f">u{width}"))
+        else:
+            descr.append((name, "u1", (width,)))
+    return np.dtype(descr)
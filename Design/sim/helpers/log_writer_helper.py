@@ -0,0 +1,369 @@
+# ============================================================
+# log_writer_helper.py
+# ============================================================
+#
+# Description: Streaming log writer for the recorders and testbenches. Rows
+#              are handed over in batches and written by a background thread
+#              while the simulation continues, either as the usual CSV layout
+#              (SIM_HEADERS / PARSER_HEADERS, hex cells) or as a compact
+#              binary columnar log, so a run never holds its whole recording.
+#              Binary logs are read back as integer columns or converted to CSV.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.4
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Threaded batch writer, binary column log, reader and CSV converter.
+# [20261018-2] RZ: write_log_columns() for columnar expected events (blank cells).
+# [20261018-3] RZ: submit_expected_columns() streams columnar expected events.
+# [20261018-4] RZ: iter_log_columns() / iter_expected_columns(): batched readers for windowed checks.
+# ============================================================
+
+# Binary column log (.bin), little-endian:
+#   magic "ITCHLOG1" | uint32 meta length | meta JSON
+#   then one block per flushed batch:
+#     uint32 rows | per stored column: uint8 itemsize (1/2/4/8) | rows values
+# meta: 'headers' (CSV order), 'columns' (stored, in block order), 'flags'
+# (exported as ints), 'missing' ({header: CSV fallback} for signals absent
+# from the DUT). Every block stores each column in the narrowest unsigned
+# type that holds its largest value, so mostly-zero field columns cost one
+# byte per row.
+#
+# The writer thread only touches its own copies of the batches; the cocotb
+# side blocks (backpressure) once MAX_PENDING batches are queued, which keeps
+# memory bounded when the disk is slower than the simulation.
+
+import csv
+import itertools
+import json
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+LOG_MAGIC = b"ITCHLOG1"
+MAX_PENDING = 8  # Batches queued for the writer thread before submit blocks
+READ_BATCH_ROWS = 65536  # CSV rows per batch of the batched readers
+
+_ITEM_TYPES = {1: np.uint8, 2: np.uint16, 4: np.uint32, 8: np.uint64}
+
+
+def _write_loop(writer):
+    # Background thread: drain the queue until the close marker
+    f = writer["file"]
+    while True:
+        item = writer["queue"].get()
+        if item is None:
+            return
+        if writer["error"] is not None:
+            continue  # Keep draining so submit() never blocks on a dead writer
+        try:
+            kind, payload = item
+            if kind == "columns":
+                _write_columns(writer, f, {key: np.frombuffer(data, dtype=np.uint64) for key, data in payload.items()})
+            elif kind == "expected":
+                _write_columns(writer, f, payload)
+            else:
+                writer["csv"].writerows(payload)
+                writer["rows"] += len(payload)
+            writer["batches"] += 1
+        except Exception as exc:  # Re-raised by close_log_writer()
+            writer["error"] = exc
+
+
+def _write_columns(writer, f, columns):
+    # columns: {stored header: uint64 array}, one batch
+    n = len(columns["cycle"])
+    if writer["binary"]:
+        parts = [struct.pack("<I", n)]
+        for key in writer["stored"]:
+            values = columns[key]
+            narrow = values.astype(np.dtype(np.min_scalar_type(int(values.max()) if n else 0)).newbyteorder("<"))
+            parts += [struct.pack("<B", narrow.itemsize), narrow.tobytes()]
+        f.write(b"".join(parts))
+    else:
+        writer["csv"].writerows(_format_rows(writer, columns, n))
+    writer["rows"] += n
+
+
+def _format_rows(writer, columns, n):
+    # CSV cells of one batch, in header order. A column is an integer array,
+    # or (values, present) for expected events, blank where not present
+    formatted = []
+    for key in writer["headers"]:
+        if key in writer["missing"]:
+            formatted.append([writer["missing"][key]] * n)
+            continue
+        column = columns[key]
+        values, present = column if isinstance(column, tuple) else (column, None)
+        if key == "cycle" or key in writer["flags"]:
+            cells = values.tolist()
+        else:
+            cells = [hex(value) for value in values.tolist()]
+        if present is not None:
+            cells = [cell if here else "" for cell, here in zip(cells, present.tolist())]
+        formatted.append(cells)
+    return zip(*formatted)
+
+
+def write_log_columns(path, headers, columns, flags=()):
+    """
+    Writes columns in one go (no writer thread) as a CSV log: recorder
+    columns, or expected columns ({'cycle', header: (values, present)},
+    compare_helper.expected_to_columns()) with blanks where not present.
+
+    Returns:
+        Number of rows written.
+    """
+    writer = {"headers": list(headers), "flags": set(flags), "missing": {}}
+    n = len(columns["cycle"])
+    with open(path, "w", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(writer["headers"])
+        out.writerows(_format_rows(writer, columns, n))
+    return n
+
+
+def open_log_writer(path, headers, flags=(), missing=None, binary=None):
+    """
+    Opens a log file and starts its writer thread.
+
+    Args:
+        path (str): Output file; binary when it ends in ".bin" (unless
+                    `binary` says otherwise), CSV otherwise.
+        headers: CSV header order, starting with "cycle".
+        flags: Headers exported as plain ints instead of hex strings.
+        missing (dict): header -> CSV fallback for signals absent from the DUT;
+                        binary logs do not store them.
+
+    Returns:
+        Writer state for submit_columns() / submit_rows() / close_log_writer().
+    """
+    binary = path.endswith(".bin") if binary is None else binary
+    missing = dict(missing or {})
+    writer = {
+        "path": path,
+        "binary": binary,
+        "headers": list(headers),
+        "flags": set(flags),
+        "missing": missing,
+        "stored": [key for key in headers if key not in missing],
+        "queue": queue.Queue(maxsize=MAX_PENDING),
+        "error": None,
+        "rows": 0,
+        "batches": 0,
+        "blocked_s": 0.0,
+    }
+    if binary:
+        writer["file"] = open(path, "wb")
+        meta = json.dumps({"headers": writer["headers"], "columns": writer["stored"],
+                           "flags": sorted(writer["flags"]), "missing": missing}).encode()
+        writer["file"].write(LOG_MAGIC + struct.pack("<I", len(meta)) + meta)
+    else:
+        writer["file"] = open(path, "w", newline="")
+        writer["csv"] = csv.writer(writer["file"])
+        writer["csv"].writerow(writer["headers"])
+    writer["thread"] = threading.Thread(target=_write_loop, args=(writer,), name=f"log-writer:{path}", daemon=True)
+    writer["thread"].start()
+    return writer
+
+
+def _put(writer, item):
+    try:
+        writer["queue"].put_nowait(item)
+    except queue.Full:
+        start = time.perf_counter()
+        writer["queue"].put(item)
+        writer["blocked_s"] += time.perf_counter() - start
+
+
+def submit_columns(writer, columns, count):
+    """
+    Queues the first `count` rows of recorder column buffers
+    ({header: array('Q')}). The rows are copied, so the caller can reuse
+    its buffers right away.
+    """
+    if count:
+        _put(writer, ("columns", {key: columns[key][:count].tobytes() for key in writer["stored"]}))
+
+
+def submit_rows(writer, rows):
+    """
+    Queues row dicts (e.g. expected events) for a CSV log; keys follow the
+    writer's headers, absent keys are written blank.
+    """
+    if writer["binary"]:
+        raise ValueError("Row dicts can only be streamed to a CSV log")
+    if rows:
+        headers = writer["headers"]
+        _put(writer, ("rows", [[row.get(key, "") for key in headers] for row in rows]))
+
+
+def submit_expected_columns(writer, columns):
+    """
+    Queues columnar expected events ({'cycle', header: (values, present)},
+    compare_helper.expected_to_columns()) for a CSV log, blank where not
+    present. The arrays are handed over as they are; do not modify them after.
+    """
+    if writer["binary"]:
+        raise ValueError("Expected columns can only be streamed to a CSV log")
+    if len(columns["cycle"]):
+        _put(writer, ("expected", columns))
+
+
+def close_log_writer(writer):
+    """
+    Waits for the queued batches, closes the file and re-raises any error of
+    the writer thread.
+
+    Returns:
+        {'path', 'rows', 'batches', 'blocked_s'}: blocked_s is the time the
+        simulation waited on a full queue.
+    """
+    writer["queue"].put(None)
+    writer["thread"].join()
+    writer["file"].close()
+    if writer["error"] is not None:
+        raise writer["error"]
+    return {key: writer[key] for key in ("path", "rows", "batches", "blocked_s")}
+
+
+def _read_meta(f, path):
+    if f.read(len(LOG_MAGIC)) != LOG_MAGIC:
+        raise ValueError(f"{path} is not a binary column log")
+    (size,) = struct.unpack("<I", f.read(4))
+    return json.loads(f.read(size))
+
+
+def iter_binary_log(path):
+    """
+    Reads a binary column log block by block.
+
+    Yields:
+        (meta, {column: np.ndarray uint64}) per block.
+    """
+    with open(path, "rb") as f:
+        meta = _read_meta(f, path)
+        while True:
+            head = f.read(4)
+            if len(head) < 4:
+                return
+            (n,) = struct.unpack("<I", head)
+            block = {}
+            for key in meta["columns"]:
+                itemsize = f.read(1)[0]
+                dtype = np.dtype(_ITEM_TYPES[itemsize]).newbyteorder("<")
+                block[key] = np.frombuffer(f.read(n * itemsize), dtype=dtype).astype(np.uint64)
+            yield meta, block
+
+
+def read_log_columns(path):
+    """
+    Reads a streamed log back as raw integer columns, the layout of
+    recorder.get_recorded_columns(): {header: uint64 array}, without the
+    signals absent from the DUT (binary) or the all-blank columns (CSV).
+    """
+    if path.endswith(".bin"):
+        blocks = [block for _, block in iter_binary_log(path)]
+        with open(path, "rb") as f:
+            meta = _read_meta(f, path)
+        return {key: np.concatenate([block[key] for block in blocks]) if blocks else np.zeros(0, np.uint64)
+                for key in meta["columns"]}
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        cells = list(zip(*reader)) or [()] * len(headers)
+    return {key: np.array([int(value, 0) for value in column], dtype=np.uint64)
+            for key, column in zip(headers, cells) if all(column) or not column}
+
+
+def iter_log_columns(path, batch_rows=READ_BATCH_ROWS):
+    """
+    Batched read_log_columns(): a binary log block by block, a CSV log
+    `batch_rows` rows at a time, so a check never holds the whole recording.
+
+    Yields:
+        {header: uint64 array} per batch, in file (cycle) order.
+    """
+    if path.endswith(".bin"):
+        for _, block in iter_binary_log(path):
+            yield block
+        return
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        while True:
+            rows = list(itertools.islice(reader, batch_rows))
+            if not rows:
+                return
+            yield {key: np.array([int(value, 0) for value in column], dtype=np.uint64)
+                   for key, column in zip(headers, zip(*rows)) if all(column)}
+
+
+def iter_expected_columns(path, batch_rows=READ_BATCH_ROWS):
+    """
+    Reads a streamed expected-events CSV (submit_expected_columns() /
+    write_log_columns()) back in batches of `batch_rows` rows.
+
+    Yields:
+        {'cycle': int64 array, header: (uint64 values, bool present)} per
+        batch, the compare_helper.expected_to_columns() layout.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        while True:
+            rows = list(itertools.islice(reader, batch_rows))
+            if not rows:
+                return
+            cells = dict(zip(headers, zip(*rows)))
+            columns = {"cycle": np.array([int(value) for value in cells["cycle"]], dtype=np.int64)}
+            for key in headers[1:]:
+                column = cells[key]
+                columns[key] = (np.array([int(value, 0) if value else 0 for value in column], dtype=np.uint64),
+                                np.array([value != "" for value in column], dtype=bool))
+            yield columns
+
+
+def iter_log_rows(path):
+    """
+    Reads a recorded log as CSV rows, whichever format it was written in.
+
+    Yields:
+        The header row, then one list of CSV cells per row (a binary log is
+        formatted as binary_log_to_csv() would write it).
+    """
+    if not path.endswith(".bin"):
+        with open(path, newline="") as f:
+            yield from csv.reader(f)
+        return
+    with open(path, "rb") as f:
+        meta = _read_meta(f, path)
+    writer = {"headers": meta["headers"], "flags": set(meta["flags"]), "missing": meta["missing"]}
+    yield list(meta["headers"])
+    for _, block in iter_binary_log(path):
+        yield from (list(row) for row in _format_rows(writer, block, len(block["cycle"])))
+
+
+def binary_log_to_csv(path, csv_path):
+    """
+    Converts a binary column log into the CSV layout the testbenches write
+    (same headers, hex cells, int flags, fallbacks for absent signals).
+
+    Returns:
+        Number of rows written.
+    """
+    rows = iter_log_rows(path)
+    with open(csv_path, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(next(rows))
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
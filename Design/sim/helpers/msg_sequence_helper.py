@@ -7,16 +7,19 @@
 #              Used by the full workload generator and test drivers.
 # Author: RZ
 # Start Date: 20250505
-# Version: 0.1
+# Version: 0.3
 #
 # Changelog
 # ============================================================
 # [20250505-1] RZ: Added ITCH message stream constructor for testing.
+# [20261018-1] RZ: shard_sequence() for splitting a workload across simulator processes.
+# [20261018-2] RZ: De Bruijn k-gram transition coverage sequences and coverage report.
 # ============================================================
 
 
 import random
 import itertools
+from collections import deque
 from ITCH_config import MSG_LENGTHS
 
 def generate_msg_sequence(length, weights=None):
@@ -63,6 +66,123 @@ def generate_permutation_coverage_sequence(shuffle=False):
     flat_sequence = [msg for perm in all_perms for msg in perm]
     return flat_sequence
 
- 
- 
 
+
+def generate_transition_coverage_sequence(k=2, message_types=None):
+    """
+    Lazily generate a minimal sequence containing every ordered k-gram of
+    message types exactly once (a linearized de Bruijn sequence, n**k + k - 1
+    messages for n types).
+
+    k=2 covers every type-to-type transition in 37 messages, k=3 every
+    transition pair in 218, versus 4,320 for generate_permutation_coverage_sequence().
+    Repeated types (e.g. add, add) are part of the k-grams.
+
+    Args:
+        k (int): Length of the type k-grams to cover (>= 1).
+        message_types (list, optional): Alphabet; defaults to MSG_LENGTHS order.
+
+    Yields:
+        str: Message types.
+    """
+    if k < 1:
+        raise ValueError("k must be >= 1")
+    message_types = list(message_types or MSG_LENGTHS.keys())
+    n = len(message_types)
+
+    # FKM algorithm: concatenating the Lyndon words whose length divides k, in
+    # lexicographic order, gives the cyclic de Bruijn sequence; it starts with
+    # k-1 copies of the first type, which are repeated at the end to linearize it
+    word = [-1]
+    while word:
+        word[-1] += 1
+        period = len(word)
+        if k % period == 0:
+            for symbol in word:
+                yield message_types[symbol]
+        while len(word) < k:
+            word.append(word[len(word) - period])
+        while word and word[-1] == n - 1:
+            word.pop()
+    for _ in range(k - 1):
+        yield message_types[0]
+
+
+def transition_coverage(sequence, k=2, message_types=None, max_missing=20):
+    """
+    Report how many of the ordered k-grams of message types a sequence covers.
+
+    Args:
+        sequence (iterable): Message types (consumed once; may be a generator).
+        k (int): k-gram length.
+        message_types (list, optional): Alphabet; defaults to MSG_LENGTHS order.
+        max_missing (int): Uncovered k-grams listed in the report.
+
+    Returns:
+        dict: k, messages, bytes (= injection cycles without gaps), total and
+              covered k-gram counts, coverage fraction and example missing k-grams.
+    """
+    message_types = list(message_types or MSG_LENGTHS.keys())
+    window = deque(maxlen=k)
+    seen = set()
+    messages = 0
+    total_bytes = 0
+
+    for msg_type in sequence:
+        messages += 1
+        total_bytes += MSG_LENGTHS[msg_type]
+        window.append(msg_type)
+        if len(window) == k:
+            seen.add(tuple(window))
+
+    total = len(message_types) ** k
+    covered = sum(1 for gram in seen if all(msg in message_types for msg in gram))
+    missing = []
+    if covered < total:
+        for gram in itertools.product(message_types, repeat=k):
+            if gram not in seen:
+                missing.append(list(gram))
+                if len(missing) >= max_missing:
+                    break
+
+    return {
+        "k": k,
+        "messages": messages,
+        "bytes": total_bytes,
+        "total": total,
+        "covered": covered,
+        "coverage": covered / total,
+        "missing": missing,
+    }
+
+
+def format_transition_coverage(coverage):
+    line = (f"{coverage['k']}-gram transition coverage: {coverage['covered']}/{coverage['total']} "
+            f"({coverage['coverage']:.1%}) in {coverage['messages']} messages / {coverage['bytes']} bytes")
+    if coverage["missing"]:
+        line += f"; missing e.g. {' -> '.join(coverage['missing'][0])}"
+    return line
+
+
+def shard_sequence(sequence, shard_index, shard_count, overlap=1):
+    """
+    Returns one contiguous slice of a message sequence for a sharded run.
+
+    Args:
+        sequence (list): Full message sequence.
+        shard_index (int): Slice to return, 0 <= shard_index < shard_count.
+        shard_count (int): Number of shards the sequence is split into.
+        overlap (int): Messages repeated from the end of the previous shard, so
+                       the transitions at shard boundaries are still exercised.
+
+    Returns:
+        list: The messages of this shard.
+    """
+    if shard_count <= 1:
+        return list(sequence)
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"shard_index {shard_index} out of range for {shard_count} shards")
+
+    start = len(sequence) * shard_index // shard_count
+    end = len(sequence) * (shard_index + 1) // shard_count
+    return list(sequence[max(start - overlap, 0):end])
@@ -0,0 +1,403 @@
+# ============================================================
+# order_book_helper.py
+# ============================================================
+#
+# Description: Order-book reconstruction downstream of the canonical parser.
+#              Consumes parser output (recorder_parser.py columns, the parser
+#              CSV log or a live monitor) and maintains per-symbol books:
+#              order_ref -> slot index into array-backed order storage, and
+#              per side a sorted price ladder with aggregated level sizes.
+#              Reports update throughput and checks the rebuilt book against
+#              a book built from the expected parser columns (DUT runs) or the
+#              order-flow generator's live-order set (software-only runs).
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.5
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Array-backed book builder, parser/CSV/live ingestion, generator check.
+# [20261018-2] RZ: load_parser_store(): parser columns from a result store (result_store_helper.py).
+# [20261018-3] RZ: compare_books() against a book built from expected columns; software decoder
+#                  for schedule_columns().
+# [20261018-4] RZ: apply_parser_batches() for batched (streamed) recordings.
+# [20261018-5] RZ: Records until the test ends when total_cycles is None (gapped runs).
+# ============================================================
+
+# Book updates per parsed message (parser output field names):
+#   add:      new order (order_ref, side, shares, price, misc_data = symbol)
+#   cancel:   order_ref loses `shares`; removed when none are left
+#   delete:   order_ref removed
+#   replace:  misc_data = old order_ref removed, new_order_ref added with
+#             shares/price on the same symbol and side
+#   executed: order_ref loses `shares`; removed when none are left
+#   trade:    non-displayed, no book change (counted only)
+# Updates for unknown order refs are counted as errors, not raised, so a
+# dropped Add shows up as a number in the report.
+
+import bisect
+import csv
+import time
+from array import array
+
+from cocotb.triggers import RisingEdge
+
+from ITCH_config import ITCH_MESSAGES
+from .profile_helper import profiled
+from .recorder import monitor_cycles
+
+_PARSED_TYPES = {spec["parsed_type"]: msg_type for msg_type, spec in ITCH_MESSAGES.items()}
+
+# Columns read from the parser output
+BOOK_COLUMNS = ("parsed_type", "order_ref", "side", "shares", "price", "new_order_ref", "misc_data")
+
+
+def new_order_book():
+    """
+    Creates an empty book.
+
+    Returns:
+        Dict with the slot arrays, ref index, symbol table, price ladders and counters.
+    """
+    return {
+        # Order storage: one slot per live order, reused through the free list
+        "slot_ref": array('Q'),
+        "slot_shares": array('Q'),
+        "slot_price": array('Q'),
+        "slot_book": array('I'),  # Index into "ladders": symbol * 2 + side
+        "free": [],
+        "index": {},  # order_ref -> slot
+        # Symbols (parser misc_data integer) -> symbol index
+        "symbols": {},
+        "symbol_names": [],
+        # Per (symbol, side): [sorted prices, {price: [shares, orders]}]
+        "ladders": [],
+        "updates": {msg_type: 0 for msg_type in ITCH_MESSAGES},
+        "errors": {"unknown_ref": 0, "duplicate_ref": 0, "unknown_type": 0},
+        "apply_s": 0.0,
+    }
+
+
+def _symbol_book(book, symbol, side):
+    index = book["symbols"].get(symbol)
+    if index is None:
+        index = book["symbols"][symbol] = len(book["symbol_names"])
+        book["symbol_names"].append(symbol)
+        book["ladders"].extend(([[], {}], [[], {}]))  # Buy, sell
+    return index * 2 + side
+
+
+def _level_add(ladder, price, shares):
+    prices, levels = ladder
+    level = levels.get(price)
+    if level is None:
+        levels[price] = [shares, 1]
+        bisect.insort(prices, price)
+    else:
+        level[0] += shares
+        level[1] += 1
+
+
+def _level_reduce(ladder, price, shares, removed):
+    prices, levels = ladder
+    level = levels[price]
+    level[0] -= shares
+    level[1] -= removed
+    if level[1] == 0:
+        del levels[price]
+        del prices[bisect.bisect_left(prices, price)]
+
+
+def _insert(book, ref, side, shares, price, symbol):
+    if ref in book["index"]:
+        book["errors"]["duplicate_ref"] += 1
+        return
+    ladder_index = _symbol_book(book, symbol, side)
+    if book["free"]:
+        slot = book["free"].pop()
+        book["slot_ref"][slot] = ref
+        book["slot_shares"][slot] = shares
+        book["slot_price"][slot] = price
+        book["slot_book"][slot] = ladder_index
+    else:
+        slot = len(book["slot_ref"])
+        book["slot_ref"].append(ref)
+        book["slot_shares"].append(shares)
+        book["slot_price"].append(price)
+        book["slot_book"].append(ladder_index)
+    book["index"][ref] = slot
+    _level_add(book["ladders"][ladder_index], price, shares)
+
+
+def _reduce(book, ref, shares=None):
+    # Removes `shares` (all when None) from an order; returns the freed slot's book index or None
+    slot = book["index"].get(ref)
+    if slot is None:
+        book["errors"]["unknown_ref"] += 1
+        return None
+    remaining = book["slot_shares"][slot]
+    taken = remaining if shares is None else min(shares, remaining)
+    ladder_index = book["slot_book"][slot]
+    removed = taken == remaining
+    _level_reduce(book["ladders"][ladder_index], book["slot_price"][slot], taken, int(removed))
+    if removed:
+        del book["index"][ref]
+        book["free"].append(slot)
+    else:
+        book["slot_shares"][slot] = remaining - taken
+    return ladder_index
+
+
+def apply_book_message(book, msg_type, order_ref=0, side=0, shares=0, price=0, new_order_ref=0, misc_data=0):
+    """
+    Applies one parsed message to the book (field meanings as in the parser
+    output; see the table above).
+    """
+    if msg_type == "add":
+        _insert(book, order_ref, side, shares, price, misc_data)
+    elif msg_type == "delete":
+        _reduce(book, order_ref)
+    elif msg_type == "cancel" or msg_type == "executed":
+        _reduce(book, order_ref, shares)
+    elif msg_type == "replace":
+        ladder_index = _reduce(book, misc_data)
+        if ladder_index is not None:
+            _insert(book, new_order_ref, ladder_index & 1, shares, price, book["symbol_names"][ladder_index >> 1])
+    elif msg_type != "trade":
+        book["errors"]["unknown_type"] += 1
+        return
+    book["updates"][msg_type] += 1
+
+
+def _column_values(column):
+    # Expected columns are (values, present); values are 0 where not present
+    values = column[0] if isinstance(column, tuple) else column
+    return values.tolist() if hasattr(values, "tolist") else values
+
+
+@profiled("order_book")
+def apply_parser_columns(book, columns):
+    """
+    Rebuilds the book from recorded parser columns
+    (recorder_parser.get_recorded_columns(), load_parser_csv() or
+    load_parser_store()) or from expected parser columns
+    (compare_helper.expected_to_columns()).
+
+    Returns:
+        Number of parsed messages applied.
+    """
+    valid = _column_values(columns["parsed_valid"])
+    rows = [i for i in range(len(valid)) if valid[i] == 1]
+    fields = []
+    for key in BOOK_COLUMNS:
+        values = _column_values(columns[key]) if key in columns else None
+        fields.append([values[i] for i in rows] if values is not None else [0] * len(rows))
+
+    start = time.perf_counter()
+    for parsed_type, order_ref, side, shares, price, new_order_ref, misc_data in zip(*fields):
+        msg_type = _PARSED_TYPES.get(parsed_type)
+        if msg_type is None:
+            book["errors"]["unknown_type"] += 1
+            continue
+        apply_book_message(book, msg_type, order_ref, side, shares, price, new_order_ref, misc_data)
+    book["apply_s"] += time.perf_counter() - start
+    return len(rows)
+
+
+def apply_parser_batches(book, batches):
+    """
+    Applies batches of recorded parser columns
+    (log_writer_helper.iter_log_columns()) to the book as they are consumed,
+    passing each batch on, so a streamed recording feeds the book and the
+    windowed check in one read.
+    """
+    for batch in batches:
+        apply_parser_columns(book, batch)
+        yield batch
+
+
+def schedule_columns(schedule):
+    """
+    Decodes an injection schedule with the software decoder into the parser
+    output columns (as the parser reports every message, misc_data included),
+    for book checks and throughput baselines without a simulation.
+    """
+    from .software_decoder_helper import decode_stream
+
+    decoded = decode_stream(b"".join(bytes(event["payload"]) for event in schedule), records=False)
+    columns = {key: decoded[key] for key in BOOK_COLUMNS}
+    columns["parsed_valid"] = [1] * decoded["count"]
+    return columns
+
+
+def apply_schedule(book, schedule):
+    """
+    Applies an injection schedule through schedule_columns().
+
+    Returns:
+        Number of messages applied.
+    """
+    return apply_parser_columns(book, schedule_columns(schedule))
+
+
+def load_parser_csv(path):
+    """
+    Reads a parser CSV log (parser_recorded_log.csv) into integer columns
+    accepted by apply_parser_columns(); blank cells read as 0.
+    """
+    columns = {key: [] for key in ("parsed_valid",) + BOOK_COLUMNS}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            for key, column in columns.items():
+                value = row.get(key, "")
+                column.append(int(value, 16) if isinstance(value, str) and value.startswith("0x")
+                              else int(value or 0))
+    return columns
+
+
+def load_parser_store(path, cycles=None):
+    """
+    Reads the parsed_valid rows of a parser log's result store
+    (query_results.py build parser_recorded_log.csv), optionally within a
+    (first, last) cycle window, as columns for apply_parser_columns();
+    blank cells read as 0. Only the book's columns are paged in.
+    """
+    from .result_store_helper import open_result_store, close_result_store, select_rows
+
+    store = open_result_store(path)
+    try:
+        keys = [key for key in ("parsed_valid",) + BOOK_COLUMNS if key in store["headers"]]
+        selection = select_rows(store, cycles, msg_types=list(_PARSED_TYPES), fields=keys)
+    finally:
+        close_result_store(store)
+    return {key: selection[key][0].tolist() for key in keys}
+
+
+async def monitor_order_book(dut, book, total_cycles):
+    """
+    Live monitor: applies every parsed_valid cycle to the book while the
+    simulation runs, instead of after the recording.
+    """
+    signals = [getattr(dut, key, None) for key in BOOK_COLUMNS]
+    for _ in monitor_cycles(total_cycles):
+        await RisingEdge(dut.clk)
+        if dut.parsed_valid.value != 1:
+            continue
+        values = [int(signal.value) if signal is not None else 0 for signal in signals]
+        msg_type = _PARSED_TYPES.get(values[0])
+        if msg_type is None:
+            book["errors"]["unknown_type"] += 1
+            continue
+        apply_book_message(book, msg_type, *values[1:])
+
+
+def book_levels(book, symbol, depth=5):
+    """
+    Top `depth` levels of one symbol (parser misc_data integer).
+
+    Returns:
+        {'bids': [(price, shares, orders)] best first, 'asks': [...]}
+    """
+    index = book["symbols"].get(symbol)
+    if index is None:
+        return {"bids": [], "asks": []}
+    bids, asks = book["ladders"][index * 2], book["ladders"][index * 2 + 1]
+    return {
+        "bids": [(price, *bids[1][price]) for price in reversed(bids[0][-depth:])],
+        "asks": [(price, *asks[1][price]) for price in asks[0][:depth]],
+    }
+
+
+def book_orders(book):
+    """
+    Live orders as {order_ref: (side, shares, price, symbol)}.
+    """
+    return {ref: (book["slot_book"][slot] & 1, book["slot_shares"][slot], book["slot_price"][slot],
+                  book["symbol_names"][book["slot_book"][slot] >> 1])
+            for ref, slot in book["index"].items()}
+
+
+def compare_book_to_flow(book, flow, max_examples=10):
+    """
+    End-to-end check of a rebuilt book against the order-flow generator state
+    (order_flow_helper.new_order_flow()) that produced the stream. Only valid
+    when every message reached the book (software runs): the DUT drops
+    same-type repeats, so DUT-fed books are checked with compare_books().
+
+    Returns:
+        Dict with 'passed', missing/unexpected/mismatched order counts and examples.
+    """
+    expected = {ref: (int(sell), shares, price, int.from_bytes(flow["symbols"][symbol], "big"))
+                for ref, (sell, shares, price, symbol) in flow["orders"].items()}
+    return _compare_orders(expected, book_orders(book), max_examples)
+
+
+def compare_books(book, expected_book, max_examples=10):
+    """
+    Checks a book fed by the DUT against one built from the expected parser
+    columns of the same run (schedule or reference model).
+
+    Returns:
+        Dict shaped like compare_book_to_flow()'s.
+    """
+    return _compare_orders(book_orders(expected_book), book_orders(book), max_examples)
+
+
+def _compare_orders(expected, actual, max_examples):
+    missing = [ref for ref in expected if ref not in actual]
+    unexpected = [ref for ref in actual if ref not in expected]
+    mismatched = [ref for ref in expected if ref in actual and expected[ref] != actual[ref]]
+    return {
+        "passed": not (missing or unexpected or mismatched),
+        "expected_orders": len(expected),
+        "book_orders": len(actual),
+        "missing": len(missing),
+        "unexpected": len(unexpected),
+        "mismatched": len(mismatched),
+        "examples": [{"order_ref": ref, "expected": expected[ref], "book": actual[ref]}
+                     for ref in mismatched[:max_examples]] + [{"order_ref": ref, "expected": expected[ref], "book": None}
+                                                              for ref in missing[:max_examples]],
+    }
+
+
+def build_book_report(book, flow=None, expected_book=None):
+    """
+    Summarizes the book and its update throughput; with the generator state
+    of an order-flow run or a book built from the expected columns, also
+    compares the book against it ('generator_check' / 'expected_check').
+    """
+    updates = sum(book["updates"].values())
+    report = {
+        "updates": updates,
+        "updates_per_type": dict(book["updates"]),
+        "errors": dict(book["errors"]),
+        "live_orders": len(book["index"]),
+        "symbols": len(book["symbol_names"]),
+        "price_levels": sum(len(ladder[0]) for ladder in book["ladders"]),
+        "order_slots": len(book["slot_ref"]),
+        "apply_s": book["apply_s"],
+        "updates_per_second": updates / book["apply_s"] if book["apply_s"] else 0.0,
+    }
+    if flow is not None:
+        report["generator_check"] = compare_book_to_flow(book, flow)
+    if expected_book is not None:
+        report["expected_check"] = compare_books(book, expected_book)
+    return report
+
+
+def format_book_report(report):
+    lines = [
+        f"Order book: {report['updates']} updates, {report['live_orders']} live orders on "
+        f"{report['symbols']} symbols / {report['price_levels']} price levels "
+        f"({report['updates_per_second']:.0f} updates/s)",
+    ]
+    errors = {key: count for key, count in report["errors"].items() if count}
+    if errors:
+        lines.append(f"  errors: {errors}")
+    for key, label in (("generator_check", "generator"), ("expected_check", "expected book")):
+        if key in report:
+            check = report[key]
+            lines.append(f"  vs {label}: {'match' if check['passed'] else 'MISMATCH'} "
+                         f"({check['missing']} missing, {check['unexpected']} unexpected, "
+                         f"{check['mismatched']} mismatched of {check['expected_orders']})")
+    return "\n".join(lines)
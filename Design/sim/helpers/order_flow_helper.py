@@ -0,0 +1,360 @@
+# ============================================================
+# order_flow_helper.py
+# ============================================================
+#
+# Description: Stateful order-flow generator. Message types follow a Markov
+#              chain over an empirical type mix, and a live-order set (O(1)
+#              insert, random sample and removal) makes every Cancel, Delete,
+#              Replace and Executed reference an outstanding Add. Shares,
+#              prices and symbols follow production-like distributions. Chunks
+#              are encoded with the NumPy batch encoder, so runs of tens of
+#              millions of messages stay within bounded memory.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Markov type chain, live-order set and field distributions.
+# [20261018-2] RZ: Mid steps stay inside the resting spread, so books never cross.
+# ============================================================
+
+# Parameters (ORDER_FLOW_PARAMS in sim_config.py):
+#   mix:         stationary type weights; roughly the share of these six types
+#                in a NASDAQ TotalView-ITCH day (Adds and Deletes dominate)
+#   transitions: optional {prev type: {next type: weight}} Markov chain; None
+#                draws every type from `mix`
+#   max_live:    live-order cap; Adds beyond it become Deletes
+#   symbols:     number of instruments; popularity is Zipf(zipf_s)
+#   odd_lot / round_lot_p / max_lots: share sizes; odd lots are 1-99, round
+#                lots 100 x Geometric(round_lot_p) capped at max_lots
+#   depth_p:     quotes rest Geometric(depth_p) ticks away from the mid; the
+#                mid drifts a tick now and then but never past the best resting
+#                bid/ask, so bids stay below every ask (no crossed or locked book)
+#   mean_gap_ns: mean of the exponential inter-arrival time (timestamps)
+#
+# Removal types drawn while no order is live are turned into Adds.
+
+import bisect
+import heapq
+import itertools
+import math
+
+import numpy as np
+
+from sim_config import RESET_CYCLES
+from ITCH_config import ITCH_MESSAGES
+from .payload_batch_helper import MSG_TYPES, MSG_DTYPES, encode_payload_records
+from .profile_helper import profiled
+
+_CODES = {msg_type: code for code, msg_type in enumerate(MSG_TYPES)}
+_ADD, _CANCEL, _DELETE = _CODES["add"], _CODES["cancel"], _CODES["delete"]
+_REPLACE, _EXECUTED, _TRADE = _CODES["replace"], _CODES["executed"], _CODES["trade"]
+_REMOVALS = (_CANCEL, _DELETE, _REPLACE, _EXECUTED)
+
+# Uniform draws consumed per message: type, order pick, shares (2), price (2), symbol, side, clock
+_DRAWS = 9
+
+
+def _cumulative(weights):
+    total = float(sum(weights.get(msg_type, 0) for msg_type in MSG_TYPES))
+    return np.cumsum([weights.get(msg_type, 0) / total for msg_type in MSG_TYPES]).tolist()
+
+
+def new_order_flow(params, seed=None):
+    """
+    Creates the generator state threaded through every chunk of a run.
+
+    Args:
+        params (dict): See above (ORDER_FLOW_PARAMS).
+        seed: Optional seed; the flow is reproducible for a given seed.
+
+    Returns:
+        Dict with the RNG, Markov tables, symbol pool, live-order set and counters.
+    """
+    rng = np.random.default_rng(seed)
+    transitions = params.get("transitions")
+    stationary = _cumulative(params["mix"])
+    chain = [_cumulative(transitions[msg_type]) if transitions and msg_type in transitions else stationary
+             for msg_type in MSG_TYPES]
+
+    # Symbol pool: 3-6 letters, space padded; Zipf popularity and a start mid per symbol
+    count = params["symbols"]
+    letters = rng.integers(ord('A'), ord('Z') + 1, size=(count, 8), dtype=np.uint8)
+    letters[np.arange(8) >= rng.integers(3, 7, size=(count, 1))] = ord(' ')
+    popularity = 1.0 / np.arange(1, count + 1) ** params["zipf_s"]
+
+    return {
+        "params": dict(params),
+        "rng": rng,
+        "chain": chain,
+        "stationary": stationary,
+        "symbols": [bytes(row) for row in letters],
+        "symbol_cdf": np.cumsum(popularity / popularity.sum()).tolist(),
+        "mids": rng.integers(10_0000, 500_0000, size=count).tolist(),  # 4 implied decimals
+        # Live-order set: refs in a list for O(1) sampling, ref -> list position for
+        # O(1) swap-removal, ref -> [side, shares, price, symbol index]
+        "live_refs": [],
+        "live_pos": {},
+        "orders": {},
+        # Resting prices per (symbol, side), symbol * 2 + sell: [{price: orders}, price heap]
+        # (bids negated); emptied levels leave the heap lazily
+        "levels": [[{}, []] for _ in range(count * 2)],
+        "prev": _ADD,
+        "next_ref": 1,
+        "next_match": 1,
+        "clock_ns": 0,
+        "messages": 0,
+        "cycles": 0,
+        "counts": [0] * len(MSG_TYPES),
+    }
+
+
+def _live_add(state, ref, order):
+    state["live_pos"][ref] = len(state["live_refs"])
+    state["live_refs"].append(ref)
+    state["orders"][ref] = order
+    sell, _, price, symbol = order
+    counts, heap = state["levels"][symbol * 2 + sell]
+    if price in counts:
+        counts[price] += 1
+    else:
+        counts[price] = 1
+        heapq.heappush(heap, price if sell else -price)
+        if len(heap) > 2 * len(counts) + 64:
+            # Drop stale entries of emptied levels so long runs stay bounded
+            heap[:] = [price if sell else -price for price in counts]
+            heapq.heapify(heap)
+
+
+def _live_remove(state, ref):
+    refs, pos = state["live_refs"], state["live_pos"]
+    index = pos.pop(ref)
+    last = refs.pop()
+    if last != ref:
+        refs[index] = last
+        pos[last] = index
+    order = state["orders"].pop(ref)
+    sell, _, price, symbol = order
+    counts = state["levels"][symbol * 2 + sell][0]
+    counts[price] -= 1
+    if counts[price] == 0:
+        del counts[price]
+    return order
+
+
+def _best_price(state, symbol, sell):
+    # Best resting ask (sell) or bid, None when that side is empty
+    counts, heap = state["levels"][symbol * 2 + sell]
+    while heap and (heap[0] if sell else -heap[0]) not in counts:
+        heapq.heappop(heap)
+    if not heap:
+        return None
+    return heap[0] if sell else -heap[0]
+
+
+def _step_mid(state, symbol, u):
+    # A tick up or down now and then, but never past the best bid / ask: new
+    # quotes rest at least a tick from the mid, so they cannot cross the book
+    mids = state["mids"]
+    mid = mids[symbol] + (1 if u < 0.05 else -1 if u > 0.95 else 0)
+    if mid > mids[symbol]:
+        best_ask = _best_price(state, symbol, True)
+        if best_ask is not None and mid > best_ask:
+            mid = best_ask
+    elif mid < mids[symbol]:
+        best_bid = _best_price(state, symbol, False)
+        if best_bid is not None and mid < best_bid:
+            mid = best_bid
+    mids[symbol] = max(mid, 1)
+
+
+def _draw_shares(params, u_lot, u_size):
+    if u_lot < params["odd_lot"]:
+        return 1 + int(u_size * 99)
+    # Inverse-CDF geometric number of round lots
+    lots = 1 + int(math.log1p(-u_size) / math.log1p(-params["round_lot_p"]))
+    return 100 * min(lots, params["max_lots"])
+
+
+def _draw_offset(params, u):
+    return 1 + int(math.log1p(-u) / math.log1p(-params["depth_p"]))
+
+
+def _bisect(cdf, u):
+    return min(bisect.bisect_right(cdf, u), len(cdf) - 1)
+
+
+def generate_order_flow(state, count):
+    """
+    Generates the next `count` messages of the flow.
+
+    Returns:
+        (types, records): np.ndarray[uint8] type codes (index into MSG_TYPES)
+        and per-type MSG_DTYPES records in plan order, as taken by
+        payload_batch_helper.encode_payload_records().
+    """
+    params = state["params"]
+    chain = state["chain"]
+    symbols, symbol_cdf, mids = state["symbols"], state["symbol_cdf"], state["mids"]
+    live_refs, orders = state["live_refs"], state["orders"]
+    max_live = params["max_live"]
+    mean_gap = params["mean_gap_ns"]
+
+    draws = state["rng"].random((count, _DRAWS)).tolist()
+    types = np.empty(count, dtype=np.uint8)
+    fields = {code: [] for code in range(len(MSG_TYPES))}
+    prev = state["prev"]
+
+    for i, (u_type, u_pick, u_lot, u_size, u_px, u_px2, u_sym, u_side, u_clock) in enumerate(draws):
+        state["clock_ns"] += 1 + int(-mean_gap * math.log1p(-u_clock))
+        code = _bisect(chain[prev], u_type)
+        if code in _REMOVALS and not live_refs:
+            code = _ADD
+        elif code == _ADD and len(live_refs) >= max_live:
+            code = _DELETE
+
+        if code == _ADD or code == _TRADE:
+            symbol = _bisect(symbol_cdf, u_sym)
+            sell = u_side < 0.5
+            # Step the mid within the spread; quotes rest away from it, trades print at it
+            _step_mid(state, symbol, u_px2)
+            shares = _draw_shares(params, u_lot, u_size)
+            if code == _ADD:
+                offset = _draw_offset(params, u_px)
+                price = max(mids[symbol] + (offset if sell else -offset), 1)
+                ref = state["next_ref"]
+                state["next_ref"] += 1
+                _live_add(state, ref, [sell, shares, price, symbol])
+                fields[code].append((ref, ord('S') if sell else ord('B'), shares, symbols[symbol], price))
+            else:
+                match = state["next_match"]
+                state["next_match"] += 1
+                # Non-displayed trades carry no order reference
+                fields[code].append((state["clock_ns"], 0, ord('S') if sell else ord('B'), shares,
+                                     symbols[symbol], mids[symbol], match))
+        else:
+            ref = live_refs[int(u_pick * len(live_refs))]
+            order = orders[ref]
+            sell, remaining, price, symbol = order
+            if code == _CANCEL:
+                # Partial cancel; cancelling what is left takes the order off the book
+                canceled = min(1 + int(u_size * (remaining - 1)), remaining) if remaining > 1 else remaining
+                order[1] -= canceled
+                if order[1] == 0:
+                    _live_remove(state, ref)
+                fields[code].append((ref, canceled))
+            elif code == _DELETE:
+                _live_remove(state, ref)
+                fields[code].append((ref,))
+            elif code == _REPLACE:
+                _live_remove(state, ref)
+                new_ref = state["next_ref"]
+                state["next_ref"] += 1
+                new_shares = _draw_shares(params, u_lot, u_size)
+                offset = _draw_offset(params, u_px)
+                new_price = max(mids[symbol] + (offset if sell else -offset), 1)
+                _live_add(state, new_ref, [sell, new_shares, new_price, symbol])
+                fields[code].append((ref, new_ref, new_shares, new_price))
+            else:
+                executed = min(_draw_shares(params, u_lot, u_size), remaining)
+                order[1] -= executed
+                if order[1] == 0:
+                    _live_remove(state, ref)
+                match = state["next_match"]
+                state["next_match"] += 1
+                fields[code].append((state["clock_ns"], ref, executed, match))
+
+        types[i] = code
+        state["counts"][code] += 1
+        prev = code
+
+    state["prev"] = prev
+    state["messages"] += count
+    return types, {msg_type: _to_records(msg_type, fields[code]) for code, msg_type in enumerate(MSG_TYPES)}
+
+
+# Field names filled per type, in the tuple order used by generate_order_flow()
+_FIELDS = {
+    "add":      ("order_ref", "side", "shares", "symbol", "price"),
+    "cancel":   ("order_ref", "shares"),
+    "delete":   ("order_ref",),
+    "replace":  ("old_order_ref", "new_order_ref", "shares", "price"),
+    "executed": ("timestamp", "order_ref", "shares", "match_id"),
+    "trade":    ("timestamp", "order_ref", "side", "shares", "symbol", "price", "match_id"),
+}
+
+
+def _to_records(msg_type, rows):
+    dtype = MSG_DTYPES[msg_type]
+    recs = np.zeros(len(rows), dtype=dtype)
+    recs["msg_type"] = ITCH_MESSAGES[msg_type]["type_byte"]
+    if not rows:
+        return recs
+    for name, column in zip(_FIELDS[msg_type], zip(*rows)):
+        if name == "timestamp":
+            # 48-bit big-endian timestamp as 6 raw bytes
+            ts = np.array(column, dtype=np.uint64).astype(">u8")
+            recs[name] = ts.view(np.uint8).reshape(len(rows), 8)[:, 2:]
+        else:
+            recs[name] = column
+    return recs
+
+
+@profiled("workload_generation")
+def iter_order_flow_workload(total_messages, params, chunk_messages=4096, seed=None, state=None):
+    """
+    Lazily generates an order-flow workload in chunks, shaped like
+    full_workload_helper.iter_payload_workload()'s chunks.
+
+    Args:
+        total_messages (int): Messages in the run (None: unbounded).
+        params (dict): ORDER_FLOW_PARAMS.
+        chunk_messages (int): Messages per chunk.
+        seed: Optional seed.
+        state: Optional existing state from new_order_flow() (e.g. to inspect
+               the live-order set afterwards).
+
+    Yields:
+        {
+            'full_stream': bytes for this chunk,
+            'injection_schedule': List[Dict] with keys
+                'type', 'payload', 'expected_valid_cycle'
+        }
+    """
+    if state is None:
+        state = new_order_flow(params, seed)
+    remaining = itertools.count() if total_messages is None else iter(range(total_messages, 0, -chunk_messages))
+
+    for left in remaining:
+        count = chunk_messages if total_messages is None else min(left, chunk_messages)
+        types, records = generate_order_flow(state, count)
+        batch = encode_payload_records(types, records)
+        stream = batch["stream"].tobytes()
+        starts = batch["offsets"].tolist()
+        ends = starts[1:] + [len(stream)]
+        base = state["cycles"]
+
+        schedule = [{
+            "type": MSG_TYPES[code],
+            "payload": stream[start:end],
+            "expected_valid_cycle": base + end + RESET_CYCLES
+        } for code, start, end in zip(types.tolist(), starts, ends)]
+
+        state["cycles"] += len(stream)
+        yield {
+            "full_stream": stream,
+            "injection_schedule": schedule
+        }
+
+
+def order_flow_summary(state):
+    """
+    Counters of a flow: messages per type, live orders and the live-set size.
+    """
+    return {
+        "messages": state["messages"],
+        "per_type": dict(zip(MSG_TYPES, state["counts"])),
+        "live_orders": len(state["live_refs"]),
+        "next_order_ref": state["next_ref"],
+    }
@@ -0,0 +1,225 @@
+# ============================================================
+# parallel_decoder_helper.py
+# ============================================================
+#
+# Description: Multi-process chunked decode of large stream files with the
+#              software decoder (software_decoder_helper.py). The file is
+#              split into byte ranges decoded by a process pool; each worker
+#              mmaps the file, resynchronizes at its range start with the
+#              message-length table and writes its canonical columns into a
+#              shared-memory slot, so only a few integers travel back through
+#              the pool. Ranges are merged in file order and checked for
+#              framing agreement at every boundary.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Process-pool range decode, shared-memory slots, ordered merge.
+# ============================================================
+
+# Boundary check: a range's 'stop' (where the serial decoder would continue)
+# must equal the next range's resync point. When they differ (a false resync
+# inside payload bytes) the next range is decoded again in the parent from
+# 'stop', so the merged result always equals a single-process decode_stream().
+#
+# Shared-memory slot layout (capacity = most messages a range can hold):
+#   offsets int64 | types uint8 | per canonical column: values uint64, present bool
+
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ITCH_config import MSG_LENGTHS
+from .software_decoder_helper import CANONICAL_COLUMNS, decode_range
+
+# Smallest range handed to a worker
+MIN_CHUNK_BYTES = 1 << 16
+
+_SLOT_ARRAYS = [("offsets", np.int64), ("types", np.uint8)] + \
+               [(key, dtype) for column in CANONICAL_COLUMNS
+                for key, dtype in ((column, np.uint64), (f"{column}_present", bool))]
+
+
+def _slot_views(buf, capacity):
+    # Named arrays over a slot's buffer (layout above)
+    views = {}
+    offset = 0
+    for key, dtype in _SLOT_ARRAYS:
+        size = capacity * np.dtype(dtype).itemsize
+        views[key] = np.ndarray(capacity, dtype=dtype, buffer=buf, offset=offset)
+        offset += size
+    return views
+
+
+def _slot_bytes(capacity):
+    return sum(capacity * np.dtype(dtype).itemsize for _, dtype in _SLOT_ARRAYS)
+
+
+def _store(views, decoded):
+    count = decoded["count"]
+    views["offsets"][:count] = decoded["offsets"]
+    views["types"][:count] = decoded["types"]
+    for column in CANONICAL_COLUMNS:
+        views[column][:count] = decoded[column]
+        views[f"{column}_present"][:count] = decoded["present"][column]
+
+
+def _decode_worker(path, start, end, slot_name, capacity):
+    # Runs in a pool process: decode one range straight into a shared-memory slot
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        decoded = decode_range(mm, start, end)
+    slot = shared_memory.SharedMemory(name=slot_name)
+    try:
+        views = _slot_views(slot.buf, capacity)
+        _store(views, decoded)
+        del views
+    finally:
+        slot.close()
+    return decoded["count"], decoded["sync"], decoded["stop"], decoded["skipped_bytes"]
+
+
+def _collect(views, count):
+    # Copies a slot out before it is reused; same keys as decode_stream()
+    decoded = {
+        "count": count,
+        "offsets": views["offsets"][:count].copy(),
+        "types": views["types"][:count].copy(),
+        "present": {column: views[f"{column}_present"][:count].copy() for column in CANONICAL_COLUMNS},
+    }
+    for column in CANONICAL_COLUMNS:
+        decoded[column] = views[column][:count].copy()
+    return decoded
+
+
+class _empty:
+    # Stand-in for the mmap of an empty file (mmap cannot map 0 bytes)
+    def __enter__(self):
+        return b""
+
+    def __exit__(self, *exc):
+        return False
+
+
+def iter_parallel_decode(path, workers=None, chunk_bytes=32 << 20, stats=None):
+    """
+    Decodes a file of back-to-back messages with a process pool, yielding
+    the ranges in file order.
+
+    Args:
+        path (str): Stream file.
+        workers (int): Pool processes (default: CPU count).
+        chunk_bytes (int): Bytes per range (at least MIN_CHUNK_BYTES).
+        stats (dict): Optional; filled with ranges, repaired boundaries and seconds.
+
+    Yields:
+        Per range: decode_stream()-style dict (count, offsets into the file,
+        types, canonical columns, present) plus 'sync', 'stop' and
+        'skipped_bytes'. No per-type records.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_bytes = max(int(chunk_bytes), MIN_CHUNK_BYTES)
+    size = os.path.getsize(path)
+    ranges = [(start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+    capacity = chunk_bytes // min(MSG_LENGTHS.values()) + 1
+    stats = {} if stats is None else stats
+    stats.update({"ranges": len(ranges), "repaired": 0, "workers": workers, "chunk_bytes": chunk_bytes})
+    begin = time.perf_counter()
+
+    slots = [shared_memory.SharedMemory(create=True, size=_slot_bytes(capacity))
+             for _ in range(min(2 * workers, len(ranges)))]
+    views = [_slot_views(slot.buf, capacity) for slot in slots]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool, open(path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else _empty() as mm:
+            pending = []
+            submitted = 0
+
+            def submit(index):
+                start, end = ranges[index]
+                slot = index % len(slots)
+                pending.append((index, slot, pool.submit(_decode_worker, path, start, end,
+                                                         slots[slot].name, capacity)))
+
+            while submitted < min(len(slots), len(ranges)):
+                submit(submitted)
+                submitted += 1
+
+            stop = 0
+            while pending:
+                index, slot, future = pending.pop(0)
+                count, sync, range_stop, skipped = future.result()
+                if sync == stop:
+                    decoded = _collect(views[slot], count)
+                else:
+                    # False resync: decode the range again from where the previous one stopped
+                    stats["repaired"] += 1
+                    decoded = decode_range(mm, stop, ranges[index][1], resync=False)
+                    sync, range_stop, skipped = decoded["sync"], decoded["stop"], decoded["skipped_bytes"]
+                    decoded.pop("raw")
+                decoded.update({"sync": sync, "stop": range_stop, "skipped_bytes": skipped})
+                stop = range_stop
+
+                if submitted < len(ranges):
+                    submit(submitted)
+                    submitted += 1
+                yield decoded
+    finally:
+        del views
+        for slot in slots:
+            slot.close()
+            slot.unlink()
+        stats["seconds"] = time.perf_counter() - begin
+
+
+def parallel_decode_file(path, workers=None, chunk_bytes=32 << 20, stats=None):
+    """
+    Decodes a whole file with iter_parallel_decode() and concatenates the
+    ranges. The result matches decode_stream() of the file (without per-type
+    records); 'raw' is a read-only memmap of the file, so
+    decoded_expected_columns() works in both layouts.
+    """
+    parts = list(iter_parallel_decode(path, workers, chunk_bytes, stats))
+    decoded = {
+        "count": sum(part["count"] for part in parts),
+        "offsets": np.concatenate([part["offsets"] for part in parts]) if parts else np.zeros(0, np.int64),
+        "types": np.concatenate([part["types"] for part in parts]) if parts else np.zeros(0, np.uint8),
+        "present": {column: np.concatenate([part["present"][column] for part in parts]) if parts
+                    else np.zeros(0, bool) for column in CANONICAL_COLUMNS},
+        "raw": np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, np.uint8),
+        "consumed": parts[-1]["stop"] if parts else 0,
+        "skipped_bytes": sum(part["skipped_bytes"] for part in parts),
+    }
+    for column in CANONICAL_COLUMNS:
+        decoded[column] = np.concatenate([part[column] for part in parts]) if parts else np.zeros(0, np.uint64)
+    return decoded
+
+
+def parallel_decoder_scaling(path, worker_counts, chunk_bytes=32 << 20):
+    """
+    Decode time of a file per pool size, for the scaling table of
+    run_software_decoder.py.
+
+    Returns:
+        List of {'workers', 'seconds', 'mb_per_second', 'messages_per_second', 'speedup', 'repaired'}.
+    """
+    size = os.path.getsize(path)
+    rows = []
+    for workers in worker_counts:
+        stats = {}
+        messages = sum(part["count"] for part in iter_parallel_decode(path, workers, chunk_bytes, stats))
+        seconds = stats["seconds"]
+        rows.append({
+            "workers": workers,
+            "seconds": seconds,
+            "mb_per_second": size / seconds / 1e6 if seconds else 0.0,
+            "messages_per_second": messages / seconds if seconds else 0.0,
+            "speedup": rows[0]["seconds"] / seconds if rows and seconds else 1.0,
+            "repaired": stats["repaired"],
+        })
+    return rows
@@ -0,0 +1,196 @@
+# ============================================================
+# payload_batch_helper.py
+# ============================================================
+#
+# Description: Vectorized batch encoder for ITCH payloads.
+#              Fills per-type big-endian NumPy structured arrays for a whole
+#              message plan in one shot and serializes them into a single
+#              contiguous uint8 stream with a per-message offset index.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.3
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial batch generator mirroring payload_generator_helper.py.
+# [20261018-2] RZ: Structured dtypes generated from the ITCH_MESSAGES layout table.
+# [20261018-3] RZ: encode_payload_records() split out for generators that fill their own records.
+# ============================================================
+
+import numpy as np
+
+from ITCH_config import ITCH_MESSAGES, MSG_LENGTHS
+from .layout_helper import layout_dtype
+from .payload_generator_helper import (
+    generate_add_order_payload,
+    generate_cancel_order_payload,
+    generate_delete_order_payload,
+    generate_replace_order_payload,
+    generate_executed_order_payload,
+    generate_trade_payload)
+
+# Wire layouts compiled from the ITCH_MESSAGES table (same bytes as payload_generator_helper.py)
+MSG_DTYPES = {msg_type: layout_dtype(msg_type) for msg_type in ITCH_MESSAGES}
+
+MSG_TYPES = list(MSG_LENGTHS.keys())
+
+_SET_PAYLOADS = {
+    "add":      generate_add_order_payload,
+    "cancel":   generate_cancel_order_payload,
+    "delete":   generate_delete_order_payload,
+    "replace":  generate_replace_order_payload,
+    "executed": generate_executed_order_payload,
+    "trade":    generate_trade_payload,
+}
+
+_TYPE_BYTES = {msg_type: spec["type_byte"] for msg_type, spec in ITCH_MESSAGES.items()}
+
+
+def _rand_u64(rng, n):
+    return rng.integers(0, np.iinfo(np.uint64).max, size=n, dtype=np.uint64, endpoint=True)
+
+
+def _rand_timestamp(rng, n):
+    # 48-bit big-endian timestamp as 6 raw bytes
+    ts = rng.integers(0, 1 << 48, size=n, dtype=np.uint64).astype(">u8")
+    return ts.view(np.uint8).reshape(n, 8)[:, 2:]
+
+
+def _rand_side(rng, n):
+    return np.where(rng.integers(0, 2, size=n).astype(bool), ord('B'), ord('S')).astype(np.uint8)
+
+
+def _rand_symbol(rng, n):
+    # 3-6 uppercase letters, space padded to 8 characters
+    letters = rng.integers(ord('A'), ord('Z') + 1, size=(n, 8), dtype=np.uint8)
+    lengths = rng.integers(3, 7, size=(n, 1))
+    letters[np.arange(8) >= lengths] = ord(' ')
+    return letters.view("S8").reshape(n)
+
+
+def _fill_random(msg_type, recs, rng):
+    n = len(recs)
+    if msg_type == "add":
+        recs["order_ref"] = _rand_u64(rng, n)
+        recs["side"]      = _rand_side(rng, n)
+        recs["shares"]    = rng.integers(1, 1_000_000, size=n, endpoint=True)
+        recs["symbol"]    = _rand_symbol(rng, n)
+        recs["price"]     = rng.integers(1, 1_000_000, size=n, endpoint=True)
+    elif msg_type == "cancel":
+        recs["order_ref"] = _rand_u64(rng, n)
+        recs["shares"]    = rng.integers(1, 1_000_000, size=n, endpoint=True)
+    elif msg_type == "delete":
+        recs["order_ref"] = _rand_u64(rng, n)
+    elif msg_type == "replace":
+        recs["old_order_ref"] = _rand_u64(rng, n)
+        recs["new_order_ref"] = _rand_u64(rng, n)
+        recs["shares"]        = rng.integers(1, 1_000_000, size=n, endpoint=True)
+        recs["price"]         = rng.integers(100, 500_000, size=n, endpoint=True)
+    elif msg_type == "executed":
+        recs["timestamp"] = _rand_timestamp(rng, n)
+        recs["order_ref"] = _rand_u64(rng, n)
+        recs["shares"]    = rng.integers(1, 1_000_000, size=n, endpoint=True)
+        recs["match_id"]  = _rand_u64(rng, n)
+    elif msg_type == "trade":
+        recs["timestamp"] = _rand_timestamp(rng, n)
+        recs["order_ref"] = _rand_u64(rng, n)
+        recs["side"]      = _rand_side(rng, n)
+        recs["shares"]    = rng.integers(1, 10_000, size=n, endpoint=True)
+        recs["symbol"]    = _rand_symbol(rng, n)
+        recs["price"]     = rng.integers(1_000, 1_000_000, size=n, endpoint=True)
+        recs["match_id"]  = _rand_u64(rng, n)
+
+
+def generate_payload_records(msg_type, count, mode='rand', rng=None):
+    """
+    Generates `count` payloads of one message type as a structured array.
+
+    Args:
+        msg_type (str): One of MSG_TYPES.
+        count (int): Number of records.
+        mode (str): 'set' (fixed payload, as in payload_generator_helper) or 'rand'.
+        rng (np.random.Generator, optional): Random source for 'rand' mode.
+
+    Returns:
+        np.ndarray with dtype MSG_DTYPES[msg_type].
+    """
+    dtype = MSG_DTYPES[msg_type]
+    if mode == 'set':
+        template = np.frombuffer(bytes(_SET_PAYLOADS[msg_type]('set')), dtype=dtype)
+        return np.repeat(template, count)
+    if mode != 'rand':
+        raise ValueError("Mode must be 'set' or 'rand'")
+
+    if rng is None:
+        rng = np.random.default_rng()
+    recs = np.zeros(count, dtype=dtype)
+    recs["msg_type"] = _TYPE_BYTES[msg_type]
+    _fill_random(msg_type, recs, rng)
+    return recs
+
+
+def generate_payload_batch(message_plan, mode='rand', seed=None):
+    """
+    Encodes a whole message plan into one contiguous byte stream.
+
+    Args:
+        message_plan: Sequence of message types like ["add", "cancel", ...].
+        mode (str): 'set' or 'rand'.
+        seed (int, optional): Seed for np.random.default_rng; same plan and
+                              seed give the same stream.
+
+    Returns:
+        {
+            'stream':  np.ndarray[uint8], concatenated payloads,
+            'offsets': np.ndarray[int64], start byte of each message,
+            'types':   np.ndarray[uint8], index into MSG_TYPES per message,
+            'records': Dict[str, np.ndarray], structured records per type,
+                       in plan order
+        }
+    """
+    rng = np.random.default_rng(seed)
+    type_index = {msg_type: i for i, msg_type in enumerate(MSG_TYPES)}
+    try:
+        types = np.fromiter((type_index[msg] for msg in message_plan), dtype=np.uint8)
+    except KeyError as exc:
+        raise ValueError(f"Unsupported message type: {exc.args[0]}") from None
+
+    records = {msg_type: generate_payload_records(msg_type, int(np.count_nonzero(types == code)), mode, rng)
+               for code, msg_type in enumerate(MSG_TYPES)}
+    return encode_payload_records(types, records)
+
+
+def encode_payload_records(types, records):
+    """
+    Serializes per-type structured records into one contiguous byte stream.
+
+    Args:
+        types: np.ndarray[uint8], index into MSG_TYPES per message.
+        records: Dict[str, np.ndarray] of MSG_DTYPES records per type, each in
+                 plan order (the k-th record of a type is its k-th message).
+
+    Returns:
+        Same dict as generate_payload_batch().
+    """
+    lengths = np.array([MSG_LENGTHS[msg] for msg in MSG_TYPES], dtype=np.int64)[types]
+    offsets = np.zeros(len(types), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    stream = np.empty(int(lengths.sum()), dtype=np.uint8)
+
+    for code, msg_type in enumerate(MSG_TYPES):
+        positions = np.flatnonzero(types == code)
+        recs = records[msg_type]
+        if len(recs) != len(positions):
+            raise ValueError(f"{len(recs)} {msg_type} records for {len(positions)} messages")
+
+        # Scatter each record's bytes to its slot in the stream
+        msg_len = MSG_DTYPES[msg_type].itemsize
+        raw = recs.view(np.uint8).reshape(len(positions), msg_len)
+        stream[offsets[positions, None] + np.arange(msg_len)] = raw
+
+    return {
+        "stream": stream,
+        "offsets": offsets,
+        "types": types,
+        "records": records,
+    }
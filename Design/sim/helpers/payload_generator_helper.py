@@ -7,7 +7,7 @@
 #              Supports all six decoder types: Add, Cancel, Delete, etc.
 # Author: RZ
 # Start Date: 05032025
-# Version: 0.8
+# Version: 0.9
 
 # Changelog
 # =============================================
@@ -20,142 +20,132 @@
 # [20250504-3] RZ: updated replace_order_payload.
 # [20250504-4] RZ: updated executed_order_payload.
 # [20250504-5] RZ: updated trade_payload.
+# [20261018-1] RZ: Payloads packed from the ITCH_MESSAGES layout table (layout_helper.py).
 # =============================================
 
 import random
-import string
+
+from .layout_helper import pack_payload
+
+
+def _random_symbol():
+    # 3-6 uppercase letters, space padded to 8 characters
+    symbol_length = random.randint(3, 6)
+    symbol_core   = ''.join(random.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=symbol_length))
+    return symbol_core.ljust(8).encode('ascii')
+
 
 def generate_add_order_payload(mode='set'):
     if mode == 'set':
-        payload = [
-            ord('A'),                              # Message Type
-            *b'\x01\x23\x45\x67\x89\xAB\xCD\xEF',  # Order Ref  
-            ord('S'),                              # Buy/Sell
-            *b'\x00\x00\x00\x64',                  # Shares = 100
-            *b'ABCD1234',                          # Symbol  
-            *b'\x00\x00\x0F\xA0',                  # Price = 4000
-        ] + [0] * 10                               # Zeroed Padding
+        fields = {
+            "order_ref": 0x0123456789ABCDEF,
+            "side":      ord('S'),                 # Buy/Sell
+            "shares":    100,
+            "symbol":    b'ABCD1234',
+            "price":     4000,
+        }                                          # Zeroed padding
     elif mode == 'rand':
-        order_ref = random.getrandbits(64).to_bytes(8, 'big')
-        buy_sell  = random.choice([ord('B'), ord('S')])
-        shares    = random.randint(1, 1_000_000).to_bytes(4, 'big')
-        symbol_length = random.randint(3, 6)
-        symbol_core   = ''.join(random.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=symbol_length))
-        symbol_str    = symbol_core.ljust(8)
-        symbol_bytes  = symbol_str.encode('ascii')
-        price     = random.randint(1, 1_000_000).to_bytes(4, 'big')
-        padding   = [0] * 10
-        payload   = [ord('A')] + list(order_ref) + [buy_sell] + list(shares) + list(symbol_bytes) + list(price) + padding
+        fields = {
+            "order_ref": random.getrandbits(64),
+            "side":      random.choice([ord('B'), ord('S')]),
+            "shares":    random.randint(1, 1_000_000),
+            "symbol":    _random_symbol(),
+            "price":     random.randint(1, 1_000_000),
+        }
     else:
         raise ValueError("Mode must be 'set' or 'rand'")
 
-    return payload
+    return pack_payload("add", fields)
 
 
 def generate_cancel_order_payload(mode='set'):
     if mode == 'set':
-        payload = [
-            ord('X'),                              # Message Type
-            *b'\xFE\xDC\xBA\x98\x76\x54\x32\x10',  # Order Ref (64-bit)
-            *b'\x00\x00\x00\x32',                  # Canceled Shares = 50
-        ] + [0] * 10                               # Padding
+        fields = {
+            "order_ref": 0xFEDCBA9876543210,
+            "shares":    50,                       # Canceled shares
+        }
     elif mode == 'rand':
-        order_ref = random.getrandbits(64).to_bytes(8, 'big')
-        shares = random.randint(1, 1_000_000).to_bytes(4, 'big')
-        padding = [random.randint(0, 255) for _ in range(10)]
-
-        payload = [ord('X')] + list(order_ref) + list(shares) + [0] * 10
+        fields = {
+            "order_ref": random.getrandbits(64),
+            "shares":    random.randint(1, 1_000_000),
+        }
     else:
         raise ValueError("Mode must be 'set' or 'rand'")
 
-    return payload
+    return pack_payload("cancel", fields)
 
 def generate_delete_order_payload(mode='set'):
     if mode == 'set':
-        payload = [
-            ord('D'),                              # Message Type
-            *b'\x12\x34\x56\x78\x9A\xBC\xDE\xF0',  # Order Ref (64-bit)
-        ] 
+        fields = {"order_ref": 0x123456789ABCDEF0}
     elif mode == 'rand':
-        order_ref = random.getrandbits(64).to_bytes(8, 'big')
-        
-        payload = [ord('D')] + list(order_ref) 
+        fields = {"order_ref": random.getrandbits(64)}
     else:
         raise ValueError("Mode must be 'set' or 'rand'")
     
-    return payload
+    return pack_payload("delete", fields)
 
 def generate_replace_order_payload(mode='set'):
     if mode == 'set':
-        payload = [
-            ord('U'),
-            *b'\x11\x22\x33\x44\x55\x66\x77\x88',  # Original Ref
-            *b'\x88\x77\x66\x55\x44\x33\x22\x11',  # New Ref
-            *b'\x00\x00\x00\x64',                  # Updated Shares = 100
-            *b'\x00\x00\x27\x10',                  # Updated Price = 10000
-            0x00, 0x00                             # Reserved
-        ]
+        fields = {
+            "old_order_ref": 0x1122334455667788,
+            "new_order_ref": 0x8877665544332211,
+            "shares":        100,
+            "price":         10000,
+        }                                          # Zeroed reserved bytes
     elif mode == 'rand':
-        orig_ref = random.getrandbits(64).to_bytes(8, 'big')
-        new_ref  = random.getrandbits(64).to_bytes(8, 'big')
-        shares   = random.randint(1, 1_000_000).to_bytes(4, 'big')
-        price    = random.randint(100, 500_000).to_bytes(4, 'big')
-        reserved = [0, 0]
-        payload  = [ord('U')] + list(orig_ref) + list(new_ref) + list(shares) + list(price) + reserved
+        fields = {
+            "old_order_ref": random.getrandbits(64),
+            "new_order_ref": random.getrandbits(64),
+            "shares":        random.randint(1, 1_000_000),
+            "price":         random.randint(100, 500_000),
+        }
     else:
         raise ValueError("Mode must be 'set' or 'rand'")
 
-    return payload
+    return pack_payload("replace", fields)
 
 def generate_executed_order_payload(mode='set'):
     if mode == 'set':
-        payload = [
-            ord('E'),
-            *b'\x00\x00\x00\x00\x00\x01',                # Timestamp
-            *b'\xAA\xBB\xCC\xDD\xEE\xFF\x00\x11',        # Order Ref
-            *b'\x00\x00\x00\x0A',                        # Executed Shares = 10
-            *b'\x12\x34\x56\x78\x9A\xBC\xDE\xF0',        # Match ID
-        ] + [0] * 3  # Reserved
+        fields = {
+            "timestamp": 0x000000000001,
+            "order_ref": 0xAABBCCDDEEFF0011,
+            "shares":    10,                       # Executed shares
+            "match_id":  0x123456789ABCDEF0,
+        }
     elif mode == 'rand':
-        timestamp = random.getrandbits(48).to_bytes(6, 'big')
-        order_ref = random.getrandbits(64).to_bytes(8, 'big')
-        shares = random.randint(1, 1_000_000).to_bytes(4, 'big')
-        match_id = random.getrandbits(64).to_bytes(8, 'big')
-        payload = [ord('E')] + list(timestamp) + list(order_ref) + list(shares) + list(match_id) + [0]*3
+        fields = {
+            "timestamp": random.getrandbits(48),
+            "order_ref": random.getrandbits(64),
+            "shares":    random.randint(1, 1_000_000),
+            "match_id":  random.getrandbits(64),
+        }
     else:
         raise ValueError("Mode must be 'set' or 'rand'")
     
-    return payload
+    return pack_payload("executed", fields)
 
 def generate_trade_payload(mode='set'):
     if mode == 'set':
-        payload = [
-            ord('P'),
-            *b'\x00\x00\x00\x00\xAB\xCD',                    # Timestamp
-            *b'\x11\x22\x33\x44\x55\x66\x77\x88',            # Order Ref
-            ord('B'),                                        # Buy
-            *b'\x00\x00\x00\x64',                            # Shares = 100
-            *b'ABCD1234',                                    # 8-char symbol 
-            *b'\x00\x00\x27\x10',                            # Price = 10000
-            *b'\x99\x88\x77\x66\x55\x44\x33\x22',            # Match ID
-        ]
+        fields = {
+            "timestamp": 0x00000000ABCD,
+            "order_ref": 0x1122334455667788,
+            "side":      ord('B'),
+            "shares":    100,
+            "symbol":    b'ABCD1234',
+            "price":     10000,
+            "match_id":  0x9988776655443322,
+        }
     elif mode == 'rand':
-        timestamp = random.getrandbits(48).to_bytes(6, 'big')
-        order_ref = random.getrandbits(64).to_bytes(8, 'big')
-        side      = random.choice([ord('B'), ord('S')])
-        shares    = random.randint(1, 10_000).to_bytes(4, 'big')
-        symbol_length = random.randint(3, 6)
-        symbol_core = ''.join(random.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=symbol_length))
-        symnol_str = symbol_core.ljust(8)
-        symbol_bytes = symnol_str.encode('ascii')       
-        symbol  = list(symbol_bytes) 
-        # symbol    = ''.join(random.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=6)).ljust(8).encode('ascii')
-        price     = random.randint(1_000, 1_000_000).to_bytes(4, 'big')   
-        match_id  = random.getrandbits(64).to_bytes(8, 'big')
-
-        payload = [ord('P')] + list(timestamp) + list(order_ref) + [side] + list(shares) + list(symbol) + list(price) + list(match_id)
+        fields = {
+            "timestamp": random.getrandbits(48),
+            "order_ref": random.getrandbits(64),
+            "side":      random.choice([ord('B'), ord('S')]),
+            "shares":    random.randint(1, 10_000),
+            "symbol":    _random_symbol(),
+            "price":     random.randint(1_000, 1_000_000),
+            "match_id":  random.getrandbits(64),
+        }
     else:
         raise ValueError("Mode must be 'set' or 'rand'")
  
-    return payload
-
+    return pack_payload("trade", fields)
@@ -0,0 +1,195 @@
+# ============================================================
+# profile_helper.py
+# ============================================================
+#
+# Description: Opt-in profiling of the testbench phases. Helper functions are
+#              tagged with @profiled(phase); when profiling is off (the default)
+#              the decorator returns the function untouched, so normal runs pay
+#              nothing. When on, per-phase time is accumulated and the run can
+#              additionally be wrapped in cProfile and/or tracemalloc, with
+#              everything written to one JSON report.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Phase timers, cProfile and tracemalloc hooks with JSON report.
+# ============================================================
+
+import functools
+import inspect
+import json
+import time
+from contextlib import contextmanager
+
+from sim_config import PROFILE_MODES, PROFILE_TOP
+
+PROFILING = bool(PROFILE_MODES)  # Any mode enables the phase timers
+
+# Phase name -> {"seconds", "calls", "kind"}; "python" phases are time spent in
+# Python code, "wall" phases span awaits and include simulator time
+_phases = {}
+_session = None
+
+
+def _add(name, kind, seconds):
+    entry = _phases.setdefault(name, {"seconds": 0.0, "calls": 0, "kind": kind})
+    entry["seconds"] += seconds
+    entry["calls"] += 1
+
+
+def profiled(name):
+    """
+    Decorator assigning a function to a phase. Coroutine functions are timed
+    as wall-clock spans; generator functions are timed per produced item, so
+    lazily generated chunks are charged to the phase and not to the consumer.
+    """
+    def decorate(func):
+        if not PROFILING:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _add(name, "wall", time.perf_counter() - start)
+            return wrapper
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                items = func(*args, **kwargs)
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = next(items)
+                        except StopIteration:
+                            return
+                        finally:
+                            _add(name, "python", time.perf_counter() - start)
+                        yield item
+                finally:
+                    items.close()
+            return wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _add(name, "python", time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def phase(name, kind="python"):
+    """
+    Times a block of testbench code as a phase (no-op when profiling is off).
+    Use kind="wall" for blocks that await the simulator.
+    """
+    if not PROFILING:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, kind, time.perf_counter() - start)
+
+
+def start_profiling(modes=PROFILE_MODES):
+    """
+    Starts a profiling session at the top of a test: clears the phase timers
+    and enables cProfile / tracemalloc if requested.
+    """
+    global _session
+    if not modes:
+        return
+    _phases.clear()
+    _session = {"modes": set(modes), "start": time.perf_counter(), "cprofile": None}
+
+    if "cprofile" in modes:
+        import cProfile
+        _session["cprofile"] = cProfile.Profile()
+        _session["cprofile"].enable()
+    if "tracemalloc" in modes:
+        import tracemalloc
+        tracemalloc.start(16)
+
+
+def finish_profiling(path, top=PROFILE_TOP):
+    """
+    Stops the session and writes the report to `path` (JSON). cProfile stats
+    are also dumped next to it as <path>.prof for snakeviz/pstats.
+
+    Returns:
+        The report dict, or None when profiling is off.
+    """
+    global _session
+    if _session is None:
+        return None
+
+    total_s = time.perf_counter() - _session["start"]
+    python_s = sum(entry["seconds"] for entry in _phases.values() if entry["kind"] == "python")
+    report = {
+        "modes": sorted(_session["modes"]),
+        "total_s": total_s,
+        "phases": {name: dict(entry) for name, entry in
+                   sorted(_phases.items(), key=lambda item: -item[1]["seconds"])},
+        # Everything outside the Python phases: simulator, cocotb scheduler, injection writes
+        "unattributed_s": total_s - python_s,
+    }
+
+    profiler = _session["cprofile"]
+    if profiler is not None:
+        import pstats
+        profiler.disable()
+        profiler.dump_stats(path + ".prof")
+        stats = pstats.Stats(profiler)
+        rows = sorted((item for item in stats.stats.items() if item[0][0] != __file__),  # Skip the phase wrappers
+                      key=lambda item: -item[1][3])[:top]
+        report["cprofile_top"] = [{
+            "function": f"{filename}:{line}({func})",
+            "calls": calls,
+            "tottime_s": tottime,
+            "cumtime_s": cumtime,
+        } for (filename, line, func), (_, calls, tottime, cumtime, _) in rows]
+
+    if "tracemalloc" in _session["modes"]:
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["tracemalloc_current_mb"] = current / 2**20
+        report["tracemalloc_peak_mb"] = peak / 2**20
+        report["tracemalloc_top"] = [{
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_mb": stat.size / 2**20,
+            "count": stat.count,
+        } for stat in snapshot.statistics("lineno")[:top]]
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    _session = None
+    return report
+
+
+def format_profile_report(report):
+    lines = [f"Profile ({', '.join(report['modes'])}): {report['total_s']:.2f} s total, "
+             f"{report['unattributed_s']:.2f} s in simulator/scheduler/injection"]
+    for name, entry in report["phases"].items():
+        lines.append(f"  {name:<20} {entry['seconds']:>9.3f} s {entry['calls']:>9} calls ({entry['kind']})")
+    for row in report.get("cprofile_top", [])[:10]:
+        lines.append(f"  cum {row['cumtime_s']:>8.3f} s  {row['function']}")
+    if "tracemalloc_peak_mb" in report:
+        lines.append(f"  traced peak {report['tracemalloc_peak_mb']:.1f} MiB")
+        for row in report["tracemalloc_top"][:5]:
+            lines.append(f"  {row['size_mb']:>8.2f} MiB  {row['location']}")
+    return "\n".join(lines)
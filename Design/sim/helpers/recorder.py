@@ -3,100 +3,300 @@
 # ============================================================
 #
 # Description: Logs signal values on every simulation cycle for debugging.
-#              Supports structured output to list-of-dictionaries format.
+#              Stores raw integers in columnar buffers and formats them to the
+#              cycle-indexed dictionary layout only at export time.
 #              Used by all decoder testbenches in benchmarking mode.
 # Author: RZ
 # Start Date: 20250506
-# Version: 0.2
+# Version: 0.11
 #
 # Changelog
 # ============================================================
 # [20250506-1] RZ: Implemented signal recorder for full-cycle logging.
 # [20250507-1] RZ: Updated for parser testbench.
+# [20261018-1] RZ: Columnar integer backend; signal handles resolved once per run.
+# [20261018-2] RZ: Sparse mode that wakes only on valid edges, with optional context windows.
+# [20261018-3] RZ: trim_column_log() for handing raw columns to the scoreboard.
+# [20261018-4] RZ: Signal map generated from the ITCH_MESSAGES layout table.
+# [20261018-5] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# [20261018-6] RZ: Optional streaming to a CSV / binary log file (log_writer_helper.py) in COLUMN_CHUNK batches.
+# [20261018-7] RZ: Integer cycle numbers (get_sim_time() returns float ns; the column buffers are array('Q')).
+# [20261018-8] RZ: Integer cycle numbers in the sparse recorder as well.
+# [20261018-9] RZ: monitor_cycles(): total_cycles=None records until the test ends (gapped runs).
 # ============================================================
 
+import itertools
+from array import array
+from collections import deque
 
 import cocotb
-from cocotb.triggers import RisingEdge
+from cocotb.triggers import RisingEdge, First, Timer
 from cocotb.utils import get_sim_time
 
-from sim_config import SIM_CLK_PERIOD_NS
-from ITCH_config import SIM_HEADERS
+from sim_config import SIM_CLK_PERIOD_NS, RECORD_SPARSE, RECORD_CONTEXT_CYCLES
+from ITCH_config import SIM_HEADERS, ITCH_MESSAGES
+from helpers.profile_helper import profiled
+from helpers.log_writer_helper import open_log_writer, submit_columns, close_log_writer
+
+COLUMN_CHUNK = 4096  # Rows added to every column buffer each time it fills up
+
+REQUIRED = object()  # Fallback marker: signal must exist on the DUT
+
+
+def monitor_cycles(total_cycles):
+    """
+    Loop range of a monitor coroutine: total_cycles clock edges, or every edge
+    until the test ends when None (gapped runs, whose length is only known once
+    the last chunk has been injected).
+    """
+    return itertools.count() if total_cycles is None else range(total_cycles)
+
+# SIM_HEADERS column -> (DUT signal, value exported when the signal is absent), from the ITCH_MESSAGES table
+SIGNAL_MAP = {}
+for _msg_type, _spec in ITCH_MESSAGES.items():
+    SIGNAL_MAP[f"{_msg_type}_internal_valid"] = (f"{_spec['prefix']}_internal_valid", REQUIRED)
+    SIGNAL_MAP[f"{_spec['prefix']}_parsed_type"] = (f"{_spec['prefix']}_parsed_type", "")
+    for _name, _offset, _width, _kind, _signal, _column, _ in _spec["fields"]:
+        if _column is not None:
+            SIGNAL_MAP[_column] = (_signal, 0)
+
+# Signals whose rising edge wakes the sparse recorder
+TRIGGER_SIGNALS = [f"{spec['prefix']}_internal_valid" for spec in ITCH_MESSAGES.values()]
+
+_recorded_log = None  # Column log of the current recording (see new_column_log)
+
+
+def new_column_log(dut, headers, signal_map, flag_headers=(), stream_path=None):
+    """
+    Resolves every recorded DUT signal once and allocates one unsigned 64-bit
+    column buffer per header.
+
+    Args:
+        headers: CSV header order, starting with "cycle".
+        signal_map: header -> (DUT signal name, fallback exported if absent).
+        flag_headers: headers exported as plain ints instead of hex strings.
+        stream_path: Optional log file (".csv", or ".bin" for the binary
+                     column log). Full buffers are then handed to a writer
+                     thread and reused, so memory stays at COLUMN_CHUNK rows.
+
+    Returns:
+        Dict holding the columns, the sampled handles and export settings.
+    """
+    columns = {key: array('Q', bytes(8 * COLUMN_CHUNK)) for key in headers}
+    sampled = []
+    missing = {}
+    for key in headers[1:]:
+        name, fallback = signal_map[key]
+        if fallback is REQUIRED or hasattr(dut, name):
+            sampled.append((columns[key], getattr(dut, name)))
+        else:
+            missing[key] = fallback
+
+    return {
+        "headers": list(headers),
+        "columns": columns,
+        "sampled": sampled,
+        "missing": missing,
+        "flags": set(flag_headers),
+        "size": 0,
+        "capacity": COLUMN_CHUNK,
+        "sink": open_log_writer(stream_path, headers, flag_headers, missing) if stream_path else None,
+        "streamed": 0,
+    }
+
+
+def flush_column_log(log):
+    """
+    Hands the buffered rows of a streaming log to its writer thread.
+    """
+    submit_columns(log["sink"], log["columns"], log["size"])
+    log["streamed"] += log["size"]
+    log["size"] = 0
+
+
+def finish_column_log(log):
+    """
+    Flushes and closes a streaming log once the recording is over.
+
+    Returns:
+        Writer stats from close_log_writer(), or None for in-memory logs.
+    """
+    if log is None or log["sink"] is None:
+        return None
+    flush_column_log(log)
+    return close_log_writer(log["sink"])
+
+
+def _reserve_row(log):
+    n = log["size"]
+    if n == log["capacity"]:
+        if log["sink"] is not None:
+            flush_column_log(log)
+            log["size"] = 1
+            return 0
+        for column in log["columns"].values():
+            column.extend(array('Q', bytes(8 * COLUMN_CHUNK)))
+        log["capacity"] += COLUMN_CHUNK
+    log["size"] = n + 1
+    return n
+
+
+@profiled("record_sampling")
+def append_sample(log, cycle):
+    """
+    Appends the current value of every resolved signal as one row.
+    """
+    n = _reserve_row(log)
+    log["columns"]["cycle"][n] = cycle
+    for column, handle in log["sampled"]:
+        column[n] = int(handle.value)
+
+
+@profiled("record_sampling")
+def read_sample(log):
+    """
+    Reads every resolved signal without storing it (for deferred append_row()).
+    """
+    return [int(handle.value) for _, handle in log["sampled"]]
+
+
+@profiled("record_sampling")
+def append_row(log, cycle, values):
+    """
+    Appends a row previously captured with read_sample().
+    """
+    n = _reserve_row(log)
+    log["columns"]["cycle"][n] = cycle
+    for (column, _), value in zip(log["sampled"], values):
+        column[n] = value
+
+
+def _check_in_memory(log):
+    if log["sink"] is not None:
+        raise RuntimeError(f"Recording streamed to {log['sink']['path']}; "
+                           "read it back with log_writer_helper.read_log_columns()")
+
+
+def export_column_log(log):
+    """
+    Formats a column log into the cycle-indexed row dictionaries used by the
+    CSV writers and compare_against_expected().
+
+    Returns:
+        Dict[int, Dict] keyed by cycle.
+    """
+    if log is None:
+        return {}
+    _check_in_memory(log)
+
+    n = log["size"]
+    formatted = []
+    for key in log["headers"]:
+        if key in log["missing"]:
+            formatted.append([log["missing"][key]] * n)
+        elif key == "cycle" or key in log["flags"]:
+            formatted.append(log["columns"][key][:n].tolist())
+        else:
+            formatted.append([hex(value) for value in log["columns"][key][:n]])
+
+    headers = log["headers"]
+    return {row[0]: dict(zip(headers, row)) for row in zip(*formatted)}
 
-_recorded_log = {}  # Global dictionary to store cycle-indexed logs
 
 def get_recorded_log():
-    return _recorded_log
+    return export_column_log(_recorded_log)
+
+
+def trim_column_log(log):
+    """
+    Returns the raw recording as {header: array('Q')} trimmed to the recorded
+    rows. Signals absent from the DUT are left out.
+    """
+    if log is None:
+        return {}
+    _check_in_memory(log)
+    n = log["size"]
+    return {key: column[:n] for key, column in log["columns"].items() if key not in log["missing"]}
+
+
+def get_recorded_columns():
+    return trim_column_log(_recorded_log)
 
-async def record_all_internal_valids(dut, total_cycles=300):
+
+def finish_recorded_log():
+    return finish_column_log(_recorded_log)
+
+
+async def record_sparse(dut, log, trigger_names, total_cycles=300, context_cycles=0):
+    """
+    Event-triggered counterpart of the per-cycle recording loop. Covers the same
+    cycle range and produces identical rows, but only for cycles where a trigger
+    signal is high, plus `context_cycles` cycles before and after each of them.
+
+    With context_cycles == 0 the coroutine sleeps until a trigger rises, so it
+    wakes only around events. Context windows need the preceding cycles, so in
+    that case the clock is followed every cycle but only windowed rows are kept.
+    """
+    triggers = [getattr(dut, name) for name in trigger_names]
+    clk_edge = RisingEdge(dut.clk)
+
+    await clk_edge
+    abs_cycle = int(get_sim_time('ns')) // SIM_CLK_PERIOD_NS
+    last_cycle = float("inf") if total_cycles is None else abs_cycle + total_cycles
+
+    if context_cycles == 0:
+        rises = [RisingEdge(trigger) for trigger in triggers]
+        while abs_cycle < last_cycle:
+            if total_cycles is None:
+                await First(*rises)
+            else:
+                await First(*rises, Timer((last_cycle - abs_cycle) * SIM_CLK_PERIOD_NS, units='ns'))
+            abs_cycle = int(get_sim_time('ns')) // SIM_CLK_PERIOD_NS
+
+            # The rise happened just after a clock edge; sample the following edges like the dense loop
+            while abs_cycle < last_cycle:
+                await clk_edge
+                abs_cycle += 1
+                if not any(int(trigger.value) for trigger in triggers):
+                    break
+                append_sample(log, abs_cycle)
+        return
+
+    history = deque(maxlen=context_cycles)
+    trailing = 0
+    while abs_cycle < last_cycle:
+        await clk_edge
+        abs_cycle += 1
+        values = read_sample(log)
+        if any(int(trigger.value) for trigger in triggers):
+            while history:
+                append_row(log, *history.popleft())
+            append_row(log, abs_cycle, values)
+            trailing = context_cycles
+        elif trailing:
+            append_row(log, abs_cycle, values)
+            trailing -= 1
+        else:
+            history.append((abs_cycle, values))
+
+
+async def record_all_internal_valids(dut, total_cycles=300, sparse=RECORD_SPARSE,
+                                     context_cycles=RECORD_CONTEXT_CYCLES, stream_path=None):
     global _recorded_log
-    _recorded_log = {}  # Reset at the start
+    _recorded_log = new_column_log(
+        dut, SIM_HEADERS, SIGNAL_MAP,
+        flag_headers=[key for key in SIM_HEADERS if key.endswith("_internal_valid")], stream_path=stream_path)
+    log = _recorded_log
+
+    if sparse:
+        await record_sparse(dut, log, TRIGGER_SIGNALS, total_cycles, context_cycles)
+        return
 
     await RisingEdge(dut.clk)
     # dut._log.info("=== Full Signal Dump ===")
+    abs_cycle = int(get_sim_time('ns')) // SIM_CLK_PERIOD_NS
 
-    for _ in range(total_cycles):
+    for _ in monitor_cycles(total_cycles):
         await RisingEdge(dut.clk)
-        sim_time = get_sim_time('ns')
-        abs_cycle = sim_time // SIM_CLK_PERIOD_NS
-
-        # Extract signals and default to 0 if not present
-        row = {
-
-            "cycle": abs_cycle,
-
-            "add_internal_valid":       int(dut.add_internal_valid.value),
-            "cancel_internal_valid":    int(dut.cancel_internal_valid.value),
-            "delete_internal_valid":    int(dut.delete_internal_valid.value),
-            "replace_internal_valid":   int(dut.replace_internal_valid.value),
-            "executed_internal_valid":  int(dut.exec_internal_valid.value),
-            "trade_internal_valid":     int(dut.trade_internal_valid.value),
-
-            "add_order_ref":            hex(getattr(dut, 'add_order_ref', 0).value.integer)         if hasattr(dut, 'add_order_ref') else 0,
-            "add_shares":               hex(getattr(dut, 'add_shares', 0).value.integer)            if hasattr(dut, 'add_shares') else 0,
-            "add_side":                 hex(getattr(dut, 'add_side', 0).value.integer)              if hasattr(dut, 'add_side') else "",
-            "add_price":                hex(getattr(dut, 'add_price', 0).value.integer)             if hasattr(dut, 'add_price') else 0,
-
-            "cancel_order_ref":         hex(getattr(dut, 'cancel_order_ref', 0).value.integer)      if hasattr(dut, 'cancel_order_ref') else 0,
-            "cancel_shares":            hex(getattr(dut, 'cancel_canceled_shares', 0).value.integer)if hasattr(dut, 'cancel_canceled_shares') else 0,
-
-            "delete_order_ref":         hex(getattr(dut, 'delete_order_ref', 0).value.integer)      if hasattr(dut, 'delete_order_ref') else 0,
-            
-            "replace_old_order_ref":    hex(getattr(dut, 'replace_old_order_ref', 0).value.integer) if hasattr(dut, 'replace_old_order_ref') else 0,
-            "replace_new_order_ref":    hex(getattr(dut, 'replace_new_order_ref', 0).value.integer) if hasattr(dut, 'replace_new_order_ref') else 0,
-            "replace_shares":           hex(getattr(dut, 'replace_shares', 0).value.integer)        if hasattr(dut, 'replace_shares') else 0,
-            "replace_price":            hex(getattr(dut, 'replace_price', 0).value.integer)         if hasattr(dut, 'replace_price') else 0,
-
-            "exec_timestamp":           hex(getattr(dut, 'exec_timestamp', 0).value.integer)        if hasattr(dut, 'exec_timestamp') else 0,
-            "exec_order_ref":           hex(getattr(dut, 'exec_order_ref', 0).value.integer)        if hasattr(dut, 'exec_order_ref') else 0,
-            "exec_shares":              hex(getattr(dut, 'exec_shares', 0).value.integer)           if hasattr(dut, 'exec_shares') else 0,
-            "exec_match_id":            hex(getattr(dut, 'exec_match_id', 0).value.integer)         if hasattr(dut, 'exec_match_id') else 0,
-                
-            "trade_timestamp":          hex(getattr(dut, 'trade_timestamp', 0).value.integer)       if hasattr(dut, 'trade_timestamp') else 0,
-            "trade_order_ref":          hex(getattr(dut, 'trade_order_ref', 0).value.integer)       if hasattr(dut, 'trade_order_ref') else 0,
-            "trade_side":               hex(getattr(dut, 'trade_side', 0).value.integer)            if hasattr(dut, 'trade_side') else 0,
-            "trade_shares":             hex(getattr(dut, 'trade_shares', 0).value.integer)          if hasattr(dut, 'trade_shares') else 0,
-            "trade_stock_symbol":       hex(getattr(dut, 'trade_stock_symbol', 0).value.integer)    if hasattr(dut, 'trade_stock_symbol') else 0,
-            "trade_price":              hex(getattr(dut, 'trade_price', 0).value.integer)           if hasattr(dut, 'trade_price') else 0,
-            "trade_match_id":           hex(getattr(dut, 'trade_match_id', 0).value.integer)        if hasattr(dut, 'trade_match_id') else 0,
-
-            "add_parsed_type":      hex(getattr(dut, 'add_parsed_type', 0).value.integer)       if hasattr(dut, 'add_parsed_type') else "",
-            "cancel_parsed_type":   hex(getattr(dut, 'cancel_parsed_type', 0).value.integer)    if hasattr(dut, 'cancel_parsed_type') else "",
-            "delete_parsed_type":   hex(getattr(dut, 'delete_parsed_type', 0).value.integer)    if hasattr(dut, 'delete_parsed_type') else "",
-            "replace_parsed_type":  hex(getattr(dut, 'replace_parsed_type', 0).value.integer)   if hasattr(dut, 'replace_parsed_type') else "",
-            "exec_parsed_type":     hex(getattr(dut, 'exec_parsed_type', 0).value.integer)      if hasattr(dut, 'exec_parsed_type') else "",
-            "trade_parsed_type":    hex(getattr(dut, 'trade_parsed_type', 0).value.integer)     if hasattr(dut, 'trade_parsed_type') else "",
-
-
-
-        }
-
-        # Log to console
-        # dut._log.info(
-        #     f"[Cycle {abs_cycle} | {sim_time}ns] "
-        #     f"add_valid={row['add_internal_valid']}, cancel_valid={row['cancel_internal_valid']}, "
-        #     f"add_order_ref={row['add_order_ref']}, add_shares={row['add_shares']}, add_price={row['add_price']}, "
-        #     f"cancel_order_ref={row['cancel_order_ref']}, cancel_shares={row['cancel_shares']}"
-        # )
-
-        _recorded_log[abs_cycle] = row
+        abs_cycle += 1
+        append_sample(log, abs_cycle)
@@ -7,48 +7,68 @@
 #              Used by all decoder testbenches in benchmarking mode.
 # Author: RZ
 # Start Date: 20250507
-# Version: 0.1
+# Version: 0.8
 #
 # Changelog
 # ============================================================
 # [20250507-1] RZ: Implemented signal recorder for full-cycle logging.
+# [20261018-1] RZ: Switched to the columnar integer backend from recorder.py.
+# [20261018-2] RZ: Sparse mode triggered on parsed_valid.
+# [20261018-3] RZ: Added get_recorded_columns().
+# [20261018-4] RZ: Record the new_order_ref port (replace messages).
+# [20261018-5] RZ: Optional streaming to a CSV / binary log file (stream_path).
+# [20261018-6] RZ: Integer cycle numbers (get_sim_time() returns float ns; the column buffers are array('Q')).
+# [20261018-7] RZ: Records until the test ends when total_cycles is None (gapped runs).
 # ============================================================
 
 import cocotb
 from cocotb.triggers import RisingEdge
 from cocotb.utils import get_sim_time
 
-from sim_config import SIM_CLK_PERIOD_NS
+from sim_config import SIM_CLK_PERIOD_NS, RECORD_SPARSE, RECORD_CONTEXT_CYCLES
 from ITCH_config import PARSER_HEADERS
+from helpers.recorder import (REQUIRED, new_column_log, append_sample, export_column_log,
+                              trim_column_log, finish_column_log, record_sparse, monitor_cycles)
 
-_recorded_log = {}
+# PARSER_HEADERS column -> (DUT signal, value exported when the signal is absent)
+SIGNAL_MAP = {
+    "parsed_valid": ("parsed_valid", REQUIRED),
+    "parsed_type":  ("parsed_type",  ""),
+    "order_ref":    ("order_ref",    ""),
+    "side":         ("side",         ""),
+    "shares":       ("shares",       ""),
+    "price":        ("price",        ""),
+    "new_order_ref": ("new_order_ref", ""),
+    "timestamp":    ("timestamp",    ""),
+    "misc_data":    ("misc_data",    ""),
+}
 
-def get_recorded_log():
-    return _recorded_log
+_recorded_log = None
 
-async def record_parser_outputs(dut, total_cycles=300):
-    global _recorded_log
-    _recorded_log = {}
+def get_recorded_log():
+    return export_column_log(_recorded_log)
 
-    await RisingEdge(dut.clk)
+def get_recorded_columns():
+    return trim_column_log(_recorded_log)
 
-    for _ in range(total_cycles):
-        await RisingEdge(dut.clk)
-        sim_time = get_sim_time('ns')
-        abs_cycle = sim_time // SIM_CLK_PERIOD_NS
+def finish_recorded_log():
+    return finish_column_log(_recorded_log)
 
-        row = {
-        "cycle": abs_cycle,
-        "parsed_valid": int(dut.parsed_valid.value),
-        "parsed_type": hex(dut.parsed_type.value.integer) if hasattr(dut, 'parsed_type') else "",
+async def record_parser_outputs(dut, total_cycles=300, sparse=RECORD_SPARSE,
+                                context_cycles=RECORD_CONTEXT_CYCLES, stream_path=None):
+    global _recorded_log
+    _recorded_log = new_column_log(dut, PARSER_HEADERS, SIGNAL_MAP, flag_headers=["parsed_valid"],
+                                   stream_path=stream_path)
+    log = _recorded_log
 
-        "order_ref": hex(getattr(dut, 'order_ref', 0).value.integer) if hasattr(dut, 'order_ref') else "",
-        "side": hex(getattr(dut, 'side', 0).value.integer) if hasattr(dut, 'side') else "",
-        "shares": hex(getattr(dut, 'shares', 0).value.integer) if hasattr(dut, 'shares') else "",
-        "price": hex(getattr(dut, 'price', 0).value.integer) if hasattr(dut, 'price') else "",
-        "timestamp": hex(getattr(dut, 'timestamp', 0).value.integer) if hasattr(dut, 'timestamp') else "",
-        "misc_data": hex(getattr(dut, 'misc_data', 0).value.integer) if hasattr(dut, 'misc_data') else "",
-        }
+    if sparse:
+        await record_sparse(dut, log, ["parsed_valid"], total_cycles, context_cycles)
+        return
 
+    await RisingEdge(dut.clk)
+    abs_cycle = int(get_sim_time('ns')) // SIM_CLK_PERIOD_NS
 
-        _recorded_log[abs_cycle] = row
\ No newline at end of file
+    for _ in monitor_cycles(total_cycles):
+        await RisingEdge(dut.clk)
+        abs_cycle += 1
+        append_sample(log, abs_cycle)
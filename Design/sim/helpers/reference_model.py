@@ -0,0 +1,640 @@
+# ============================================================
+# reference_model.py
+# ============================================================
+#
+# Description: Simulator-free, cycle-accurate golden model of the speculative
+#              ITCH pipeline (six *_order_decoder.v FSMs, parser.v arbitration
+#              and parser_latch_stage.v). Consumes a byte stream plus a valid_in
+#              mask and produces rows in the SIM_HEADERS / PARSER_HEADERS layout.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.6
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial cycle-accurate model of decoders, parser and latch stage.
+# [20261018-2] RZ: Split into new/advance calls so chunked streams can be modelled.
+# [20261018-3] RZ: Decoder field registers derived from the ITCH_MESSAGES layout table.
+# [20261018-4] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# [20261018-5] RZ: Events-only rows stepped per decoder decision (suppression, message, hunt) with NumPy register look-ups; columns output.
+# [20261018-6] RZ: Documented why the model and the schedule disagree (abort include overrides the post-message recheck).
+# ============================================================
+
+import numpy as np
+
+from sim_config import RESET_CYCLES
+from ITCH_config import ITCH_MESSAGES, MSG_LENGTHS, SIM_HEADERS, PARSER_HEADERS
+from helpers.profile_helper import profiled
+
+# Decoder instance order in parser.v / integrated.v
+_DECODER_ORDER = ("add", "cancel", "delete", "replace", "executed", "trade")
+
+# itch_len.vh: itch_length() lookup, including the default-2 fallback
+_ITCH_LENGTH = [2] * 256
+for _msg_type, _spec in ITCH_MESSAGES.items():
+    _ITCH_LENGTH[_spec["type_byte"]] = MSG_LENGTHS[_msg_type]
+
+# Decoder table, one entry per *_order_decoder.v instance, built from ITCH_MESSAGES.
+#   (msg_type, MSG_TYPE byte, parsed_type code, field registers)
+# Field registers are (RTL signal name, first byte_index, width in bytes); a width of 0
+# marks a side flag, which latches (byte_in == "S") instead of raw bytes.
+_DECODERS = tuple(
+    (msg_type, ITCH_MESSAGES[msg_type]["type_byte"], ITCH_MESSAGES[msg_type]["parsed_type"], tuple(
+        (signal, offset, 0 if kind == "side" else width)
+        for _, offset, width, kind, signal, _, _ in ITCH_MESSAGES[msg_type]["fields"] if signal is not None))
+    for msg_type in _DECODER_ORDER
+)
+
+# Per-decoder state list layout (followed by one slot per field register).
+# packet_invalid is not modelled: no recorder or parser output carries it.
+_BYTE_INDEX, _IS_ORDER, _SUPPRESS, _VALID, _PARSED_TYPE = range(5)
+_FIELD_BASE = 5
+
+# Longest message: each chunk keeps this many bytes of the previous one, so a
+# message straddling the boundary can be read back in one piece
+_TAIL = max(MSG_LENGTHS.values())
+
+# RTL signal names as seen by recorder.py / parser.v
+_VALID_SIGNALS = tuple(f"{ITCH_MESSAGES[msg_type]['prefix']}_internal_valid" for msg_type in _DECODER_ORDER)
+_TYPE_SIGNALS = tuple(f"{ITCH_MESSAGES[msg_type]['prefix']}_parsed_type" for msg_type in _DECODER_ORDER)
+
+# SIM_HEADERS column -> RTL signal name, where recorder.py renames it
+_SIM_HEADER_SIGNALS = {f"{msg_type}_internal_valid": f"{spec['prefix']}_internal_valid"
+                       for msg_type, spec in ITCH_MESSAGES.items()}
+for _spec in ITCH_MESSAGES.values():
+    for _, _, _, _, _signal, _column, _ in _spec["fields"]:
+        if _column is not None:
+            _SIM_HEADER_SIGNALS[_column] = _signal
+
+# parser.v output muxes: priority-ordered (internal valid, source signal) pairs
+_PARSER_MUX = {
+    "order_ref": (("add_internal_valid", "add_order_ref"), ("cancel_internal_valid", "cancel_order_ref"),
+                  ("delete_internal_valid", "delete_order_ref"), ("exec_internal_valid", "exec_order_ref"),
+                  ("trade_internal_valid", "trade_order_ref")),
+    "side":      (("add_internal_valid", "add_side"), ("trade_internal_valid", "trade_side")),
+    "shares":    (("add_internal_valid", "add_shares"), ("cancel_internal_valid", "cancel_canceled_shares"),
+                  ("replace_internal_valid", "replace_shares"), ("exec_internal_valid", "exec_shares"),
+                  ("trade_internal_valid", "trade_shares")),
+    "price":     (("add_internal_valid", "add_price"), ("replace_internal_valid", "replace_price"),
+                  ("trade_internal_valid", "trade_price")),
+    "new_order_ref": (("replace_internal_valid", "replace_new_order_ref"),),
+    "timestamp": (("exec_internal_valid", "exec_timestamp"), ("trade_internal_valid", "trade_timestamp")),
+    "misc_data": (("add_internal_valid", "add_stock_symbol"), ("trade_internal_valid", "trade_match_id"),
+                  ("exec_internal_valid", "exec_match_id"), ("replace_internal_valid", "replace_old_order_ref")),
+}
+
+# parser_latch_stage.v output names, in port order
+LATCH_HEADERS = [
+    "latched_valid",
+    "latched_type",
+    "latched_order_ref",
+    "latched_side",
+    "latched_shares",
+    "latched_price",
+    "latched_new_order_ref",
+    "latched_timestamp",
+    "latched_misc_data"
+]
+
+
+def _build_capture_table(msg_len, fields):
+    """
+    Expands a decoder's field list into a byte_index -> (field slot, shift) table.
+    Shift is None for side flags.
+    """
+    capture = [None] * msg_len
+    for slot, (_, first, width) in enumerate(fields):
+        if width == 0:
+            capture[first] = (_FIELD_BASE + slot, None)
+            continue
+        for k in range(width):
+            capture[first + k] = (_FIELD_BASE + slot, 8 * (width - 1 - k))
+    return capture
+
+
+_SPECS = tuple(
+    (type_byte, MSG_LENGTHS[msg_type], parsed_type, _build_capture_table(MSG_LENGTHS[msg_type], fields))
+    for msg_type, type_byte, parsed_type, fields in _DECODERS
+)
+_STATE_SIZES = tuple(_FIELD_BASE + len(fields) for _, _, _, fields in _DECODERS)
+
+_SIGNAL_INDEX = {}
+for _dec, (_msg_type, _type_byte, _parsed_type, _fields) in enumerate(_DECODERS):
+    _SIGNAL_INDEX[_VALID_SIGNALS[_dec]] = (_dec, _VALID)
+    _SIGNAL_INDEX[_TYPE_SIGNALS[_dec]] = (_dec, _PARSED_TYPE)
+    for _slot, (_name, _first, _width) in enumerate(_fields):
+        _SIGNAL_INDEX[_name] = (_dec, _FIELD_BASE + _slot)
+
+
+# Why the model and the schedule disagree on back-to-back streams
+# ----------------------------------------------------------------
+# On the byte after a message's last byte (byte_index == MSG_LENGTH) the decoder
+# runs ITCH_RECHECK_OR_SUPPRESS, which arms suppress_count for the next message
+# (or restarts on a copy of its type byte). itch_abort_on_valid_drop.vh comes
+# later in the same always_ff block and its `byte_index >= MSG_LENGTH` term fires
+# on that byte too, so its suppress_count <= 0 / byte_index <= 0 win. The next
+# message's type byte is consumed without arming suppression, and the decoder
+# that just finished hunts for a type byte inside that message's payload:
+#   - a payload byte equal to its own type byte starts a speculative decode,
+#     which pulses *_internal_valid on a cycle the schedule does not predict;
+#   - a payload byte that reads as another type arms that type's suppression,
+#     which can cover the next real type byte, so that message is missed;
+#   - a real copy of its type byte leaves it hunting (is_order 1, byte_index 0),
+#     so the second of two back-to-back messages of one type is dropped.
+# generate_expected_events_from_schedule() assumes the recheck wins (ideal
+# framing). This model follows the RTL as built: against Verilator it matches
+# both tops cycle for cycle. On the seed-1 permutation sequence (4,320 messages)
+# parser.v pulses 4,473 times: 382 speculative decodes, while 218 messages are
+# missed (203 under a false suppression, 15 inside a speculative decode) and 11
+# more collide with another decoder's valid, which parsed_valid rejects.
+
+
+def _step_decoder(state, spec, valid, byte):
+    """
+    Advances one decoder by one posedge (rst low), reproducing the non-blocking
+    assignment order of the decoder always_ff block and itch_suppression.vh.
+    """
+    msg_type, msg_len, parsed_type, capture = spec
+    byte_index, is_order, suppress_count = state[0], state[1], state[2]
+
+    # itch_suppression.vh (separate always_ff, counts regardless of valid_in)
+    if suppress_count:
+        state[_SUPPRESS] = suppress_count - 1
+        if not is_order and not byte_index:
+            return  # Decoder idle while suppressed: nothing else is assigned
+
+    if valid and suppress_count == 0:
+        # ITCH_CORE_DECODE
+        if byte_index == 0:
+            state[_IS_ORDER] = byte == msg_type
+            if byte == msg_type:
+                state[_BYTE_INDEX] = 1
+            else:
+                state[_SUPPRESS] = (_ITCH_LENGTH[byte] - 1) & 0x3F
+                state[_IS_ORDER] = False
+                state[_BYTE_INDEX] = 0
+        else:
+            state[_BYTE_INDEX] = (byte_index + 1) & 0x3F
+        state[_VALID] = 0
+
+        if is_order:
+            if byte_index < msg_len and capture[byte_index] is not None:
+                slot, shift = capture[byte_index]
+                if shift is None:
+                    state[slot] = int(byte == 0x53)  # "S"
+                else:
+                    state[slot] = (state[slot] & ~(0xFF << shift)) | (byte << shift)
+            if byte_index == msg_len - 1:
+                state[_VALID] = 1
+            state[_PARSED_TYPE] = parsed_type
+
+    aborted = is_order and ((not valid and 0 < byte_index < msg_len) or byte_index >= msg_len)
+
+    # ITCH_RECHECK_OR_SUPPRESS
+    if byte_index == msg_len:
+        for i in range(_VALID, len(state)):
+            state[i] = 0
+        if valid and byte == msg_type:
+            state[_IS_ORDER] = True
+            state[_BYTE_INDEX] = 1
+        elif valid:
+            state[_IS_ORDER] = False
+            state[_BYTE_INDEX] = 0
+            state[_SUPPRESS] = (_ITCH_LENGTH[byte] - 1) & 0x3F
+        else:
+            state[_IS_ORDER] = False
+            state[_BYTE_INDEX] = 0
+
+    # itch_abort_on_valid_drop.vh
+    if aborted:
+        state[_SUPPRESS] = 0
+        state[_BYTE_INDEX] = 0
+
+
+def _signal(states, name):
+    dec, slot = _SIGNAL_INDEX[name]
+    return states[dec][slot]
+
+
+def _parser_outputs(states):
+    """
+    Evaluates the combinational parser.v outputs from the current decoder registers.
+    Returns (parsed_valid, parsed_type, {canonical field: value}).
+    """
+    valids = [state[_VALID] for state in states]
+    active = sum(valids)
+    if active == 0:
+        return 0, 0, {key: 0 for key in _PARSER_MUX}
+
+    parsed_type = 0
+    for dec, valid in enumerate(valids):
+        if valid:
+            parsed_type = states[dec][_PARSED_TYPE]
+            break
+
+    fields = {}
+    for key, sources in _PARSER_MUX.items():
+        fields[key] = 0
+        for valid_name, source in sources:
+            if _signal(states, valid_name):
+                fields[key] = _signal(states, source)
+                break
+
+    return int(active == 1), parsed_type, fields
+
+
+def _sim_row(cycle, states):
+    row = {"cycle": cycle}
+    for key in SIM_HEADERS[1:]:
+        value = _signal(states, _SIM_HEADER_SIGNALS.get(key, key))
+        row[key] = int(value) if key.endswith("_internal_valid") else hex(value)
+    return row
+
+
+def _parser_row(cycle, parsed_valid, parsed_type, fields):
+    row = {"cycle": cycle, "parsed_valid": parsed_valid, "parsed_type": hex(parsed_type)}
+    for key in PARSER_HEADERS[3:]:
+        row[key] = hex(fields[key])
+    return row
+
+
+# Shorter chunks (triage_helper advances message by message) are cheaper through
+# the per-byte stepper than through the NumPy set-up of the fast path
+_FAST_MIN_BYTES = 512
+
+# Idle cycles the testbenches clock after the stream
+_DRAIN_CYCLES = 20
+
+# valid_in bytes -> 0/1
+_VALID_BYTES = bytes([0] + [1] * 255)
+
+
+def _decoder_run(spec, ext, mask, base, state):
+    """
+    Replays one decoder over ext[base:] decision by decision instead of byte by
+    byte. An idle or hunting decoder examines a valid byte: its own type byte
+    starts a message, any other byte suppresses it for itch_length(byte) cycles.
+    A started message needs MSG_LENGTH - 1 more valid bytes (the first gap aborts
+    it into a hunt) and pulses *_internal_valid on its last byte. The byte after
+    that is swallowed by the abort include: a valid copy of the type byte leaves
+    a hunt, anything else leaves the decoder idle.
+
+    Args:
+        spec: _SPECS entry of the decoder.
+        ext: Tail of the previous chunk + this chunk (bytes); ext[base] is the first new byte.
+        mask: valid_in per ext byte (0/1 bytes), or None when held high.
+        base (int): Length of the tail.
+        state: Decoder state before ext[base] (not modified).
+
+    Returns:
+        (starts, ends, done, hunts, control): per message its type byte position,
+        capture end (exclusive) and whether it completed; the positions where a
+        hunt examined its first valid byte (parsed_type is set there); and the
+        (byte_index, is_order, suppress_count) registers after the last byte.
+    """
+    type_byte, msg_len, _, _ = spec
+    lengths = _ITCH_LENGTH
+    n = len(ext)
+    starts, ends, done, hunts = [], [], [], []
+    byte_index, is_order, suppress_count = state[_BYTE_INDEX], state[_IS_ORDER], state[_SUPPRESS]
+    start, hunt, pos = None, False, base
+    if suppress_count:
+        pos = base + suppress_count
+    elif is_order and byte_index:
+        start = base - byte_index  # Message (or its check byte) carried over from the last chunk
+    elif is_order:
+        hunt = True
+
+    while True:
+        if start is None:
+            if hunt:
+                pos = pos if mask is None else mask.find(1, pos)
+                if pos < 0 or pos >= n:
+                    return starts, ends, done, hunts, (0, 1, 0)
+                hunts.append(pos)
+                hunt = False
+            if mask is None:
+                while pos < n:
+                    byte = ext[pos]
+                    if byte == type_byte:
+                        break
+                    pos += lengths[byte]
+            else:
+                while pos < n:
+                    if mask[pos]:
+                        byte = ext[pos]
+                        if byte == type_byte:
+                            break
+                        pos += lengths[byte]
+                    else:
+                        pos += 1
+            if pos >= n:
+                return starts, ends, done, hunts, (0, 0, pos - n)
+            start = pos
+
+        end = start + msg_len
+        starts.append(start)
+        if mask is not None:
+            gap = mask.find(0, max(start + 1, base), min(end, n))
+            if gap >= 0:
+                ends.append(gap)
+                done.append(False)
+                start, hunt, pos = None, True, gap + 1
+                continue
+        ends.append(min(end, n))
+        done.append(end <= n)
+        if end >= n:
+            return starts, ends, done, hunts, (n - start, 1, 0)
+        hunt = ext[end] == type_byte and (mask is None or mask[end])
+        start, pos = None, end + 1
+
+
+def _final_registers(spec, ext, base, state, run):
+    """
+    parsed_type and field registers (state[_PARSED_TYPE:] layout) after the last
+    byte of a _decoder_run(): whatever was captured since the last completed
+    message cleared them.
+    """
+    _, msg_len, parsed_type, capture = spec
+    starts, ends, done, hunts, _ = run
+    n = len(ext)
+    registers = list(state[_PARSED_TYPE:])
+    first, cleared = 0, base - 1
+    for i in range(len(starts) - 1, -1, -1):
+        if done[i] and base <= starts[i] + msg_len < n:
+            registers = [0] * len(registers)
+            first, cleared = i + 1, starts[i] + msg_len
+            break
+    if hunts and hunts[-1] > cleared:
+        registers[0] = parsed_type
+    for start, end in zip(starts[first:], ends[first:]):
+        if max(start + 1, base) < end:
+            registers[0] = parsed_type
+        for pos in range(max(start + 1, base), end):
+            if capture[pos - start] is None:
+                continue
+            slot, shift = capture[pos - start]
+            slot -= _PARSED_TYPE
+            if shift is None:
+                registers[slot] = int(ext[pos] == 0x53)  # "S"
+            else:
+                registers[slot] = (registers[slot] & ~(0xFF << shift)) | (ext[pos] << shift)
+    return registers
+
+
+def _register_columns(dec, ext_array, base, state, run, at):
+    """
+    Values of one decoder's parsed_type and field registers at the ext
+    positions `at`, looked up from the bytes each message captured.
+
+    Returns:
+        Dict[str, np.ndarray[uint64]] keyed by RTL signal name.
+    """
+    _, msg_len, parsed_type, _ = _SPECS[dec]
+    n = len(ext_array)
+    starts = np.asarray(run[0], dtype=np.int64)
+    ends = np.asarray(run[1], dtype=np.int64)
+    cleared = starts[np.asarray(run[2], dtype=bool)] + msg_len
+    cleared = cleared[(cleared >= base) & (cleared < n)]
+
+    def written(offset):
+        pos = starts + offset
+        return pos[(pos >= base) & (pos < ends)]
+
+    def lookup(pos, values, initial):
+        # Latest write (or clear) at or before each position, else the register's value before the chunk
+        pos = np.concatenate((pos, cleared))
+        values = np.concatenate((np.asarray(values, dtype=np.uint64), np.zeros(len(cleared), dtype=np.uint64)))
+        if not len(pos):
+            return np.full(len(at), initial, dtype=np.uint64)
+        order = np.argsort(pos, kind="stable")
+        index = np.searchsorted(pos[order], at, side="right") - 1
+        return np.where(index >= 0, values[order][np.maximum(index, 0)], np.uint64(initial))
+
+    type_set = np.concatenate((written(1), np.asarray(run[3], dtype=np.int64)))
+    registers = {_TYPE_SIGNALS[dec]: lookup(type_set, np.full(len(type_set), parsed_type), state[_PARSED_TYPE])}
+    for slot, (name, first, width) in enumerate(_DECODERS[dec][3]):
+        initial = state[_FIELD_BASE + slot]
+        if width == 0:
+            pos = written(first)
+            registers[name] = lookup(pos, ext_array[pos] == 0x53, initial)
+            continue
+        value = np.zeros(len(at), dtype=np.uint64)
+        for k in range(width):
+            shift = 8 * (width - 1 - k)
+            pos = written(first + k)
+            value |= lookup(pos, ext_array[pos], (initial >> shift) & 0xFF) << np.uint64(shift)
+        registers[name] = value
+    return registers
+
+
+def _advance_events(model, byte_stream, valid_mask, parser_mode):
+    """
+    events_only path of advance_reference_model(): same rows, as columns.
+
+    Returns:
+        Dict with 'cycle' (np.int64) and one np.uint64 array per PARSER_HEADERS /
+        SIM_HEADERS key.
+    """
+    stream = bytes(byte_stream)
+    tail = model["tail"]
+    base = len(tail)
+    ext = tail + stream
+    n = len(ext)
+    mask = None
+    if valid_mask is not None:
+        mask = bytes(valid_mask).translate(_VALID_BYTES)
+        mask = b"\x01" * base + mask if 0 in mask else None
+    ext_array = np.frombuffer(ext, dtype=np.uint8)
+
+    states = model["states"]
+    runs = [_decoder_run(spec, ext, mask, base, state) for spec, state in zip(_SPECS, states)]
+    pulses = []
+    for (_, msg_len, _, _), (starts, _, done, _, _) in zip(_SPECS, runs):
+        last = np.asarray(starts, dtype=np.int64)[np.asarray(done, dtype=bool)] + msg_len - 1
+        pulses.append(last[last >= base])
+
+    positions, counts = np.unique(np.concatenate(pulses), return_counts=True)
+    if parser_mode:
+        positions = positions[counts == 1]  # parsed_valid needs exactly one decoder valid
+        columns = {key: np.zeros(len(positions), dtype=np.uint64) for key in PARSER_HEADERS[1:]}
+        columns["parsed_valid"][:] = 1
+        for dec, (state, run) in enumerate(zip(states, runs)):
+            rows = np.isin(positions, pulses[dec])
+            if not rows.any():
+                continue
+            registers = _register_columns(dec, ext_array, base, state, run, positions[rows])
+            columns["parsed_type"][rows] = _SPECS[dec][2]
+            for key, sources in _PARSER_MUX.items():
+                source = next((source for valid_name, source in sources if _SIGNAL_INDEX[valid_name][0] == dec), None)
+                if source is not None:
+                    columns[key][rows] = registers[source]
+    else:
+        signals = {}
+        for dec, (state, run) in enumerate(zip(states, runs) if len(positions) else ()):
+            signals[_VALID_SIGNALS[dec]] = np.isin(positions, pulses[dec]).astype(np.uint64)
+            signals.update(_register_columns(dec, ext_array, base, state, run, positions))
+        empty = np.zeros(0, dtype=np.uint64)
+        columns = {key: signals.get(_SIM_HEADER_SIGNALS.get(key, key), empty) for key in SIM_HEADERS[1:]}
+    columns["cycle"] = positions - base + model["cycle"]
+
+    for dec, (spec, run) in enumerate(zip(_SPECS, runs)):
+        byte_index, is_order, suppress_count = run[4]
+        states[dec] = [byte_index, is_order, suppress_count, int(byte_index == spec[1])] + \
+            _final_registers(spec, ext, base, states[dec], run)
+    model["tail"] = ext[-_TAIL:]
+    model["cycle"] += len(stream)
+    return columns
+
+
+def _column_rows(columns, parser_mode):
+    # advance_reference_model() rows from _advance_events() columns
+    headers = PARSER_HEADERS if parser_mode else SIM_HEADERS
+    flags = {"parsed_valid"} if parser_mode else {key for key in headers if key.endswith("_internal_valid")}
+    values = [columns[key].tolist() for key in headers[1:]]
+    formats = [int if key in flags else hex for key in headers[1:]]
+    log = {}
+    for cycle, row in zip(columns["cycle"].tolist(), zip(*values)):
+        log[cycle] = {"cycle": cycle, **{key: fmt(value) for key, fmt, value in zip(headers[1:], formats, row)}}
+    return log
+
+
+def new_reference_model():
+    """
+    Returns a fresh model state (decoders and latch stage just out of reset),
+    for feeding a stream to advance_reference_model() chunk by chunk.
+    """
+    return {
+        "states": [[0] * size for size in _STATE_SIZES],
+        "latched": {key: 0 for key in LATCH_HEADERS},
+        # Byte i is clocked in on edge RESET_CYCLES + i and observed by the recorders on the next cycle
+        "cycle": RESET_CYCLES + 1,
+        "tail": b"",  # Last _TAIL bytes clocked in
+    }
+
+
+def advance_reference_model(model, byte_stream, valid_mask=None, parser_mode=False,
+                            events_only=False, include_latch=False):
+    """
+    Clocks the next part of the injected stream through a model created by
+    new_reference_model(). Arguments and row format as run_reference_model().
+
+    events_only chunks (without the latch stage) go through _decoder_run(),
+    which only steps the decoders' decisions in Python; every other cycle
+    falls out of the message positions. _step_decoder() stays the byte-level
+    reference for full rows and the latch stage.
+
+    Returns:
+        Dict[int, Dict] keyed by cycle for the cycles covered by this chunk.
+    """
+    if events_only and not include_latch and len(byte_stream) >= _FAST_MIN_BYTES:
+        return _column_rows(_advance_events(model, byte_stream, valid_mask, parser_mode), parser_mode)
+
+    if isinstance(byte_stream, (bytes, bytearray, memoryview)) or hasattr(byte_stream, "tobytes"):
+        byte_stream = bytes(byte_stream)
+    if valid_mask is None:
+        valid_mask = [1] * len(byte_stream)
+
+    states = model["states"]
+    latched = model["latched"]
+    cycle = model["cycle"]
+    log = {}
+
+    for byte, valid in zip(byte_stream, valid_mask):
+        if include_latch:
+            parsed_valid, parsed_type, fields = _parser_outputs(states)
+            if parsed_valid:
+                latched = {
+                    "latched_valid": 1,
+                    "latched_type": parsed_type,
+                    **{f"latched_{key}": value for key, value in fields.items()},
+                }
+
+        for state, spec in zip(states, _SPECS):
+            _step_decoder(state, spec, valid, byte)
+
+        any_valid = any(state[_VALID] for state in states)
+        if events_only and not any_valid:
+            cycle += 1
+            continue
+
+        if parser_mode:
+            parsed_valid, parsed_type, fields = _parser_outputs(states)
+            if events_only and not parsed_valid:
+                cycle += 1
+                continue
+            row = _parser_row(cycle, parsed_valid, parsed_type, fields)
+            if include_latch:
+                row.update({key: hex(value) if key != "latched_valid" else value
+                            for key, value in latched.items()})
+        else:
+            row = _sim_row(cycle, states)
+
+        log[cycle] = row
+        cycle += 1
+
+    model["latched"] = latched
+    model["cycle"] = cycle
+    model["tail"] = (model["tail"] + bytes(byte_stream))[-_TAIL:]
+    return log
+
+
+def run_reference_model(byte_stream, valid_mask=None, parser_mode=False,
+                        events_only=False, include_latch=False, drain_cycles=_DRAIN_CYCLES):
+    """
+    Runs the cycle-accurate pipeline model over an injected byte stream.
+
+    Args:
+        byte_stream: Iterable of byte_in values, one per injection cycle
+                     (list, bytes, bytearray or numpy uint8 array).
+        valid_mask:  Iterable of valid_in values aligned with byte_stream.
+                     Defaults to valid_in held high for every byte.
+        parser_mode: If True, rows follow PARSER_HEADERS (parser.v outputs),
+                     otherwise SIM_HEADERS (integrated.v decoder signals).
+        events_only: If True, only keep cycles where any *_internal_valid
+                     (or parsed_valid in parser mode) is high.
+        include_latch: In parser mode, add parser_latch_stage.v outputs
+                       (LATCH_HEADERS) to every row.
+        drain_cycles: Idle cycles (valid_in low) modelled after the stream,
+                      matching the drain loop in the testbenches.
+
+    Returns:
+        Dict[int, Dict] keyed by cycle, using the same cycle numbering and
+        formatting as recorder.py / recorder_parser.py.
+    """
+    options = dict(parser_mode=parser_mode, events_only=events_only, include_latch=include_latch)
+    model = new_reference_model()
+    log = advance_reference_model(model, byte_stream, valid_mask, **options)
+    log.update(advance_reference_model(model, bytes(drain_cycles), [0] * drain_cycles, **options))
+    return log
+
+
+@profiled("expected_events")
+def generate_expected_events_from_model(byte_stream, valid_mask=None, parser_mode=False, model=None, columns=False):
+    """
+    Builds expected events for compare_against_expected() from the reference model.
+    Unlike generate_expected_events_from_schedule(), every field of every valid
+    cycle is predicted, so gaps, valid drops and unknown types are handled.
+
+    Args:
+        model: Optional state from new_reference_model(); when given, the stream
+               is treated as the next chunk of a longer workload.
+        columns (bool): Return the compare_helper.expected_to_columns() layout
+                        directly instead of row dicts.
+
+    Returns:
+        List[Dict] with unified SIM_HEADERS / PARSER_HEADERS keys, or
+        {'cycle': np.ndarray[int64], header: (values np.uint64, present bool)}.
+    """
+    if model is None:
+        # One pass over the stream and the testbenches' drain cycles
+        model = new_reference_model()
+        drain = _DRAIN_CYCLES
+        byte_stream = bytes(byte_stream) + bytes(drain)
+        valid_mask = (b"\x01" * (len(byte_stream) - drain) if valid_mask is None else bytes(valid_mask)) + bytes(drain)
+    events = _advance_events(model, byte_stream, valid_mask, parser_mode)
+    if columns:
+        present = np.ones(len(events["cycle"]), dtype=bool)
+        return {key: value if key == "cycle" else (value, present) for key, value in events.items()}
+    log = _column_rows(events, parser_mode)
+    return [log[cycle] for cycle in sorted(log)]
@@ -0,0 +1,51 @@
+# ============================================================
+# report_helper.py
+# ============================================================
+#
+# Description: End-of-test report shared by the testbenches. Whatever path
+#              produced the mismatch report (online scoreboard, streamed logs
+#              or in-memory columns), it gets the same throughput, coverage,
+#              waveform and order-book sections, the same log lines, the same
+#              JSON report and profile, and the same pass/fail assertion.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: finish_testbench_report(), moved out of test_parser_canonical.py / test_integrated.py.
+# ============================================================
+
+from helpers.compare_helper import format_mismatch_report, write_mismatch_report
+from helpers.gap_model_helper import build_throughput_report, format_throughput_report
+from helpers.order_book_helper import build_book_report, format_book_report
+from helpers.profile_helper import finish_profiling, format_profile_report
+from helpers.wave_helper import wave_capture_report, format_wave_report
+
+
+def finish_testbench_report(dut, report, gaps, coverage, waves, report_path, profile_path,
+                            book=None, expected_book=None):
+    """
+    Completes a mismatch report and ends the test on it.
+
+    Adds the 'throughput' (gap state), 'transition_coverage' and 'waves'
+    sections, plus 'order_book' when a book was rebuilt (a failed
+    expected-book check fails the run). Logs each section, writes the report
+    to report_path and the profile (if profiling is on) to profile_path, then
+    asserts report['passed'].
+    """
+    report["throughput"] = build_throughput_report(gaps, report)
+    report["transition_coverage"] = coverage
+    report["waves"] = wave_capture_report(waves, report)
+    if book is not None:
+        report["order_book"] = build_book_report(book, expected_book=expected_book)
+        report["passed"] = report["passed"] and report["order_book"]["expected_check"]["passed"]
+        dut._log.info(format_book_report(report["order_book"]))
+    dut._log.info(format_mismatch_report(report))
+    dut._log.info(format_throughput_report(report["throughput"]))
+    dut._log.info(format_wave_report(report["waves"]))
+    write_mismatch_report(report, report_path)
+    profile = finish_profiling(profile_path)
+    if profile:
+        dut._log.info(format_profile_report(profile))
+    assert report["passed"], format_mismatch_report(report)
@@ -8,7 +8,7 @@
 #              Used by top-level and module-specific Cocotb testbenches.
 # Author: RZ
 # Start Date: 05042025
-# Version: 0.4
+# Version: 0.5
 
 # Changelog
 # =============================================
@@ -16,15 +16,19 @@
 # [20250504-2] RZ: Added reset_and_test_decoder_behavior for decoder scenarios.
 # [20250504-3] RZ: Adopted into new reset_helper.py from reset_utils.py.
 # [20250507-1] RZ: Added reset_midstream utility for recovery tests.
+# [20261018-1] RZ: Phase tags for the opt-in profiler (profile_helper.py).
 # =============================================
 
 import cocotb
 from cocotb.triggers import RisingEdge
 from cocotb.clock import Clock
 
+from helpers.profile_helper import profiled
+
 async def start_clock(dut, period_ns=10):
     cocotb.start_soon(Clock(dut.clk, period_ns, units="ns").start())
 
+@profiled("reset_dut")
 async def reset_dut(dut, duration_clks=2):
     dut.rst.value = 1
     for _ in range(duration_clks):
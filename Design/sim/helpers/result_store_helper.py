@@ -0,0 +1,407 @@
+# ============================================================
+# result_store_helper.py
+# ============================================================
+#
+# Description: Memory-mapped columnar result store for post-run analysis.
+#              A recorded or expected log (CSV, or a RECORD_STREAM=bin log) is
+#              converted once into fixed-width integer columns with validity
+#              bitmaps for the blank cells and a per-row message-type mask.
+#              The reader maps the file and selects by cycle range, message
+#              type and field without parsing (or even reading) the rest.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Store builder, mmap reader with cycle/type/field selection, CSV export.
+# ============================================================
+
+# Store file (.itchcol), little-endian:
+#   magic "ITCHCOL1" | uint32 meta length | meta JSON | zero padding to 8
+#   then the column sections, each 8-byte aligned, at offsets relative to
+#   the end of that padding:
+#     values:   fixed-width dtype (narrowest unsigned type for the column's
+#               largest value), one per non-blank cell in row order
+#     validity: ceil(rows / 8) bytes, bit i (LSB first) set when row i has a value
+#     ranks:    uint32 per RANK_ROWS rows, non-blank cells before that block
+# meta: 'headers' (CSV order), 'rows', 'sorted' (cycles ascending), 'decimal'
+# (columns written as plain ints in the CSV), 'types' (message type of each
+# bit of the 'types' section) and 'columns' {header: {'dtype', 'count' (non-blank
+# cells), 'values', 'validity', 'ranks'}}. A column without blanks has values for every row and
+# no validity / ranks sections (None); an all-blank column has no sections.
+#
+# Blank cells take no value slot, so the mostly-empty per-type columns of the
+# integrated layout cost one bit per row plus their actual values. The value
+# of row i sits at ranks[i // RANK_ROWS] + set bits from the block start to
+# i, so a row window reads at most one block of bits beyond its own.
+#
+# The 'types' section is one uint8 mask per row: bit n is set when the row
+# carries ITCH_MESSAGES type n, from the asserted <type>_internal_valid
+# (integrated layout) or from parsed_type on parsed_valid rows (parser
+# layout). Recorded integrated logs can have several decoders valid at once.
+#
+# Selections come back in the columnar layout build_mismatch_report() and
+# software_decoder_helper.decoded_expected_columns() use:
+#   {'cycle': int64 array, header: (values uint64, present bool)}
+
+import csv
+import itertools
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from ITCH_config import ITCH_MESSAGES
+from .log_writer_helper import iter_log_rows
+
+STORE_MAGIC = b"ITCHCOL1"
+STORE_SUFFIX = ".itchcol"
+BUILD_ROWS = 1 << 16  # CSV rows parsed per batch while building
+RANK_ROWS = 4096  # Rows per rank entry of a column with blanks (multiple of 8)
+
+# Bit n of the 'types' mask <-> message type n
+MSG_TYPE_BITS = list(ITCH_MESSAGES)
+_TYPE_BYTES = {chr(spec["type_byte"]): msg_type for msg_type, spec in ITCH_MESSAGES.items()}
+_PARSED_TYPES = {spec["parsed_type"]: msg_type for msg_type, spec in ITCH_MESSAGES.items()}
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _parse_batch(headers, rows):
+    # CSV cells of one batch -> {header: (values uint64, present bool)}, decimal headers
+    columns, decimal = {}, set()
+    for key, cells in zip(headers, zip(*rows)):
+        present = np.fromiter((cell != "" for cell in cells), dtype=bool, count=len(cells))
+        values = np.zeros(len(cells), dtype=np.uint64)
+        if present.any():
+            filled = [cell for cell in cells if cell != ""]
+            values[present] = [int(cell, 0) for cell in filled]
+            if any(not cell.startswith("0x") for cell in filled):
+                decimal.add(key)
+        columns[key] = (values, present)
+    return columns, decimal
+
+
+def _row_types(columns):
+    # Message-type mask of every row (see the layout notes above)
+    n = len(columns["cycle"][0])
+    types = np.zeros(n, dtype=np.uint8)
+    if "parsed_type" in columns:
+        values, present = columns["parsed_type"]
+        if "parsed_valid" in columns:
+            valid, valid_present = columns["parsed_valid"]
+            present = present & valid_present & (valid == 1)
+        for code, msg_type in _PARSED_TYPES.items():
+            types[present & (values == code)] |= 1 << MSG_TYPE_BITS.index(msg_type)
+    else:
+        for bit, msg_type in enumerate(MSG_TYPE_BITS):
+            key = f"{msg_type}_internal_valid"
+            if key in columns:
+                values, present = columns[key]
+                types[present & (values == 1)] |= 1 << bit
+    return types
+
+
+def write_result_store(path, headers, columns, decimal=()):
+    """
+    Writes integer columns as a store file.
+
+    Args:
+        path (str): Output file (.itchcol by convention).
+        headers: Column order, starting with "cycle".
+        columns: {header: (values, present)}; "cycle" must be fully present.
+        decimal: Headers exported as plain ints instead of hex strings.
+
+    Returns:
+        Store meta (see the layout notes above).
+    """
+    cycles, cycle_present = columns["cycle"]
+    if not cycle_present.all():
+        raise ValueError("Every row of a result store needs a cycle")
+    rows = len(cycles)
+    sections, meta_columns, offset = [], {}, 0
+
+    def add_section(data):
+        nonlocal offset
+        start = offset
+        sections.append((start, data))
+        offset = _align(start + len(data))
+        return start
+
+    for key in headers:
+        values, present = columns[key]
+        entry = {"dtype": None, "count": int(np.count_nonzero(present)), "values": None, "validity": None, "ranks": None}
+        if present.any():
+            dtype = np.dtype(np.min_scalar_type(int(values[present].max()))).newbyteorder("<")
+            entry["dtype"] = dtype.str
+            entry["values"] = add_section(values[present].astype(dtype).tobytes())
+            if not present.all():
+                entry["validity"] = add_section(np.packbits(present, bitorder="little").tobytes())
+                ranks = np.concatenate(([0], np.cumsum(present, dtype=np.uint64)))[::RANK_ROWS]
+                entry["ranks"] = add_section(ranks[:(rows + RANK_ROWS - 1) // RANK_ROWS].astype("<u4").tobytes())
+        meta_columns[key] = entry
+    types_offset = add_section(_row_types(columns).tobytes())
+
+    meta = {
+        "headers": list(headers),
+        "rows": rows,
+        "sorted": bool(np.all(cycles[1:] >= cycles[:-1])),
+        "decimal": sorted(set(decimal) | {"cycle"}),
+        "types": {"bits": MSG_TYPE_BITS, "offset": types_offset},
+        "columns": meta_columns,
+    }
+    blob = json.dumps(meta).encode()
+    head = STORE_MAGIC + struct.pack("<I", len(blob)) + blob
+    head += bytes(_align(len(head)) - len(head))
+    with open(path, "wb") as f:
+        f.write(head)
+        for start, data in sections:
+            f.seek(len(head) + start)
+            f.write(data)
+    return meta
+
+
+def build_result_store(log_path, store_path=None):
+    """
+    Converts a recorded / expected log (.csv, or a streamed .bin log) into a
+    store, parsing its cells once.
+
+    Returns:
+        (store path, meta)
+    """
+    if store_path is None:
+        store_path = log_path.rsplit(".", 1)[0] + STORE_SUFFIX
+    rows = iter_log_rows(log_path)
+    headers = next(rows, None)
+    if headers is None:
+        raise ValueError(f"{log_path} is empty")
+
+    parts = {key: ([], []) for key in headers}
+    decimal = set()
+    while True:
+        batch = list(itertools.islice(rows, BUILD_ROWS))
+        if not batch:
+            break
+        columns, batch_decimal = _parse_batch(headers, batch)
+        decimal |= batch_decimal
+        for key, (values, present) in columns.items():
+            parts[key][0].append(values)
+            parts[key][1].append(present)
+    columns = {key: (np.concatenate(values) if values else np.zeros(0, dtype=np.uint64),
+                     np.concatenate(present) if present else np.zeros(0, dtype=bool))
+               for key, (values, present) in parts.items()}
+    return store_path, write_result_store(store_path, headers, columns, decimal)
+
+
+def open_result_store(path):
+    """
+    Maps a store file. Column sections are only paged in when a selection
+    touches them.
+
+    Returns:
+        Store state for select_rows() / count_types() / close_result_store().
+    """
+    f = open(path, "rb")
+    try:
+        if f.read(len(STORE_MAGIC)) != STORE_MAGIC:
+            raise ValueError(f"{path} is not a result store")
+        (size,) = struct.unpack("<I", f.read(4))
+        meta = json.loads(f.read(size))
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        f.close()
+        raise
+    return {
+        "path": path,
+        "meta": meta,
+        "headers": meta["headers"],
+        "rows": meta["rows"],
+        "base": _align(len(STORE_MAGIC) + 4 + size),
+        "file": f,
+        "mmap": mm,
+        "views": {},
+    }
+
+
+def close_result_store(store):
+    store["views"].clear()  # Views into the map must go before it can close
+    store["mmap"].close()
+    store["file"].close()
+
+
+def _view(store, key, offset, dtype, count):
+    # Zero-copy array over one section of the map
+    view = store["views"].get(key)
+    if view is None:
+        view = np.frombuffer(store["mmap"], dtype=dtype, count=count, offset=store["base"] + offset)
+        store["views"][key] = view
+    return view
+
+
+def _values(store, key):
+    entry = store["meta"]["columns"][key]
+    return _view(store, key, entry["values"], np.dtype(entry["dtype"]), entry["count"])
+
+
+def _validity(store, key, lo, hi):
+    # Validity bits of rows lo..hi-1; only their bytes are read
+    entry = store["meta"]["columns"][key]
+    bits = _view(store, ("validity", key), entry["validity"], np.uint8, (store["rows"] + 7) // 8)
+    unpacked = np.unpackbits(bits[lo // 8:(hi + 7) // 8], bitorder="little")
+    return unpacked[lo % 8:lo % 8 + hi - lo].astype(bool)
+
+
+def _sparse_column(store, key, lo, hi):
+    # Rows lo..hi-1 of a column with blanks: locate the first value slot
+    # through the rank of lo's block, then scatter the window's values
+    entry = store["meta"]["columns"][key]
+    blocks = (store["rows"] + RANK_ROWS - 1) // RANK_ROWS
+    ranks = _view(store, ("ranks", key), entry["ranks"], np.dtype("<u4"), blocks)
+    block_start = lo - lo % RANK_ROWS
+    before = _validity(store, key, block_start, hi)
+    present = before[lo - block_start:]
+    first = int(ranks[lo // RANK_ROWS]) + int(np.count_nonzero(before[:lo - block_start])) if hi > lo else 0
+    values = np.zeros(hi - lo, dtype=np.uint64)
+    values[present] = _values(store, key)[first:first + int(np.count_nonzero(present))]
+    return values, present
+
+
+def _types(store):
+    return _view(store, "types", store["meta"]["types"]["offset"], np.uint8, store["rows"])
+
+
+def type_mask(msg_types):
+    """
+    'types' bits of message types given by name ("add"), type character
+    ("A") or parsed_type code (0), alone or in a list.
+    """
+    if isinstance(msg_types, (str, int)):
+        msg_types = [msg_types]
+    mask = 0
+    for msg_type in msg_types:
+        name = _PARSED_TYPES.get(msg_type) if isinstance(msg_type, int) else \
+               msg_type if msg_type in ITCH_MESSAGES else _TYPE_BYTES.get(msg_type)
+        if name is None:
+            raise ValueError(f"Unknown message type {msg_type!r}; use one of {MSG_TYPE_BITS}")
+        mask |= 1 << MSG_TYPE_BITS.index(name)
+    return mask
+
+
+def _row_range(store, cycles):
+    # (lo, hi, mask or None): rows of the cycle window, a slice when sorted
+    rows = store["rows"]
+    if cycles is None or not rows:
+        return 0, rows, None
+    first, last = cycles
+    first = 0 if first is None else max(first, 0)
+    last = np.iinfo(np.int64).max if last is None else last
+    if last < first:
+        return 0, 0, None
+    # uint64 bounds: comparing against the narrow column dtype must not overflow
+    first, last = np.uint64(first), np.uint64(last)
+    cycle_values = _values(store, "cycle")
+    if store["meta"]["sorted"]:
+        return (int(np.searchsorted(cycle_values, first, side="left")),
+                int(np.searchsorted(cycle_values, last, side="right")), None)
+    return 0, rows, (cycle_values >= first) & (cycle_values <= last)
+
+
+def select_rows(store, cycles=None, msg_types=None, fields=None):
+    """
+    Selects rows of a store.
+
+    Args:
+        cycles: (first, last) inclusive cycle window, either end None for
+                open; a binary search when the store is cycle-sorted.
+        msg_types: Message type(s) the rows must carry (see type_mask()).
+        fields: Headers to return (default: all); "cycle" is always returned.
+
+    Returns:
+        {'cycle': int64 array, header: (values uint64, present bool)}, the
+        layout build_mismatch_report() accepts as expected events.
+    """
+    headers = store["headers"]
+    fields = [key for key in headers if key != "cycle"] if fields is None else \
+             [key for key in fields if key != "cycle"]
+    unknown = [key for key in fields if key not in headers]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {unknown}; the store has {headers}")
+
+    lo, hi, mask = _row_range(store, cycles)
+    if msg_types is not None:
+        type_rows = (_types(store)[lo:hi] & type_mask(msg_types)) != 0
+        mask = type_rows if mask is None else mask[lo:hi] & type_rows
+    elif mask is not None:
+        mask = mask[lo:hi]
+    pick = slice(None) if mask is None else mask
+
+    def column(key):
+        entry = store["meta"]["columns"][key]
+        if entry["values"] is None:
+            return np.zeros(hi - lo, dtype=np.uint64), np.zeros(hi - lo, dtype=bool)
+        if entry["validity"] is not None:
+            return _sparse_column(store, key, lo, hi)
+        # astype copies out of the map
+        return _values(store, key)[lo:hi].astype(np.uint64), np.ones(hi - lo, dtype=bool)
+
+    selection = {"cycle": column("cycle")[0][pick].astype(np.int64)}
+    for key in fields:
+        values, present = column(key)
+        selection[key] = (values[pick], present[pick])
+    return selection
+
+
+def count_types(store, cycles=None):
+    """
+    Rows carrying each message type, optionally within a cycle window.
+
+    Returns:
+        {msg_type: rows}
+    """
+    lo, hi, mask = _row_range(store, cycles)
+    types = _types(store)[lo:hi]
+    if mask is not None:
+        types = types[mask[lo:hi]]
+    return {msg_type: int(np.count_nonzero(types & (1 << bit)))
+            for bit, msg_type in enumerate(MSG_TYPE_BITS)}
+
+
+def selection_rows(store, selection):
+    """
+    CSV cells of a selection, formatted like the source log (plain ints for
+    cycle and flags, hex otherwise, blanks where the log had none).
+
+    Yields:
+        The header row, then one list of cells per row.
+    """
+    keys = ["cycle"] + [key for key in store["headers"] if key in selection and key != "cycle"]
+    yield keys
+    decimal = set(store["meta"]["decimal"])
+    formatted = [[str(cycle) for cycle in selection["cycle"].tolist()]]
+    for key in keys[1:]:
+        values, present = selection[key]
+        fmt = str if key in decimal else hex
+        formatted.append([fmt(value) if here else "" for value, here in zip(values.tolist(), present.tolist())])
+    yield from (list(row) for row in zip(*formatted))
+
+
+def result_store_to_csv(store, csv_path, selection=None):
+    """
+    Writes a selection (default: the whole store) as CSV.
+
+    Returns:
+        Number of rows written.
+    """
+    rows = selection_rows(store, select_rows(store) if selection is None else selection)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(next(rows))
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
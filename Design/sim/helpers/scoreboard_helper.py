@@ -0,0 +1,239 @@
+# ============================================================
+# scoreboard_helper.py
+# ============================================================
+#
+# Description: Online streaming scoreboard for the ITCH testbenches.
+#              Expected events are queued by the workload loop as it generates
+#              them, and a monitor coroutine checks every valid cycle as it is
+#              sampled. Matched entries are dropped immediately, so memory stays
+#              bounded by the injection look-ahead instead of the run length.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.7
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial online scoreboard for decoder and parser layouts.
+# [20261018-2] RZ: Type lookups derived from the ITCH_MESSAGES layout table.
+# [20261018-3] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# [20261018-4] RZ: First-error hook and grace cycles for triggered waveform capture.
+# [20261018-5] RZ: push_expected() also takes columnar expected events.
+# [20261018-6] RZ: Integer cycle numbers (get_sim_time() returns float ns).
+# [20261018-7] RZ: Records until the test ends when total_cycles is None (gapped runs).
+# ============================================================
+
+from collections import deque
+
+from cocotb.triggers import RisingEdge
+from cocotb.utils import get_sim_time
+
+from sim_config import SIM_CLK_PERIOD_NS, ONLINE_SCOREBOARD_TOLERANCE
+from ITCH_config import SIM_HEADERS, PARSER_HEADERS, ITCH_MESSAGES
+from helpers.recorder import SIGNAL_MAP as SIM_SIGNAL_MAP, monitor_cycles
+from helpers.recorder_parser import SIGNAL_MAP as PARSER_SIGNAL_MAP
+from helpers.profile_helper import profiled
+
+# Valid column -> message type
+_VALID_TYPES = {f"{msg_type}_internal_valid": msg_type for msg_type in ITCH_MESSAGES}
+
+_PARSED_TYPES = {spec["parsed_type"]: msg_type for msg_type, spec in ITCH_MESSAGES.items()}
+
+
+def _to_int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def new_online_scoreboard(parser_mode=False, tolerance=ONLINE_SCOREBOARD_TOLERANCE, max_examples=10):
+    """
+    Creates an empty scoreboard.
+
+    Args:
+        parser_mode (bool): Check PARSER_HEADERS (parsed_valid) instead of the
+                            per-decoder SIM_HEADERS layout.
+        tolerance (int): Number of errors allowed before the monitor fails the
+                         test; 0 fails on the first divergence.
+        max_examples (int): Example mismatches kept for the report.
+
+    Returns:
+        Dict holding the expected queue, counters and the report.
+    """
+    headers = PARSER_HEADERS if parser_mode else SIM_HEADERS
+    valid_keys = ["parsed_valid"] if parser_mode else [key for key in headers if key in _VALID_TYPES]
+    return {
+        "parser_mode": parser_mode,
+        "headers": [key for key in headers if key != "cycle"],
+        "valid_keys": valid_keys,
+        "tolerance": tolerance,
+        "max_examples": max_examples,
+        "queue": deque(),
+        "errors": 0,
+        "first_error_cycle": None,
+        "on_first_error": None,  # Called with the cycle of the first error (wave_helper.py)
+        "report": {
+            "passed": True,
+            "expected_events": 0,
+            "recorded_cycles": 0,
+            "missing_cycles": 0,
+            "field_mismatches": 0,
+            "unexpected_valids": 0,
+            "by_field": {},
+            "by_type": {},
+            "examples": [],
+            "unexpected_examples": [],
+        },
+    }
+
+
+@profiled("scoreboard")
+def push_expected(scoreboard, events):
+    """
+    Queues expected events (rows from any generate_expected_events_* function,
+    or columns as from compare_helper.expected_to_columns()).
+    Events must be pushed in cycle order and before their cycle is sampled.
+    """
+    headers = scoreboard["headers"]
+    queue = scoreboard["queue"]
+    if isinstance(events, dict):
+        cycles = events["cycle"].tolist()
+        columns = [(key, events[key][0].tolist(), events[key][1].tolist()) for key in headers if key in events]
+        for index, cycle in enumerate(cycles):
+            fields = {key: values[index] for key, values, present in columns if present[index]}
+            queue.append((cycle, fields))
+        scoreboard["report"]["expected_events"] += len(cycles)
+        return
+    for event in events:
+        fields = {key: _to_int(event[key]) for key in headers if event.get(key, "") != ""}
+        queue.append((int(event["cycle"]), fields))
+    scoreboard["report"]["expected_events"] += len(events)
+
+
+def _event_type(scoreboard, fields):
+    if scoreboard["parser_mode"]:
+        return _PARSED_TYPES.get(fields.get("parsed_type"), "unknown")
+    for key, msg_type in _VALID_TYPES.items():
+        if fields.get(key) == 1:
+            return msg_type
+    return "unknown"
+
+
+def _record_error(scoreboard, field, msg_type, example, unexpected=False):
+    report = scoreboard["report"]
+    report["by_field"][field] = report["by_field"].get(field, 0) + 1
+    if unexpected:
+        report["unexpected_valids"] += 1
+        examples = report["unexpected_examples"]
+    else:
+        report["field_mismatches"] += 1
+        report["by_type"][msg_type] = report["by_type"].get(msg_type, 0) + 1
+        examples = report["examples"]
+    if len(examples) < scoreboard["max_examples"]:
+        examples.append(example)
+    report["passed"] = False
+    scoreboard["errors"] += 1
+    if scoreboard["first_error_cycle"] is None:
+        scoreboard["first_error_cycle"] = example["cycle"]
+        if scoreboard["on_first_error"] is not None:
+            scoreboard["on_first_error"](example["cycle"])
+
+
+def _expire(scoreboard, cycle):
+    """
+    Every queued event older than `cycle` was never seen: count it as missing.
+    """
+    queue = scoreboard["queue"]
+    while queue and queue[0][0] < cycle:
+        exp_cycle, fields = queue.popleft()
+        msg_type = _event_type(scoreboard, fields)
+        scoreboard["report"]["missing_cycles"] += 1
+        for key, value in fields.items():
+            _record_error(scoreboard, key, msg_type, {
+                "cycle": exp_cycle, "type": msg_type, "field": key,
+                "expected": hex(value), "actual": None})
+
+
+@profiled("scoreboard")
+def check_cycle(scoreboard, cycle, sample):
+    """
+    Checks one sampled cycle against the head of the expected queue.
+
+    Args:
+        cycle (int): Absolute cycle, numbered like the recorders.
+        sample (callable): Returns {header: int} for the given headers; only
+                           called on cycles with a valid or an expected event.
+
+    Returns:
+        Number of new errors found on this cycle.
+    """
+    before = scoreboard["errors"]
+    queue = scoreboard["queue"]
+    report = scoreboard["report"]
+    report["recorded_cycles"] += 1
+    _expire(scoreboard, cycle)
+
+    expected = []
+    while queue and queue[0][0] == cycle:
+        expected.append(queue.popleft()[1])
+
+    valids = sample(scoreboard["valid_keys"])
+    if not expected and not any(valids.values()):
+        return 0
+
+    actual = sample(scoreboard["headers"])
+    for fields in expected:
+        msg_type = _event_type(scoreboard, fields)
+        for key, value in fields.items():
+            if actual[key] != value:
+                _record_error(scoreboard, key, msg_type, {
+                    "cycle": cycle, "type": msg_type, "field": key,
+                    "expected": hex(value), "actual": hex(actual[key])})
+
+    for key, value in valids.items():
+        if value == 1 and not any(fields.get(key) == 1 for fields in expected):
+            msg_type = _event_type(scoreboard, actual) if scoreboard["parser_mode"] else _VALID_TYPES[key]
+            _record_error(scoreboard, key, msg_type,
+                          {"cycle": cycle, "type": msg_type, "field": key}, unexpected=True)
+
+    return scoreboard["errors"] - before
+
+
+def finish_online_scoreboard(scoreboard):
+    """
+    Flushes events that were queued but never reached and returns the report,
+    in the same layout as compare_helper.build_mismatch_report().
+    """
+    _expire(scoreboard, float("inf"))
+    return scoreboard["report"]
+
+
+async def run_online_scoreboard(dut, scoreboard, total_cycles=300, grace_cycles=0):
+    """
+    Monitor coroutine: samples the DUT every clock, using the recorders' cycle
+    numbering and signal maps, and checks each cycle as it happens. Raises
+    AssertionError once the error count exceeds the tolerance, which fails
+    the running cocotb test; `grace_cycles` keeps the simulation going that
+    much longer first (e.g. to dump waves after a triggering mismatch).
+    """
+    from helpers.compare_helper import format_mismatch_report
+
+    signal_map = PARSER_SIGNAL_MAP if scoreboard["parser_mode"] else SIM_SIGNAL_MAP
+    handles = {key: getattr(dut, signal_map[key][0])
+               for key in scoreboard["headers"] if hasattr(dut, signal_map[key][0])}
+    for key in scoreboard["headers"]:
+        handles.setdefault(key, None)
+
+    def sample(keys):
+        return {key: int(handles[key].value) if handles[key] is not None else 0 for key in keys}
+
+    await RisingEdge(dut.clk)
+    abs_cycle = int(get_sim_time('ns')) // SIM_CLK_PERIOD_NS
+
+    stop_cycle = None
+    for _ in monitor_cycles(total_cycles):
+        await RisingEdge(dut.clk)
+        abs_cycle += 1
+        if check_cycle(scoreboard, abs_cycle, sample) and scoreboard["errors"] > scoreboard["tolerance"] \
+                and stop_cycle is None:
+            stop_cycle = abs_cycle + grace_cycles
+        if stop_cycle is not None and abs_cycle >= stop_cycle:
+            raise AssertionError(f"Online scoreboard stopped at cycle {abs_cycle}\n"
+                                 + format_mismatch_report(scoreboard["report"]))
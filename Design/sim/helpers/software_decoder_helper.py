@@ -0,0 +1,321 @@
+# ============================================================
+# software_decoder_helper.py
+# ============================================================
+#
+# Description: Software ITCH decoder with the parser's canonical output.
+#              Takes a bytes/memoryview buffer of back-to-back messages (the
+#              framing the RTL sees, lengths from MSG_LENGTHS) and bulk-decodes
+#              it into per-type NumPy structured arrays and the canonical
+#              parsed_type/order_ref/side/shares/price/new_order_ref/timestamp/
+#              misc_data columns of parser.v. Used as the software fallback
+#              path, as a columnar expected-event oracle and as the baseline
+#              the hardware is benchmarked against.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Framing scan, vectorized field decode, canonical and expected columns.
+# [20261018-2] RZ: Length-table resync and range decode for parallel_decoder_helper.py.
+# ============================================================
+
+# Framing: a message starts with its type byte and spans MSG_LENGTHS bytes. A
+# byte that is no known type is skipped (counted in 'skipped_bytes'); an
+# incomplete message at the end of the buffer is left unconsumed so a stream
+# can be decoded chunk by chunk (iter_decode_stream()).
+#
+# Finding the boundaries is inherently sequential (each start depends on the
+# previous type byte), so it is one tight integer scan; measured against
+# pointer-doubling in NumPy it is ~10x faster for realistic buffers. Every
+# field is then gathered and converted for all messages of a type at once.
+
+from array import array
+
+import numpy as np
+
+from sim_config import RESET_CYCLES
+from ITCH_config import ITCH_MESSAGES, MSG_LENGTHS, PARSER_HEADERS, SIM_HEADERS
+from .payload_batch_helper import MSG_TYPES, MSG_DTYPES
+from .profile_helper import profiled
+
+# Successive length-table hops that must land on type bytes to accept a resync point
+RESYNC_DEPTH = 8
+
+# Canonical parser columns (PARSER_HEADERS without cycle and parsed_valid)
+CANONICAL_COLUMNS = [key for key in PARSER_HEADERS if key not in ("cycle", "parsed_valid")]
+
+# Type byte -> message length (0: not a type byte)
+_LENGTH_BY_BYTE = [0] * 256
+for _msg_type, _spec in ITCH_MESSAGES.items():
+    _LENGTH_BY_BYTE[_spec["type_byte"]] = MSG_LENGTHS[_msg_type]
+_LENGTH_BY_BYTE = tuple(_LENGTH_BY_BYTE)
+_LENGTH_TABLE = np.array(_LENGTH_BY_BYTE, dtype=np.int64)
+
+# Type byte -> index into MSG_TYPES
+_CODE_BY_BYTE = np.full(256, 255, dtype=np.uint8)
+for _code, _msg_type in enumerate(MSG_TYPES):
+    _CODE_BY_BYTE[ITCH_MESSAGES[_msg_type]["type_byte"]] = _code
+
+# Per type: decoded fields as (offset, width, kind, SIM column, PARSER column)
+_FIELDS = {
+    msg_type: [(offset, width, kind, sim_column, parser_column)
+               for name, offset, width, kind, _, sim_column, parser_column in spec["fields"]
+               if kind != "pad" and name != "msg_type" and (sim_column or parser_column)]
+    for msg_type, spec in ITCH_MESSAGES.items()
+}
+
+
+def find_message_starts(buf):
+    """
+    Scans the framing of a buffer.
+
+    Args:
+        buf: bytes / bytearray / memoryview of back-to-back messages.
+
+    Returns:
+        (starts, consumed, skipped): np.ndarray[int64] of message start offsets,
+        bytes consumed (a trailing partial message is not), and the number of
+        skipped non-type bytes.
+    """
+    data = buf  # Indexing bytes, bytearray, memoryview or mmap yields ints; no copy
+    lengths = _LENGTH_BY_BYTE
+    n = len(data)
+    starts = array('q')
+    append = starts.append
+    pos = 0
+    skipped = 0
+    while pos < n:
+        length = lengths[data[pos]]
+        if not length:
+            pos += 1
+            skipped += 1
+            continue
+        if pos + length > n:
+            break
+        append(pos)
+        pos += length
+    return np.frombuffer(starts, dtype=np.int64), pos, skipped
+
+
+def _field_values(raw, starts, offset, width, kind):
+    # Big-endian integer (RTL register value) of one field for every message
+    if kind == "side":
+        return (raw[starts + offset] == ord('S')).astype(np.uint64)
+    padded = np.zeros((len(starts), 8), dtype=np.uint8)
+    padded[:, 8 - width:] = raw[starts[:, None] + offset + np.arange(width)]
+    return padded.view(">u8").reshape(len(starts)).astype(np.uint64)
+
+
+@profiled("software_decode")
+def decode_stream(buf, records=True):
+    """
+    Bulk-decodes a buffer of back-to-back messages.
+
+    Args:
+        buf: bytes / bytearray / memoryview.
+        records (bool): Also return the per-type structured arrays.
+
+    Returns:
+        {
+            'count': messages decoded,
+            'offsets': np.ndarray[int64] start byte per message (stream order),
+            'types': np.ndarray[uint8] index into MSG_TYPES per message,
+            'parsed_type', 'order_ref', ...: canonical columns (np.uint64),
+            'present': {column: bool mask of messages that drive it},
+            'records': {msg_type: MSG_DTYPES records} (if requested),
+            'raw': the buffer as np.uint8 (no copy),
+            'consumed': bytes consumed, 'skipped_bytes': non-type bytes skipped
+        }
+    """
+    starts, consumed, skipped = find_message_starts(buf)
+    return _decode_framed(buf, starts, consumed, skipped, records)
+
+
+def _decode_framed(buf, starts, consumed, skipped, records):
+    # Field decode of already framed messages (decode_stream(), decode_range())
+    raw = np.frombuffer(buf, dtype=np.uint8)
+    count = len(starts)
+    types = _CODE_BY_BYTE[raw[starts]]
+
+    decoded = {
+        "count": count,
+        "offsets": starts,
+        "types": types,
+        "present": {key: np.zeros(count, dtype=bool) for key in CANONICAL_COLUMNS},
+        "raw": raw,
+        "consumed": consumed,
+        "skipped_bytes": skipped,
+    }
+    for key in CANONICAL_COLUMNS:
+        decoded[key] = np.zeros(count, dtype=np.uint64)
+    decoded["present"]["parsed_type"][:] = True
+    if records:
+        decoded["records"] = {}
+
+    for code, msg_type in enumerate(MSG_TYPES):
+        rows = np.flatnonzero(types == code)
+        type_starts = starts[rows]
+        decoded["parsed_type"][rows] = ITCH_MESSAGES[msg_type]["parsed_type"]
+        for offset, width, kind, _, column in _FIELDS[msg_type]:
+            if column is None:
+                continue
+            decoded[column][rows] = _field_values(raw, type_starts, offset, width, kind)
+            decoded["present"][column][rows] = True
+        if records:
+            length = MSG_LENGTHS[msg_type]
+            block = raw[type_starts[:, None] + np.arange(length)] if len(rows) else np.zeros((0, length), np.uint8)
+            decoded["records"][msg_type] = np.ascontiguousarray(block).view(MSG_DTYPES[msg_type]).reshape(len(rows))
+    return decoded
+
+
+def resync_offset(buf, start, depth=RESYNC_DEPTH):
+    """
+    First message boundary at or after `start` in a buffer entered at an
+    arbitrary byte: a type byte from which `depth` successive hops through the
+    length table (as itch_length() in rtl/macros/itch_len.vh) all land on type
+    bytes, or exactly on the end of the buffer.
+
+    Returns:
+        Offset of the boundary, or len(buf) when none is found.
+    """
+    lengths = _LENGTH_BY_BYTE
+    n = len(buf)
+    for pos in range(start, n):
+        hop = pos
+        for _ in range(depth):
+            length = lengths[buf[hop]]
+            if not length:
+                break
+            hop += length
+            if hop >= n:
+                return pos  # Chain runs off the end of the buffer
+        else:
+            return pos
+    return n
+
+
+def decode_range(buf, start, end, resync=True, records=False):
+    """
+    Decodes the messages of `buf` that start in [start, end), entering at a
+    resynchronized boundary (resync_offset()) unless `resync` is False.
+    Messages starting before `end` may extend past it.
+
+    Returns:
+        decode_stream() result with offsets relative to `buf` ('raw' holds
+        only the decoded window starting at 'sync'), plus 'sync'
+        (first boundary used) and 'stop' (where decoding of the following
+        range continues; equals the next range's 'sync' when the framing
+        agrees).
+    """
+    sync = resync_offset(buf, start) if resync and start else start
+    window_end = min(len(buf), max(end, sync) + max(MSG_LENGTHS.values()))
+    window = buf[sync:window_end]
+    starts, consumed, _ = find_message_starts(window)
+    window_raw = np.frombuffer(window, dtype=np.uint8)
+    kept = int(np.searchsorted(starts, end - sync))
+    stop = sync + (int(starts[kept]) if kept < len(starts) else consumed)
+    if kept < len(starts):
+        consumed = int(starts[kept])
+    # Non-type bytes skipped in [sync, stop)
+    skipped = (stop - sync) - int(_LENGTH_TABLE[window_raw[starts[:kept]]].sum()) if kept else stop - sync
+    decoded = _decode_framed(window, starts[:kept], consumed, skipped, records)
+    decoded["offsets"] = decoded["offsets"] + sync
+    decoded["sync"] = sync
+    decoded["stop"] = stop
+    return decoded
+
+
+def iter_decode_stream(chunks, records=False):
+    """
+    Decodes a stream delivered in arbitrary chunks (e.g. an mmap read in
+    slices); a message split across chunks is carried over to the next one.
+
+    Yields:
+        decode_stream() results plus 'stream_offset', the stream position of
+        the decoded buffer's first byte.
+    """
+    carry = b""
+    base = 0
+    for chunk in chunks:
+        buf = carry + bytes(chunk) if carry else chunk
+        decoded = decode_stream(buf, records)
+        decoded["stream_offset"] = base
+        consumed = decoded["consumed"]
+        carry = bytes(buf[consumed:])
+        base += consumed
+        yield decoded
+
+
+def decoded_expected_columns(decoded, parser_mode=True, valid_mask=None, cycle_base=0):
+    """
+    Columnar expected events for compare_helper.build_mismatch_report(), the
+    same predictions as generate_expected_events_from_schedule() without any
+    per-message rows.
+
+    Args:
+        decoded: decode_stream() result of the injected (ungapped) bytes.
+        parser_mode (bool): PARSER_HEADERS layout instead of SIM_HEADERS.
+        valid_mask: Optional 0/1 bytes per cycle when the stream was injected
+                    with gaps; the decoded buffer is then the valid bytes only.
+        cycle_base (int): Injection cycle of the first byte.
+
+    Returns:
+        {'cycle': np.ndarray[int64], header: (values np.uint64, present bool)}
+    """
+    count = decoded["count"]
+    types = decoded["types"]
+    lengths = np.array([MSG_LENGTHS[msg_type] for msg_type in MSG_TYPES], dtype=np.int64)[types]
+    last_byte = decoded["offsets"] + lengths - 1
+    if valid_mask is not None:
+        byte_cycles = np.flatnonzero(np.frombuffer(bytes(valid_mask), dtype=np.uint8))
+        last_byte = byte_cycles[last_byte]
+    columns = {"cycle": last_byte + 1 + RESET_CYCLES + cycle_base}
+
+    if parser_mode:
+        columns["parsed_valid"] = (np.ones(count, dtype=np.uint64), np.ones(count, dtype=bool))
+        for key in CANONICAL_COLUMNS:
+            columns[key] = (decoded[key], decoded["present"][key])
+        return columns
+
+    # Integrated layout: one valid and parsed_type column per decoder, fields per SIM column
+    raw_columns = {key: (np.zeros(count, dtype=np.uint64), np.zeros(count, dtype=bool))
+                   for key in SIM_HEADERS if key != "cycle"}
+    for code, msg_type in enumerate(MSG_TYPES):
+        spec = ITCH_MESSAGES[msg_type]
+        rows = types == code
+        for key, value in ((f"{msg_type}_internal_valid", 1), (f"{spec['prefix']}_parsed_type", spec["parsed_type"])):
+            raw_columns[key][0][rows] = value
+            raw_columns[key][1][rows] = True
+        offsets = decoded["offsets"][rows]
+        for offset, width, kind, column, _ in _FIELDS[msg_type]:
+            if column is None:
+                continue
+            raw_columns[column][0][rows] = _field_values(decoded["raw"], offsets, offset, width, kind)
+            raw_columns[column][1][rows] = True
+    columns.update(raw_columns)
+    return columns
+
+
+def software_decoder_throughput(buf, repeats=3):
+    """
+    Best-of-`repeats` decode throughput of a buffer.
+
+    Returns:
+        Dict with bytes, messages, seconds, MB/s and messages/s.
+    """
+    import time
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        decoded = decode_stream(buf)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "bytes": len(buf),
+        "messages": decoded["count"],
+        "seconds": best,
+        "mb_per_second": len(buf) / best / 1e6 if best else 0.0,
+        "messages_per_second": decoded["count"] / best if best else 0.0,
+    }
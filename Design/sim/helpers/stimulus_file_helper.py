@@ -0,0 +1,93 @@
+# ============================================================
+# stimulus_file_helper.py
+# ============================================================
+#
+# Description: File-backed stimulus for the testbenches. The workload is written
+#              to a binary record file and streamed into the DUT by
+#              rtl/stream_stimulus.v (built with FILE_STIMULUS=1), so Python only
+#              starts the driver and waits for it instead of awaiting every byte.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Record file writer and start/wait coroutine for stream_stimulus.v.
+# [20261018-2] RZ: Phase tags for the opt-in profiler (profile_helper.py).
+# ============================================================
+
+from cocotb.triggers import RisingEdge, First, Timer
+
+from sim_config import SIM_CLK_PERIOD_NS
+from helpers.profile_helper import profiled
+
+VALID_FLAG = 0x01  # flags[0] of a record drives valid_in
+
+
+def encode_stimulus_records(stream, valid_mask=None):
+    """
+    Interleaves a byte stream and its valid mask into {flags, data} records.
+
+    Args:
+        stream: Bytes injected one per cycle (bytes, bytearray or list of ints).
+        valid_mask: Optional per-cycle 0/1 valid flags (bytes or list), same
+                    length as stream; None drives valid_in high on every cycle.
+
+    Returns:
+        bytes, 2 per cycle.
+    """
+    import numpy as np
+
+    data = np.frombuffer(bytes(stream), dtype=np.uint8)
+    records = np.empty((len(data), 2), dtype=np.uint8)
+    if valid_mask is None:
+        records[:, 0] = VALID_FLAG
+    else:
+        records[:, 0] = (np.frombuffer(bytes(valid_mask), dtype=np.uint8) != 0) * VALID_FLAG
+    records[:, 1] = data
+    return records.tobytes()
+
+
+def open_stimulus_file(path):
+    """
+    Opens (truncates) the record file. Chunks are appended with
+    write_stimulus_chunk() as the workload is generated.
+    """
+    return open(path, "wb")
+
+
+@profiled("stimulus_write")
+def write_stimulus_chunk(f, stream, valid_mask=None):
+    """
+    Appends one workload chunk to an open record file.
+
+    Returns:
+        Number of cycles written.
+    """
+    f.write(encode_stimulus_records(stream, valid_mask))
+    return len(stream)
+
+
+async def run_file_stimulus(dut, timeout_cycles=None):
+    """
+    Starts stream_stimulus.v and waits until the last record has been clocked.
+    Must be called right after a rising edge (e.g. after reset_dut) so record 0
+    lands on the same edge the per-byte driver would use. The file has to be
+    complete and closed before this is called.
+
+    Args:
+        timeout_cycles (int, optional): Fail if the driver is not done after
+                                        this many cycles.
+    """
+    if not hasattr(dut, "stim_start"):
+        raise RuntimeError("DUT was built without FILE_STIMULUS; run make with FILE_STIMULUS=1")
+
+    dut.stim_start.value = 1
+    if timeout_cycles is None:
+        await RisingEdge(dut.stim_done)
+        return
+
+    done = RisingEdge(dut.stim_done)
+    result = await First(done, Timer(timeout_cycles * SIM_CLK_PERIOD_NS, units="ns"))
+    if result is not done:
+        raise AssertionError(f"stream_stimulus not done after {timeout_cycles} cycles")
@@ -0,0 +1,51 @@
+# ============================================================
+# conftest.py
+# ============================================================
+#
+# Description: Shared fixtures for the helper unit checks. These run in
+#              plain pytest, without a simulator:
+#                  cd Design/sim && python -m pytest helpers/tests
+#              The helpers import sim_config / ITCH_config from the sim
+#              directory, so it goes on sys.path first.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: sim directory on sys.path, seeded workload fixtures.
+# ============================================================
+
+import os
+import sys
+
+import pytest
+
+SIM_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if SIM_DIR not in sys.path:
+    sys.path.insert(0, SIM_DIR)
+
+from helpers.msg_sequence_helper import generate_permutation_coverage_sequence  # noqa: E402
+from helpers.full_workload_helper import run_full_payload_workload  # noqa: E402
+from helpers.order_flow_helper import new_order_flow, iter_order_flow_workload  # noqa: E402
+from sim_config import ORDER_FLOW_PARAMS  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def permutation_workload():
+    """
+    Every ordering of the six types (4,320 messages, ~119 kB), seeded
+    payloads: one run_full_payload_workload() chunk.
+    """
+    return run_full_payload_workload(generate_permutation_coverage_sequence(), seed=1)
+
+
+@pytest.fixture(scope="session")
+def order_flow_chunks():
+    """
+    A seeded order flow (same-type repeats, live order refs) in a few chunks,
+    with the generator state for book checks.
+    """
+    state = new_order_flow(ORDER_FLOW_PARAMS, seed=3)
+    chunks = list(iter_order_flow_workload(3000, ORDER_FLOW_PARAMS, chunk_messages=1000, state=state))
+    return chunks, state
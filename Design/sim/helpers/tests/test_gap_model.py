@@ -0,0 +1,99 @@
+# ============================================================
+# test_gap_model.py
+# ============================================================
+#
+# Description: Gap injection keeps the bytes and re-times the schedule onto
+#              the gapped stream; without a model a chunk's own mask is kept.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Re-timing, abort accounting, duty rate and pass-through checks.
+# ============================================================
+
+import numpy as np
+import pytest
+
+from helpers.gap_model_helper import new_gap_state, apply_gap_model, build_throughput_report
+from helpers.full_workload_helper import iter_payload_workload
+from helpers.msg_sequence_helper import generate_permutation_coverage_sequence
+from sim_config import RESET_CYCLES, GAP_PARAMS
+
+MODELS = ["duty", "bernoulli", "burst"]
+
+
+def gapped_run(model, scope, seed=5):
+    chunks = iter_payload_workload(generate_permutation_coverage_sequence(), chunk_messages=500, seed=1)
+    state = new_gap_state(model, GAP_PARAMS, scope, seed=seed)
+    return [(chunk, apply_gap_model(state, chunk)) for chunk in chunks], state
+
+
+def check_retimed(original, gapped, cycle_base):
+    # Valid bytes are the original stream; every kept event's payload sits on
+    # valid cycles right before its expected cycle
+    stream = np.frombuffer(gapped["full_stream"], dtype=np.uint8)
+    mask = np.frombuffer(gapped["valid_mask"], dtype=bool)
+    assert len(stream) == len(mask)
+    assert stream[mask].tobytes() == bytes(original["full_stream"])
+    assert not stream[~mask].any()  # Idle cycles carry byte 0
+    for event in gapped["injection_schedule"]:
+        payload = bytes(event["payload"])
+        last = event["expected_valid_cycle"] - RESET_CYCLES - 1 - cycle_base
+        first = last - len(payload) + 1
+        assert mask[first:last + 1].all()
+        assert stream[first:last + 1].tobytes() == payload
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_message_scope_keeps_messages_whole(model):
+    run, state = gapped_run(model, "message")
+    cycle_base = 0
+    for original, gapped in run:
+        assert len(gapped["injection_schedule"]) == len(original["injection_schedule"])
+        check_retimed(original, gapped, cycle_base)
+        cycle_base += len(gapped["full_stream"])
+    assert state["aborted_messages"] == 0
+    assert state["cycles"] == cycle_base
+    assert state["cycles"] > state["bytes"]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_byte_scope_drops_split_messages(model):
+    run, state = gapped_run(model, "byte")
+    cycle_base = 0
+    kept = 0
+    for original, gapped in run:
+        check_retimed(original, gapped, cycle_base)
+        cycle_base += len(gapped["full_stream"])
+        kept += len(gapped["injection_schedule"])
+    assert state["aborted_messages"] > 0
+    assert kept + state["aborted_messages"] == state["messages"]
+    throughput = build_throughput_report(state)
+    assert throughput["idle_cycles"] == state["cycles"] - state["bytes"]
+
+
+def test_duty_model_holds_its_rate():
+    _, state = gapped_run("duty", "byte")
+    assert state["bytes"] / state["cycles"] == pytest.approx(GAP_PARAMS["duty"], abs=1e-3)
+
+
+def test_seeded_gaps_repeat():
+    first, _ = gapped_run("bernoulli", "byte", seed=9)
+    second, _ = gapped_run("bernoulli", "byte", seed=9)
+    assert [gapped["valid_mask"] for _, gapped in first] == [gapped["valid_mask"] for _, gapped in second]
+
+
+def test_no_model_keeps_a_chunk_mask():
+    run, _ = gapped_run("bernoulli", "byte")
+    gapped = run[0][1]
+    state = new_gap_state(None)
+    passed = apply_gap_model(state, gapped)
+    assert passed["valid_mask"] == gapped["valid_mask"]
+    assert passed["full_stream"] == gapped["full_stream"]
+    assert state["cycles"] == len(gapped["full_stream"])
+    assert state["bytes"] == np.count_nonzero(np.frombuffer(gapped["valid_mask"], dtype=np.uint8))
+
+    ungapped = apply_gap_model(new_gap_state(None), run[0][0])
+    assert ungapped["valid_mask"] is None
@@ -0,0 +1,84 @@
+# ============================================================
+# test_log_writer.py
+# ============================================================
+#
+# Description: Streamed logs read back as they were written: recorder
+#              columns through the binary and CSV writers, expected columns
+#              through the CSV writer.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Binary / CSV / expected-column round trips.
+# ============================================================
+
+from array import array
+
+import numpy as np
+import pytest
+
+from helpers.log_writer_helper import (open_log_writer, submit_columns, submit_expected_columns, close_log_writer,
+                                       read_log_columns, iter_log_columns, iter_expected_columns, write_log_columns,
+                                       binary_log_to_csv)
+from helpers.reference_model import generate_expected_events_from_model
+from ITCH_config import PARSER_HEADERS
+
+
+def recorder_columns(rows, seed=0):
+    # Recorder-shaped buffers ({header: array('Q')}), values of every width
+    rng = np.random.default_rng(seed)
+    columns = {"cycle": array('Q', range(100, 100 + rows))}
+    for key in PARSER_HEADERS[1:]:
+        bits = int(rng.integers(1, 64))
+        columns[key] = array('Q', rng.integers(0, 1 << bits, size=rows, dtype=np.uint64).tolist())
+    return columns
+
+
+@pytest.mark.parametrize("suffix", [".bin", ".csv"])
+def test_recorder_columns_round_trip(tmp_path, suffix):
+    path = str(tmp_path / f"recorded{suffix}")
+    columns = recorder_columns(300)
+    writer = open_log_writer(path, PARSER_HEADERS, flags=("parsed_valid",))
+    for start in range(0, 300, 128):  # Batches as the recorder flushes them, reusing its buffers
+        submit_columns(writer, {key: values[start:] for key, values in columns.items()}, min(128, 300 - start))
+    stats = close_log_writer(writer)
+    assert stats["rows"] == 300
+    assert stats["batches"] == 3
+
+    read = read_log_columns(path)
+    for key in PARSER_HEADERS:
+        np.testing.assert_array_equal(read[key], np.array(columns[key], dtype=np.uint64), err_msg=key)
+    batches = list(iter_log_columns(path, batch_rows=100))
+    np.testing.assert_array_equal(np.concatenate([batch["cycle"] for batch in batches]), read["cycle"])
+
+
+def test_binary_log_converts_to_the_csv_log(tmp_path):
+    columns = recorder_columns(50, seed=1)
+    for name in ("recorded.bin", "recorded.csv"):
+        writer = open_log_writer(str(tmp_path / name), PARSER_HEADERS, flags=("parsed_valid",))
+        submit_columns(writer, columns, 50)
+        close_log_writer(writer)
+    binary_log_to_csv(str(tmp_path / "recorded.bin"), str(tmp_path / "converted.csv"))
+    assert (tmp_path / "converted.csv").read_text() == (tmp_path / "recorded.csv").read_text()
+
+
+def test_expected_columns_round_trip(tmp_path, permutation_workload):
+    expected = generate_expected_events_from_model(permutation_workload["full_stream"][:20000], parser_mode=True,
+                                                   columns=True)
+    streamed, whole = str(tmp_path / "expected_stream.csv"), str(tmp_path / "expected_whole.csv")
+    writer = open_log_writer(streamed, PARSER_HEADERS, flags=("parsed_valid",))
+    submit_expected_columns(writer, expected)
+    close_log_writer(writer)
+    write_log_columns(whole, PARSER_HEADERS, expected, flags=("parsed_valid",))
+    assert open(streamed).read() == open(whole).read()
+
+    batches = list(iter_expected_columns(streamed, batch_rows=97))
+    np.testing.assert_array_equal(np.concatenate([batch["cycle"] for batch in batches]), expected["cycle"])
+    for key in PARSER_HEADERS[1:]:
+        values, present = expected[key]
+        read_present = np.concatenate([batch[key][1] for batch in batches])
+        np.testing.assert_array_equal(read_present, present, err_msg=key)
+        np.testing.assert_array_equal(np.concatenate([batch[key][0] for batch in batches])[present], values[present],
+                                      err_msg=key)
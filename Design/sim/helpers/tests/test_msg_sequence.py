@@ -0,0 +1,45 @@
+# ============================================================
+# test_msg_sequence.py
+# ============================================================
+#
+# Description: Transition-coverage sequences cover every k-gram exactly once.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: De Bruijn k-gram coverage checks.
+# ============================================================
+
+from collections import Counter
+
+import pytest
+
+from helpers.msg_sequence_helper import generate_transition_coverage_sequence, transition_coverage
+from ITCH_config import MSG_LENGTHS
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 4])
+def test_de_bruijn_covers_every_k_gram_once(k):
+    n = len(MSG_LENGTHS)
+    sequence = list(generate_transition_coverage_sequence(k))
+    assert len(sequence) == n ** k + k - 1
+
+    coverage = transition_coverage(sequence, k)
+    assert coverage["total"] == n ** k
+    assert coverage["covered"] == n ** k
+    assert coverage["missing"] == []
+    grams = Counter(tuple(sequence[i:i + k]) for i in range(len(sequence) - k + 1))
+    assert set(grams.values()) == {1}
+
+
+def test_de_bruijn_on_a_custom_alphabet():
+    sequence = list(generate_transition_coverage_sequence(2, ["add", "delete", "trade"]))
+    assert len(sequence) == 3 ** 2 + 1
+    assert transition_coverage(sequence, 2, ["add", "delete", "trade"])["coverage"] == 1.0
+
+
+def test_k_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        next(generate_transition_coverage_sequence(0))
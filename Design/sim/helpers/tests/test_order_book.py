@@ -0,0 +1,71 @@
+# ============================================================
+# test_order_book.py
+# ============================================================
+#
+# Description: Book updates per message type, and a book rebuilt from an
+#              order flow against the generator's live-order set.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Level arithmetic and order-flow rebuild checks.
+# ============================================================
+
+from helpers.order_book_helper import (new_order_book, apply_book_message, apply_schedule, apply_parser_columns,
+                                       book_levels, book_orders, compare_book_to_flow, build_book_report)
+from helpers.compare_helper import generate_expected_events_from_schedule, expected_to_columns
+from ITCH_config import PARSER_HEADERS
+
+SYMBOL = int.from_bytes(b"AAPL    ", "big")
+BUY, SELL = 0, 1
+
+
+def test_levels_follow_each_message_type():
+    book = new_order_book()
+    apply_book_message(book, "add", order_ref=1, side=BUY, shares=100, price=1000, misc_data=SYMBOL)
+    apply_book_message(book, "add", order_ref=2, side=BUY, shares=50, price=1000, misc_data=SYMBOL)
+    apply_book_message(book, "add", order_ref=3, side=BUY, shares=10, price=990, misc_data=SYMBOL)
+    apply_book_message(book, "add", order_ref=4, side=SELL, shares=70, price=1010, misc_data=SYMBOL)
+    assert book_levels(book, SYMBOL) == {"bids": [(1000, 150, 2), (990, 10, 1)], "asks": [(1010, 70, 1)]}
+
+    apply_book_message(book, "cancel", order_ref=1, shares=30)
+    apply_book_message(book, "executed", order_ref=2, shares=50)  # Fills order 2 completely
+    apply_book_message(book, "replace", misc_data=4, new_order_ref=5, shares=60, price=1005)
+    apply_book_message(book, "delete", order_ref=3)
+    apply_book_message(book, "trade")
+    assert book_levels(book, SYMBOL) == {"bids": [(1000, 70, 1)], "asks": [(1005, 60, 1)]}
+    assert book_orders(book) == {1: (BUY, 70, 1000, SYMBOL), 5: (SELL, 60, 1005, SYMBOL)}
+    assert book["updates"] == {"add": 4, "cancel": 1, "delete": 1, "replace": 1, "executed": 1, "trade": 1}
+    assert not any(book["errors"].values())
+
+
+def test_unknown_refs_are_counted():
+    book = new_order_book()
+    apply_book_message(book, "delete", order_ref=9)
+    apply_book_message(book, "add", order_ref=1, side=BUY, shares=1, price=1, misc_data=SYMBOL)
+    apply_book_message(book, "add", order_ref=1, side=BUY, shares=1, price=1, misc_data=SYMBOL)
+    assert book["errors"]["unknown_ref"] == 1
+    assert book["errors"]["duplicate_ref"] == 1
+    assert len(book_orders(book)) == 1
+
+
+def test_order_flow_rebuilds_the_generator_book(order_flow_chunks):
+    chunks, flow = order_flow_chunks
+    book = new_order_book()
+    applied = sum(apply_schedule(book, chunk["injection_schedule"]) for chunk in chunks)
+    assert applied == sum(len(chunk["injection_schedule"]) for chunk in chunks)
+    assert not any(book["errors"].values())
+    check = compare_book_to_flow(book, flow)
+    assert check["passed"], check
+    assert check["book_orders"] > 0
+
+    # The testbench's expected book: built from the expected parser columns of each chunk
+    expected_book = new_order_book()
+    for chunk in chunks:
+        events = generate_expected_events_from_schedule(chunk["injection_schedule"], parser_mode=True)
+        apply_parser_columns(expected_book, expected_to_columns(events, PARSER_HEADERS))
+    report = build_book_report(book, flow=flow, expected_book=expected_book)
+    assert report["expected_check"]["passed"], report["expected_check"]
+    assert report["updates"] == applied
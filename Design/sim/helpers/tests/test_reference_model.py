@@ -0,0 +1,99 @@
+# ============================================================
+# test_reference_model.py
+# ============================================================
+#
+# Description: The reference model's events-only fast path against its
+#              byte-level stepping (_step_decoder()), over clean, order-flow
+#              and junk streams, with and without valid_in gaps, whole and in
+#              chunks of every size.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Fast path == per-byte model, rows and decoder state.
+# ============================================================
+
+import random
+
+import numpy as np
+import pytest
+
+from helpers.reference_model import (new_reference_model, advance_reference_model, run_reference_model,
+                                     generate_expected_events_from_model)
+from helpers.compare_helper import expected_to_columns
+from ITCH_config import PARSER_HEADERS, SIM_HEADERS
+
+# Chunks below the model's fast-path threshold are stepped byte by byte
+BYTE_CHUNK = 256
+
+
+def run_model(stream, mask, parser_mode, cuts):
+    # Events of every chunk and the decoder state after each one
+    model = new_reference_model()
+    log, states = {}, []
+    for start, end in cuts:
+        log.update(advance_reference_model(model, stream[start:end], mask and mask[start:end],
+                                           parser_mode=parser_mode, events_only=True))
+        states.append([list(state) for state in model["states"]])
+    return log, states
+
+
+def byte_cuts(n):
+    return [(start, min(start + BYTE_CHUNK, n)) for start in range(0, n, BYTE_CHUNK)]
+
+
+def mixed_cuts(n, rng):
+    # Chunks on both sides of the threshold, split anywhere in a message
+    cuts, start = [], 0
+    while start < n:
+        end = min(n, start + rng.choice([1, 7, 40, 300, 600, 5000]))
+        cuts.append((start, end))
+        start = end
+    return cuts
+
+
+@pytest.fixture(scope="module")
+def streams(permutation_workload, order_flow_chunks):
+    rng = random.Random(1)
+    junk = bytes(rng.choice(b"ADEXUCPSB\x00\xff") if rng.random() < 0.5 else rng.randrange(256) for _ in range(8000))
+    return {
+        "permutations": permutation_workload["full_stream"][:20000] + bytes(20),
+        "order_flow": order_flow_chunks[0][0]["full_stream"] + bytes(20),
+        "junk": junk + bytes(20),
+    }
+
+
+@pytest.mark.parametrize("name", ["permutations", "order_flow", "junk"])
+@pytest.mark.parametrize("gaps", [None, 0.8, 0.995])
+@pytest.mark.parametrize("parser_mode", [True, False], ids=["parser", "integrated"])
+def test_fast_path_matches_byte_stepping(streams, name, gaps, parser_mode):
+    stream = streams[name]
+    rng = random.Random(len(stream))
+    mask = None if gaps is None else bytes(rng.random() < gaps for _ in range(len(stream)))
+
+    expected_log, expected_states = run_model(stream, mask, parser_mode, byte_cuts(len(stream)))
+    assert expected_log  # Something to compare
+
+    log, states = run_model(stream, mask, parser_mode, [(0, len(stream))])
+    assert log == expected_log
+    assert states[-1] == expected_states[-1]
+
+    cuts = mixed_cuts(len(stream), rng)
+    log, _ = run_model(stream, mask, parser_mode, cuts)
+    assert log == expected_log
+
+
+@pytest.mark.parametrize("parser_mode, headers", [(True, PARSER_HEADERS), (False, SIM_HEADERS)])
+def test_expected_columns_match_rows(permutation_workload, parser_mode, headers):
+    stream = permutation_workload["full_stream"][:20000]
+    rows = generate_expected_events_from_model(stream, parser_mode=parser_mode)
+    columns = generate_expected_events_from_model(stream, parser_mode=parser_mode, columns=True)
+    from_rows = expected_to_columns(rows, headers)
+    np.testing.assert_array_equal(columns["cycle"], from_rows["cycle"])
+    for key in headers[1:]:
+        np.testing.assert_array_equal(columns[key][0], from_rows[key][0], err_msg=key)
+    # One pass with drain cycles == run_reference_model()
+    assert rows == [row for _, row in sorted(run_reference_model(stream, parser_mode=parser_mode,
+                                                                  events_only=True).items())]
@@ -0,0 +1,75 @@
+# ============================================================
+# test_result_store.py
+# ============================================================
+#
+# Description: Result store built from a CSV log exports the same CSV, and
+#              its cycle / type / field selections match the log.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Store -> CSV round trip and selection checks.
+# ============================================================
+
+import numpy as np
+import pytest
+
+from helpers.result_store_helper import (build_result_store, open_result_store, close_result_store, select_rows,
+                                         count_types, result_store_to_csv)
+from helpers.log_writer_helper import write_log_columns
+from helpers.compare_helper import valid_headers, expected_to_columns, generate_expected_events_from_schedule
+from ITCH_config import PARSER_HEADERS, SIM_HEADERS, ITCH_MESSAGES
+
+
+@pytest.fixture(params=[(True, PARSER_HEADERS), (False, SIM_HEADERS)], ids=["parser", "integrated"])
+def expected_log(request, tmp_path, permutation_workload):
+    # An expected-events CSV (blank cells where a message has no such field) and its columns
+    parser_mode, headers = request.param
+    events = generate_expected_events_from_schedule(permutation_workload["injection_schedule"][:1000],
+                                                    parser_mode=parser_mode)
+    columns = expected_to_columns(events, headers)
+    path = str(tmp_path / "expected_events.csv")
+    write_log_columns(path, headers, columns, flags=valid_headers(headers))
+    return path, headers, columns
+
+
+def test_store_round_trips_to_csv(expected_log, tmp_path):
+    path, _, _ = expected_log
+    store_path, meta = build_result_store(path, str(tmp_path / "expected_events.itchcol"))
+    store = open_result_store(store_path)
+    try:
+        rows = result_store_to_csv(store, str(tmp_path / "exported.csv"))
+    finally:
+        close_result_store(store)
+    assert rows == meta["rows"]
+    assert open(tmp_path / "exported.csv").read() == open(path).read()
+
+
+def test_selection_matches_the_log(expected_log, tmp_path):
+    path, headers, columns = expected_log
+    store_path, _ = build_result_store(path, str(tmp_path / "expected_events.itchcol"))
+    store = open_result_store(store_path)
+    try:
+        cycles = columns["cycle"]
+        first, last = int(cycles[len(cycles) // 3]), int(cycles[2 * len(cycles) // 3])
+        window = (cycles >= first) & (cycles <= last)
+        field = headers[-1]
+        selection = select_rows(store, cycles=(first, last), fields=[field])
+        np.testing.assert_array_equal(selection["cycle"], cycles[window])
+        values, present = columns[field]
+        np.testing.assert_array_equal(selection[field][1], present[window])
+        np.testing.assert_array_equal(selection[field][0][selection[field][1]], values[window & present])
+
+        counts = count_types(store)
+        for msg_type, spec in ITCH_MESSAGES.items():
+            if "parsed_type" in columns:
+                rows = columns["parsed_type"][0] == spec["parsed_type"]
+            else:
+                values, present = columns[f"{msg_type}_internal_valid"]
+                rows = present & (values == 1)
+            assert counts[msg_type] == np.count_nonzero(rows), msg_type
+            assert len(select_rows(store, msg_types=msg_type)["cycle"]) == counts[msg_type]
+    finally:
+        close_result_store(store)
@@ -0,0 +1,92 @@
+# ============================================================
+# test_software_decoder.py
+# ============================================================
+#
+# Description: The software decoder against the injection schedule, and the
+#              process-pool file decode against a serial decode.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Schedule oracle, chunked and parallel decode checks.
+# ============================================================
+
+import numpy as np
+import pytest
+
+from helpers.software_decoder_helper import (decode_stream, decode_range, iter_decode_stream,
+                                             decoded_expected_columns, CANONICAL_COLUMNS)
+from helpers.parallel_decoder_helper import parallel_decode_file, MIN_CHUNK_BYTES
+from helpers.compare_helper import generate_expected_events_from_schedule, expected_to_columns
+from ITCH_config import PARSER_HEADERS, SIM_HEADERS
+
+
+def assert_same_columns(actual, expected, headers):
+    # Expected-event columns: same cycles, same presence, same values where present
+    np.testing.assert_array_equal(actual["cycle"], expected["cycle"])
+    for key in headers[1:]:
+        values, present = actual[key]
+        expected_values, expected_present = expected[key]
+        np.testing.assert_array_equal(present, expected_present, err_msg=key)
+        np.testing.assert_array_equal(values[present], expected_values[expected_present], err_msg=key)
+
+
+@pytest.mark.parametrize("parser_mode, headers", [(True, PARSER_HEADERS), (False, SIM_HEADERS)])
+def test_decoder_matches_schedule(permutation_workload, parser_mode, headers):
+    decoded = decode_stream(permutation_workload["full_stream"], records=False)
+    schedule = permutation_workload["injection_schedule"]
+    assert decoded["count"] == len(schedule)
+    assert decoded["skipped_bytes"] == 0
+
+    expected = expected_to_columns(generate_expected_events_from_schedule(schedule, parser_mode=parser_mode), headers)
+    assert_same_columns(decoded_expected_columns(decoded, parser_mode=parser_mode), expected, headers)
+
+
+def test_records_hold_the_payloads(permutation_workload):
+    decoded = decode_stream(permutation_workload["full_stream"])
+    for msg_type, records in decoded["records"].items():
+        payloads = [event["payload"] for event in permutation_workload["injection_schedule"]
+                    if event["type"] == msg_type]
+        assert [record.tobytes() for record in records] == [bytes(payload) for payload in payloads]
+
+
+def test_chunked_decode_carries_split_messages(permutation_workload):
+    stream = permutation_workload["full_stream"]
+    whole = decode_stream(stream, records=False)
+    chunks = [stream[start:start + 1000] for start in range(0, len(stream), 1000)]
+    parts = list(iter_decode_stream(chunks))
+    offsets = np.concatenate([part["offsets"] + part["stream_offset"] for part in parts])
+    np.testing.assert_array_equal(offsets, whole["offsets"])
+    for key in CANONICAL_COLUMNS:
+        np.testing.assert_array_equal(np.concatenate([part[key] for part in parts]), whole[key])
+
+
+def test_decode_range_resyncs_on_a_boundary(permutation_workload):
+    stream = permutation_workload["full_stream"]
+    whole = decode_stream(stream, records=False)
+    start = 5001  # Inside a message
+    part = decode_range(stream, start, len(stream))
+    assert part["sync"] in set(whole["offsets"].tolist())
+    np.testing.assert_array_equal(part["offsets"], whole["offsets"][whole["offsets"] >= part["sync"]])
+
+
+def test_parallel_decode_matches_serial(permutation_workload, tmp_path):
+    stream = permutation_workload["full_stream"] * 3
+    assert len(stream) > 4 * MIN_CHUNK_BYTES  # Several ranges, each entered mid-message
+    path = tmp_path / "stream.bin"
+    path.write_bytes(stream)
+
+    serial = decode_stream(stream, records=False)
+    stats = {}
+    parallel = parallel_decode_file(str(path), workers=2, chunk_bytes=MIN_CHUNK_BYTES, stats=stats)
+    assert stats["ranges"] > 4
+    assert parallel["count"] == serial["count"]
+    assert parallel["consumed"] == serial["consumed"]
+    assert parallel["skipped_bytes"] == serial["skipped_bytes"]
+    np.testing.assert_array_equal(parallel["offsets"], serial["offsets"])
+    np.testing.assert_array_equal(parallel["types"], serial["types"])
+    for key in CANONICAL_COLUMNS:
+        np.testing.assert_array_equal(parallel[key], serial[key], err_msg=key)
+        np.testing.assert_array_equal(parallel["present"][key], serial["present"][key], err_msg=key)
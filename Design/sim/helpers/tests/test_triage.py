@@ -0,0 +1,88 @@
+# ============================================================
+# test_triage.py
+# ============================================================
+#
+# Description: A triage slice of a gapped run keeps the run's valid_in mask
+#              (through apply_gap_model() with no model, as the testbenches
+#              inject it) and predicts the run's events around the failure.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Slice mask, pass-through and expected-event checks.
+# ============================================================
+
+import json
+
+import numpy as np
+import pytest
+
+from helpers.triage_helper import build_triage_slice, write_triage_slice, load_triage_slice, triage_meta_path
+from helpers.gap_model_helper import new_gap_state, apply_gap_model
+from helpers.full_workload_helper import iter_payload_workload
+from helpers.msg_sequence_helper import generate_permutation_coverage_sequence
+from helpers.reference_model import generate_expected_events_from_model
+from sim_config import GAP_PARAMS, WAVE_POST_CYCLES
+
+
+@pytest.fixture(scope="module")
+def gapped_workload():
+    # Rare byte-scope gaps: most messages survive, some are aborted mid-message
+    state = new_gap_state("bernoulli", {**GAP_PARAMS, "p_valid": 0.99}, "byte", seed=4)
+    chunks = [apply_gap_model(state, chunk) for chunk in
+              iter_payload_workload(generate_permutation_coverage_sequence()[:1500], chunk_messages=400, seed=2)]
+    stream = b"".join(chunk["full_stream"] for chunk in chunks)
+    mask = b"".join(chunk["valid_mask"] for chunk in chunks)
+    return chunks, stream, mask
+
+
+@pytest.fixture(scope="module")
+def run_events(gapped_workload):
+    _, stream, mask = gapped_workload
+    return generate_expected_events_from_model(stream, mask, parser_mode=True)
+
+
+@pytest.mark.parametrize("fraction", [0.3, 0.75])
+def test_slice_keeps_the_run_mask(gapped_workload, run_events, fraction):
+    chunks, stream, mask = gapped_workload
+    failing_cycle = run_events[int(len(run_events) * fraction)]["cycle"]
+    triage_slice = build_triage_slice(failing_cycle, chunks, parser_mode=True)
+    meta = triage_slice["triage"]
+    first, cycles = meta["cycle_offset"], meta["cycles"]
+    assert meta["converged"]
+    assert triage_slice["full_stream"] == stream[first:first + cycles]
+    assert triage_slice["valid_mask"] == mask[first:first + cycles]
+    assert meta["valid_cycles"] == np.count_nonzero(np.frombuffer(triage_slice["valid_mask"], dtype=np.uint8))
+    assert meta["valid_cycles"] < cycles  # The slice has gaps to keep
+
+    # Injected as the testbenches do: no gap model on top, the slice's mask stays
+    injected = apply_gap_model(new_gap_state(None), triage_slice)
+    assert injected["valid_mask"] == triage_slice["valid_mask"]
+
+
+def test_slice_predicts_the_run_events(gapped_workload, run_events):
+    chunks, _, _ = gapped_workload
+    failing_cycle = run_events[len(run_events) // 2]["cycle"]
+    triage_slice = build_triage_slice(failing_cycle, chunks, parser_mode=True)
+    first = triage_slice["triage"]["cycle_offset"]
+    window = range(failing_cycle, failing_cycle + WAVE_POST_CYCLES)
+
+    expected = [row for row in run_events if row["cycle"] in window]
+    sliced = [{**row, "cycle": row["cycle"] + first} for row in triage_slice["expected_events"]
+              if row["cycle"] + first in window]
+    assert expected
+    assert sliced == expected
+
+
+def test_slice_files_round_trip(gapped_workload, run_events, tmp_path):
+    chunks, _, _ = gapped_workload
+    triage_slice = build_triage_slice(run_events[100]["cycle"], chunks, parser_mode=True)
+    path = str(tmp_path / "triage_slice.pkl")
+    write_triage_slice(triage_slice, path)
+    loaded = load_triage_slice(path)
+    assert loaded["valid_mask"] == triage_slice["valid_mask"]
+    assert loaded["triage"] == triage_slice["triage"]
+    with open(triage_meta_path(path)) as f:
+        assert json.load(f) == triage_slice["triage"]
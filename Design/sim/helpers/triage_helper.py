@@ -0,0 +1,262 @@
+# ============================================================
+# triage_helper.py
+# ============================================================
+#
+# Description: Failure-window triage. Rebuilds the workload a failing run
+#              injected (same seed, shard, gaps), cuts it at a message boundary
+#              a few messages before the failing cycle and a little after it,
+#              and stores the slice with its own expected events. The
+#              testbenches replay a slice (TRIAGE_SLICE) from reset, so only a
+#              few hundred cycles are re-simulated with waveforms on.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.4
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Workload rebuild, boundary-aligned slicing and slice files.
+# [20261018-2] RZ: Workload cache entries are read without an expected-event flavour.
+# [20261018-3] RZ: 'triage' metadata also written to a JSON sidecar (read by sim_config.py).
+# [20261018-4] RZ: Replay slices take the model oracle like their runs (USE_REFERENCE_MODEL forced).
+# ============================================================
+
+# Cycle numbering: stream cycle i (after gap insertion) is clocked in on edge
+# RESET_CYCLES + i, so a slice starting at stream cycle 'cycle_offset' runs
+# cycle c of the slice where the original run had c + cycle_offset.
+#
+# The slice starts TRIAGE_WARMUP_MESSAGES whole messages before the message
+# that ends at the failing cycle: the DUT is reset at the slice start, and the
+# warm-up messages bring the speculative decoders' suppression state back in
+# step before the failing message arrives. Payload bytes that look like type
+# bytes can keep the decoders out of step for longer, so the reference model
+# checks it: the decoder state after replaying the warm-up from reset must
+# equal the state the original run had at the failing message, otherwise the
+# warm-up is doubled. The slice ends at the first message boundary
+# WAVE_POST_CYCLES after the failing cycle.
+
+import json
+import os
+import pickle
+from collections import deque
+
+import numpy as np
+
+from sim_config import RESET_CYCLES, MSG_SEQUENCE, STREAM_CHUNK_MESSAGES, USE_REFERENCE_MODEL
+from sim_config import GAP_MODEL, GAP_SCOPE, GAP_PARAMS, GAP_SEED, WORKLOAD_SEED, WORKLOAD_CACHE
+from sim_config import REPLAY_FILE, REPLAY_TRANSLATE, REPLAY_MSG_TYPES, ORDER_FLOW_MESSAGES, ORDER_FLOW_PARAMS
+from sim_config import TRIAGE_WARMUP_MESSAGES, WAVE_POST_CYCLES
+from .gap_model_helper import new_gap_state, apply_gap_model
+from .full_workload_helper import run_full_payload_workload, iter_payload_workload
+from .workload_cache_helper import iter_cached_workload
+from .itch_replay_helper import iter_itch_replay
+from .order_flow_helper import iter_order_flow_workload
+from .compare_helper import generate_expected_events_from_schedule
+from .reference_model import generate_expected_events_from_model, new_reference_model, advance_reference_model
+from .software_decoder_helper import find_message_starts
+
+# Times the warm-up is doubled while the replayed decoder state still differs
+WARMUP_SEARCH = 3
+
+
+def rebuild_workload(parser_mode=False):
+    """
+    Regenerates the chunks a testbench injected for the current sim_config
+    (SIM_SEED, SHARD_INDEX / SHARD_COUNT, REPLAY_FILE, ORDER_FLOW_MESSAGES,
+    WORKLOAD_CACHE, GAP_MODEL), with the gap model applied. Mirrors the
+    workload selection of test_integrated.py / test_parser_canonical.py;
+    with WORKLOAD_CACHE the chunks are read back from the same cache entry.
+
+    Yields:
+        Gapped chunks ('full_stream', 'valid_mask', 'injection_schedule').
+    """
+    if REPLAY_FILE:
+        workload = iter_itch_replay(REPLAY_FILE, REPLAY_MSG_TYPES, translate=REPLAY_TRANSLATE)
+    elif WORKLOAD_SEED is None:
+        raise ValueError("Triage needs a seeded run (set SIM_SEED as in the failing run)")
+    elif ORDER_FLOW_MESSAGES:
+        workload = iter_order_flow_workload(ORDER_FLOW_MESSAGES, ORDER_FLOW_PARAMS,
+                                            chunk_messages=STREAM_CHUNK_MESSAGES or 4096, seed=WORKLOAD_SEED)
+    elif WORKLOAD_CACHE:
+        # Expected events are not part of the entry's key; the slice rebuilds its own
+        workload = iter_cached_workload(MSG_SEQUENCE, WORKLOAD_SEED, STREAM_CHUNK_MESSAGES)
+    elif STREAM_CHUNK_MESSAGES:
+        workload = iter_payload_workload(MSG_SEQUENCE, chunk_messages=STREAM_CHUNK_MESSAGES, seed=WORKLOAD_SEED)
+    else:
+        workload = [run_full_payload_workload(MSG_SEQUENCE, seed=WORKLOAD_SEED)]
+
+    gaps = new_gap_state(GAP_MODEL, GAP_PARAMS, GAP_SCOPE, seed=GAP_SEED)
+    for chunk in workload:
+        yield apply_gap_model(gaps, chunk)
+
+
+def _message_starts(chunk, base):
+    # Stream cycles where messages start; messages aborted by gaps are not in
+    # the schedule. Raw replay has none: frame the stream itself (idle cycles
+    # carry byte 0, which is not a message type)
+    schedule = chunk["injection_schedule"]
+    if schedule is None:
+        return (find_message_starts(chunk["full_stream"])[0] + base).tolist()
+    return [event["expected_valid_cycle"] - RESET_CYCLES - len(event["payload"]) for event in schedule]
+
+
+def _decoder_control(model):
+    # byte_index, is_order and suppress count of every decoder: the state that
+    # decides how later bytes are framed (field registers are reloaded by them)
+    return [tuple(state[:3]) for state in model["states"]]
+
+
+def _chunk_mask(chunk):
+    mask = chunk["valid_mask"]
+    return bytes([1]) * len(chunk["full_stream"]) if mask is None else mask
+
+
+def build_triage_slice(failing_cycle, workload, parser_mode=False,
+                       warmup_messages=TRIAGE_WARMUP_MESSAGES, post_cycles=WAVE_POST_CYCLES):
+    """
+    Cuts the part of a workload around a failing cycle.
+
+    Args:
+        failing_cycle (int): Recorder cycle of the first mismatch.
+        workload: Gapped chunks, as from rebuild_workload().
+        parser_mode (bool): PARSER_HEADERS expected events (parser test),
+                            otherwise SIM_HEADERS (integrated test).
+        warmup_messages (int): Whole messages replayed before the failing one
+                               (doubled up to WARMUP_SEARCH times until the
+                               decoder state has converged).
+        post_cycles (int): Cycles kept after the failing cycle.
+
+    Returns:
+        Chunk-shaped dict ('full_stream', 'valid_mask', 'injection_schedule',
+        'expected_events') plus 'triage': cycle_offset, failing_cycle (in the
+        slice), original_failing_cycle, cycles, messages, warmup_messages and
+        'converged' (False if no searched start reached the run's state).
+    """
+    target = failing_cycle - RESET_CYCLES  # Stream cycle of the failing output (or just after it)
+    stop_after = target + post_cycles
+    # Boundaries before the failing message, as far back as the warm-up search goes
+    starts = deque(maxlen=max(warmup_messages, 1) * (1 << WARMUP_SEARCH) + 1)
+    kept = []  # (stream cycle base, chunk), trimmed to what the slice can still need
+    model = new_reference_model()  # The original run, up to the failing message
+    model_pos = 0
+    run_control = _decoder_control(model)
+    end = None
+    base = 0
+    for chunk in workload:
+        kept.append((base, chunk))
+        stream, mask = chunk["full_stream"], chunk["valid_mask"]
+        for start in _message_starts(chunk, base):
+            if start < target:
+                advance_reference_model(model, stream[model_pos - base:start - base],
+                                        mask and mask[model_pos - base:start - base], events_only=True)
+                model_pos = start
+                run_control = _decoder_control(model)
+                starts.append(start)
+            elif start >= stop_after:
+                end = start
+                break
+        base += len(stream)
+        if model_pos < target:
+            advance_reference_model(model, stream[model_pos - kept[-1][0]:],
+                                    mask and mask[model_pos - kept[-1][0]:], events_only=True)
+            model_pos = base
+        while len(kept) > 1 and starts and kept[1][0] <= starts[0]:
+            kept.pop(0)
+        if end is not None:
+            break
+    if target > base + 20:
+        raise ValueError(f"Cycle {failing_cycle} is past the end of the run ({base + RESET_CYCLES + 20} cycles)")
+
+    end = base if end is None else end
+    stream_base = kept[0][0]
+    stream = b"".join(bytes(chunk["full_stream"]) for _, chunk in kept)
+    mask = None
+    if any(chunk["valid_mask"] is not None for _, chunk in kept):
+        mask = b"".join(_chunk_mask(chunk) for _, chunk in kept)
+
+    # Latest start whose replay from reset reaches the run's decoder state at
+    # the failing message; from there on the slice behaves like the run
+    first, warmup, converged = 0, 0, True
+    if starts:
+        failing_start = starts[-1]
+        converged = False
+        for step in range(WARMUP_SEARCH + 1):
+            warmup = min(max(warmup_messages, 1) << step if step else warmup_messages, len(starts) - 1)
+            first = starts[-1 - warmup]
+            replay = new_reference_model()
+            advance_reference_model(replay, stream[first - stream_base:failing_start - stream_base],
+                                    mask and mask[first - stream_base:failing_start - stream_base], events_only=True)
+            if _decoder_control(replay) == run_control or first == 0:
+                converged = True
+                break
+            if warmup == len(starts) - 1:
+                break
+
+    full_stream = stream[first - stream_base:end - stream_base]
+    valid_mask = mask and mask[first - stream_base:end - stream_base]
+
+    # Whole messages of the slice, re-timed to start from reset
+    schedule = None
+    if all(chunk["injection_schedule"] is not None for _, chunk in kept):
+        schedule = [
+            {**event, "expected_valid_cycle": event["expected_valid_cycle"] - first}
+            for _, chunk in kept for event in chunk["injection_schedule"]
+            if first <= event["expected_valid_cycle"] - RESET_CYCLES - len(event["payload"])
+            and event["expected_valid_cycle"] - RESET_CYCLES <= end
+        ]
+
+    # Same oracle the testbench picks: the model where gaps split messages, there
+    # is no schedule or sim_config forces it (replays, order flow, k-gram
+    # sequences repeat types back to back), the schedule otherwise
+    if schedule is None or USE_REFERENCE_MODEL or (GAP_MODEL is not None and GAP_SCOPE == "byte"):
+        expected_events = generate_expected_events_from_model(full_stream, valid_mask, parser_mode=parser_mode)
+    else:
+        expected_events = generate_expected_events_from_schedule(schedule, parser_mode=parser_mode)
+
+    return {
+        "full_stream": full_stream,
+        "valid_mask": valid_mask,
+        "injection_schedule": schedule,
+        "expected_events": expected_events,
+        "triage": {
+            "cycle_offset": first,
+            "failing_cycle": failing_cycle - first,
+            "original_failing_cycle": failing_cycle,
+            "cycles": len(full_stream),
+            "messages": len(schedule) if schedule is not None else
+                        len(find_message_starts(full_stream)[0]),
+            "valid_cycles": int(np.count_nonzero(np.frombuffer(valid_mask, dtype=np.uint8)))
+                            if valid_mask is not None else len(full_stream),
+            "warmup_messages": warmup,
+            "converged": converged,
+        },
+    }
+
+
+def triage_meta_path(path):
+    """
+    JSON sidecar of a slice file: its 'triage' metadata (sim_config.py sizes
+    the run from 'cycles' without loading the slice).
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+def write_triage_slice(triage_slice, path):
+    """
+    Saves a slice for a TRIAGE_SLICE run: the chunk dict build_triage_slice()
+    returns, pickled, plus its 'triage' metadata as a JSON sidecar. Slices are
+    local repro files written by run_triage.py; unlike workload cache entries
+    (.npz) they are not meant for shared directories.
+    """
+    with open(path, "wb") as f:
+        pickle.dump(triage_slice, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(triage_meta_path(path), "w") as f:
+        json.dump(triage_slice["triage"], f, indent=2)
+
+
+def load_triage_slice(path):
+    """
+    Reads a slice written by write_triage_slice(); the testbenches inject it
+    as their only workload chunk.
+    """
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,151 @@
+# ============================================================
+# wave_helper.py
+# ============================================================
+#
+# Description: Headless, windowed and triggered waveform capture. Dumping is
+#              off unless the Makefile passes WAVE=vcd|fst (+WAVES plusarg).
+#              With WAVE_WINDOW or WAVE_TRIGGER the RTL starts with the dump
+#              switched off (+WAVE_GATED), and this helper drives the wrapper's
+#              dump_enable ($dumpon / $dumpoff) for a cycle range or for the
+#              cycles following the first online-scoreboard mismatch. Failing
+#              runs get a suggested window for a deterministic rerun.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.4
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Cycle-window and mismatch-triggered dump gating, rerun window.
+# [20261018-2] RZ: first_mismatch_cycle() public for run_triage.py.
+# [20261018-3] RZ: Window / trigger on a build without dump_enable raises instead of tracing everything.
+# [20261018-4] RZ: Integer cycle numbers for the dump window.
+# ============================================================
+
+# Cycles are the recorders' absolute cycle numbers (sim time / clock period),
+# the same numbers the mismatch reports use.
+#
+# A triggered dump can only start at the mismatch (nothing before it is kept),
+# so failing runs also report 'rerun_window' = [cycle - WAVE_PRE_CYCLES,
+# cycle + WAVE_POST_CYCLES]: rerunning with the same SIM_SEED and
+# WAVE_WINDOW=<first>:<last> captures the full window around it.
+#
+# Verilator traces the whole run from C++ (no dump_enable); windows apply to
+# Icarus builds only. The Makefile refuses the combination, and a run started
+# some other way fails here rather than silently dumping everything.
+
+import cocotb
+from cocotb.triggers import Timer
+from cocotb.utils import get_sim_time
+
+from sim_config import SIM_CLK_PERIOD_NS, SIM_SEED
+from sim_config import WAVE, WAVE_WINDOW, WAVE_TRIGGER, WAVE_PRE_CYCLES, WAVE_POST_CYCLES
+
+
+def parse_wave_window(text):
+    """
+    Parses a "first:last" cycle window (inclusive).
+
+    Returns:
+        (first, last), or None for an empty string.
+    """
+    if not text:
+        return None
+    try:
+        first, last = (int(part) for part in text.split(":"))
+    except ValueError:
+        raise ValueError(f"WAVE_WINDOW must be <first>:<last>, got {text!r}") from None
+    if first < 0 or last < first:
+        raise ValueError(f"Empty or negative WAVE_WINDOW: {text!r}")
+    return first, last
+
+
+async def _dump_window(dut, first, last, capture):
+    # Sleeps instead of awaiting every edge, so gating costs nothing per cycle
+    now = int(get_sim_time('ns')) // SIM_CLK_PERIOD_NS
+    if first > now:
+        await Timer((first - now) * SIM_CLK_PERIOD_NS, units="ns")
+    start = max(first, now)
+    dut.dump_enable.value = 1
+    capture["dumped"].append([start, last])
+    await Timer((last - start + 1) * SIM_CLK_PERIOD_NS, units="ns")
+    dut.dump_enable.value = 0
+
+
+def start_wave_capture(dut, scoreboard=None):
+    """
+    Starts the waveform gating requested in sim_config (WAVE, WAVE_WINDOW,
+    WAVE_TRIGGER). Call once the clock runs; with WAVE_TRIGGER, pass the
+    online scoreboard whose first mismatch opens the dump.
+
+    Returns:
+        Capture state for wave_capture_report().
+    """
+    window = parse_wave_window(WAVE_WINDOW)
+    # Matches the Makefile's +WAVE_GATED condition
+    gated = WAVE != "none" and (window is not None or WAVE_TRIGGER)
+    if gated and not hasattr(dut, "dump_enable"):
+        raise RuntimeError(f"WAVE_WINDOW / WAVE_TRIGGER need an Icarus build: {dut._name} has no dump_enable "
+                           "(Verilator traces the whole run)")
+    capture = {
+        "format": WAVE,
+        "window": window,
+        "trigger": WAVE_TRIGGER,
+        "gated": gated,
+        "trigger_cycle": None,
+        "dumped": [],
+    }
+    if not capture["gated"]:
+        return capture
+
+    if capture["window"] is not None:
+        cocotb.start_soon(_dump_window(dut, *capture["window"], capture))
+    if WAVE_TRIGGER and scoreboard is not None:
+        def on_first_error(cycle):
+            capture["trigger_cycle"] = cycle
+            dut._log.warning(f"First mismatch at cycle {cycle}: dumping waves to cycle {cycle + WAVE_POST_CYCLES}")
+            cocotb.start_soon(_dump_window(dut, cycle, cycle + WAVE_POST_CYCLES, capture))
+        scoreboard["on_first_error"] = on_first_error
+    return capture
+
+
+def first_mismatch_cycle(report):
+    """
+    Earliest cycle among a mismatch report's examples, or None.
+    """
+    cycles = [example["cycle"] for key in ("examples", "unexpected_examples")
+              for example in report.get(key, []) if "cycle" in example]
+    return min(cycles) if cycles else None
+
+
+def wave_capture_report(capture, report):
+    """
+    Summarizes what was dumped and, for a failing run, the window around the
+    first mismatch to capture on a rerun.
+    """
+    waves = {
+        "format": capture["format"],
+        "window": list(capture["window"]) if capture["window"] else None,
+        "trigger": capture["trigger"],
+        "trigger_cycle": capture["trigger_cycle"],
+        "dumped": capture["dumped"] if capture["gated"] else ("whole run" if capture["format"] != "none" else None),
+        "rerun_window": None,
+    }
+    first = capture["trigger_cycle"] if capture["trigger_cycle"] is not None else first_mismatch_cycle(report)
+    if not report.get("passed", True) and first is not None:
+        waves["rerun_window"] = [max(first - WAVE_PRE_CYCLES, 0), first + WAVE_POST_CYCLES]
+    return waves
+
+
+def format_wave_report(waves):
+    if waves["format"] == "none":
+        line = "Waves: off (headless)"
+    elif isinstance(waves["dumped"], list):
+        spans = ", ".join(f"{first}-{last}" for first, last in waves["dumped"]) or "nothing"
+        line = f"Waves: {waves['format']}, dumped cycles {spans}"
+    else:
+        line = f"Waves: {waves['format']}, whole run"
+    if waves["rerun_window"]:
+        first, last = waves["rerun_window"]
+        seed = f"SIM_SEED={SIM_SEED} " if SIM_SEED is not None else ""
+        line += f"\n  rerun for the first mismatch: {seed}WAVE=fst WAVE_WINDOW={first}:{last}"
+    return line
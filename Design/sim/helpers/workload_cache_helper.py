@@ -0,0 +1,204 @@
+# ============================================================
+# workload_cache_helper.py
+# ============================================================
+#
+# Description: Persistent on-disk cache of generated workloads. The byte stream
+#              of every chunk is stored with its message offsets and type codes
+#              in NumPy chunk files under a key hashed from the message plan,
+#              seed, MSG_MODE, chunking and generator version, and reused by
+#              later runs and by every shard pointing at the same cache
+#              directory. Schedules and expected events are rebuilt from the
+#              stream on load. Seeded workloads make cached runs replayable
+#              bit-for-bit.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Keyed chunk-file workload cache with atomic publish.
+# [20261018-2] RZ: .npz chunks (stream, uint32 offsets, uint8 types) instead of pickles;
+#                  columnar expected events rebuilt by the software decoder.
+# ============================================================
+
+# Layout of one entry (<cache_dir>/<key>/):
+#   chunk_00000.npz, ...  one chunk each: 'stream' (uint8), 'offsets' (uint32,
+#                         message starts) and 'types' (uint8, MSG_TYPES index)
+#   manifest.json         written last; an entry without it is incomplete
+#
+# A chunk costs its stream plus 5 bytes per message. The injection schedule
+# (payloads sliced from the stream) and the expected events (columns from
+# software_decoder_helper, identical to the schedule-derived rows) are
+# rebuilt on load, so nothing is unpickled from a shared directory.
+#
+# Entries are built in a private temporary directory and renamed into place, so
+# shards racing on the same key never read a partial entry.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from sim_config import MSG_MODE, RESET_CYCLES, WORKLOAD_CACHE_DIR
+from ITCH_config import ITCH_MESSAGES
+from .full_workload_helper import run_full_payload_workload, iter_payload_workload, WORKLOAD_VERSION
+from .payload_batch_helper import MSG_TYPES
+from .software_decoder_helper import decode_stream, decoded_expected_columns
+from .profile_helper import profiled
+
+# Bump when the chunk file layout changes (part of the key)
+CACHE_FORMAT = 2
+
+# Expected-event flavours rebuilt with the workload: layout -> parser_mode
+_EVENT_LAYOUTS = {"integrated": False, "parser": True}
+
+_TYPE_CODES = {msg_type: code for code, msg_type in enumerate(MSG_TYPES)}
+
+
+def workload_cache_key(message_plan, seed, chunk_messages=0, mode=MSG_MODE):
+    """
+    Hash identifying a generated workload.
+
+    Args:
+        message_plan: Sequence of message types.
+        seed (int): Payload seed.
+        chunk_messages (int): Messages per chunk, 0 for a single chunk.
+        mode (str): MSG_MODE the payloads are generated in.
+
+    Returns:
+        Hex digest; the ITCH_MESSAGES layout is part of it, so layout edits
+        invalidate old entries as well.
+    """
+    digest = hashlib.sha256()
+    header = {
+        "version": WORKLOAD_VERSION,
+        "format": CACHE_FORMAT,
+        "seed": seed,
+        "mode": mode,
+        "chunk_messages": chunk_messages,
+        "layout": repr(ITCH_MESSAGES),
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    digest.update("\n".join(message_plan).encode())
+    return digest.hexdigest()[:32]
+
+
+def _chunk_path(entry_dir, index):
+    return os.path.join(entry_dir, f"chunk_{index:05d}.npz")
+
+
+def _save_chunk(path, chunk):
+    # Offsets and type codes of the schedule; payloads are slices of the stream
+    schedule = chunk["injection_schedule"]
+    lengths = np.fromiter((len(item["payload"]) for item in schedule), dtype=np.uint32, count=len(schedule))
+    offsets = np.zeros(len(schedule), dtype=np.uint32)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    types = np.fromiter((_TYPE_CODES[item["type"]] for item in schedule), dtype=np.uint8, count=len(schedule))
+    np.savez(path, stream=np.frombuffer(chunk["full_stream"], dtype=np.uint8), offsets=offsets, types=types)
+
+
+def _rebuild_chunk(stream, offsets, types, cycle_base):
+    # Same shape as the generators' chunks, cycles continuing from cycle_base
+    starts = offsets.tolist()
+    ends = starts[1:] + [len(stream)]
+    schedule = [{
+        "type": MSG_TYPES[code],
+        "payload": stream[start:end],
+        "expected_valid_cycle": cycle_base + end + RESET_CYCLES
+    } for code, start, end in zip(types.tolist(), starts, ends)]
+    return {"full_stream": stream, "injection_schedule": schedule}
+
+
+@profiled("workload_cache")
+def _load_cached_chunks(entry_dir, chunk_count):
+    cycle_base = 0
+    for index in range(chunk_count):
+        with np.load(_chunk_path(entry_dir, index), allow_pickle=False) as arrays:
+            stream = arrays["stream"].tobytes()
+            chunk = _rebuild_chunk(stream, arrays["offsets"], arrays["types"], cycle_base)
+        yield chunk, cycle_base
+        cycle_base += len(stream)
+
+
+def _with_events(chunk, events, cycle_base):
+    # Columnar expected events (compare_helper.build_mismatch_report() layout)
+    if events is not None:
+        decoded = decode_stream(chunk["full_stream"], records=False)
+        chunk["expected_events"] = decoded_expected_columns(decoded, _EVENT_LAYOUTS[events], cycle_base=cycle_base)
+    return chunk
+
+
+def _generate_chunks(message_plan, seed, chunk_messages):
+    if chunk_messages:
+        yield from iter_payload_workload(message_plan, chunk_messages=chunk_messages, seed=seed)
+    else:
+        yield run_full_payload_workload(message_plan, seed=seed)
+
+
+def iter_cached_workload(message_plan, seed, chunk_messages=0, events=None, cache_dir=WORKLOAD_CACHE_DIR):
+    """
+    Yields the chunks of a seeded workload, from the cache when an entry for
+    the key exists, otherwise generating them and storing them on the way.
+
+    Args:
+        message_plan: Sequence of message types (materialized; it is hashed).
+        seed (int): Payload seed; required, unseeded workloads are not reproducible.
+        chunk_messages (int): As STREAM_CHUNK_MESSAGES; 0 yields one chunk.
+        events (str): Also return expected events ("integrated" or "parser"
+                      layout) under 'expected_events', as columns
+                      ({'cycle', header: (values, present)}). Only valid for
+                      the ungapped, schedule-derived oracle.
+        cache_dir (str): Cache root shared by reruns and shards.
+
+    Yields:
+        Chunks shaped like iter_payload_workload()'s, 'full_stream' as bytes.
+    """
+    if seed is None:
+        raise ValueError("The workload cache needs a seed (set SIM_SEED)")
+    if events is not None and events not in _EVENT_LAYOUTS:
+        raise ValueError(f"Unknown expected-event flavour: {events}")
+
+    key = workload_cache_key(message_plan, seed, chunk_messages)
+    entry_dir = os.path.join(cache_dir, key)
+    manifest_path = os.path.join(entry_dir, "manifest.json")
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        for chunk, cycle_base in _load_cached_chunks(entry_dir, manifest["chunks"]):
+            yield _with_events(chunk, events, cycle_base)
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=cache_dir)
+    try:
+        chunk_count = 0
+        cycle_base = 0
+        for chunk in _generate_chunks(message_plan, seed, chunk_messages):
+            chunk = {**chunk, "full_stream": bytes(chunk["full_stream"])}
+            _save_chunk(_chunk_path(build_dir, chunk_count), chunk)
+            chunk_count += 1
+            yield _with_events(chunk, events, cycle_base)
+            cycle_base += len(chunk["full_stream"])
+
+        with open(os.path.join(build_dir, "manifest.json"), "w") as f:
+            json.dump({"key": key, "version": WORKLOAD_VERSION, "format": CACHE_FORMAT, "seed": seed,
+                       "mode": MSG_MODE, "messages": len(message_plan), "chunk_messages": chunk_messages,
+                       "chunks": chunk_count}, f, indent=2)
+        try:
+            os.rename(build_dir, entry_dir)
+        except OSError:
+            pass  # Another shard published the same entry first
+    finally:
+        # Leftover when another shard won the rename, or the run stopped early
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def clear_workload_cache(cache_dir=WORKLOAD_CACHE_DIR):
+    """
+    Removes every cached workload.
+    """
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,167 @@
+# ============================================================
+# query_results.py
+# ============================================================
+#
+# Description: Post-run query tool for recorded and expected logs. Converts a
+#              log once into a memory-mapped columnar store
+#              (helpers/result_store_helper.py) and selects rows from it by
+#              cycle window, message type and field, printing CSV or counts
+#              without parsing the whole log again.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.1
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: build / info / query commands over result stores.
+# ============================================================
+#
+# Usage:
+#   python3 query_results.py build expected_events.csv recorded_log.csv
+#   python3 query_results.py info expected_events.itchcol
+#   python3 query_results.py query parser_recorded_log.itchcol --cycles 12000:12400 --type add,X
+#   python3 query_results.py query expected_events.itchcol --type trade --fields trade_price,trade_shares --csv trades.csv
+#   python3 query_results.py query recorded_log.itchcol --cycles 5000: --count
+#
+# A log path (.csv / .bin) given to info or query is converted next to it
+# first, unless an up-to-date store is already there.
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+from helpers.result_store_helper import (STORE_SUFFIX, build_result_store, open_result_store, close_result_store,
+                                         select_rows, count_types, selection_rows, type_mask)
+
+
+def parse_cycles(text):
+    """
+    Parses "first:last" (inclusive, either end may be empty) or one cycle.
+    """
+    if text is None:
+        return None
+    try:
+        if ":" not in text:
+            return int(text), int(text)
+        first, last = text.split(":")
+        return (int(first) if first else None), (int(last) if last else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"cycles must be <first>:<last>, got {text!r}") from None
+
+
+def parse_types(text):
+    # Names ("add"), type characters ("A") or parsed_type codes ("0")
+    if text is None:
+        return None
+    return [int(part) if part.isdigit() else part for part in text.split(",") if part]
+
+
+def store_for(path):
+    """
+    Store path for a store or a log, (re)building the store when the log is
+    newer.
+    """
+    if path.endswith(STORE_SUFFIX):
+        return path
+    store_path = path.rsplit(".", 1)[0] + STORE_SUFFIX
+    if not os.path.exists(store_path) or os.path.getmtime(store_path) < os.path.getmtime(path):
+        build_result_store(path, store_path)
+    return store_path
+
+
+def cmd_build(args):
+    for path in args.logs:
+        start = time.perf_counter()
+        store_path, meta = build_result_store(path, args.out if len(args.logs) == 1 else None)
+        blank = sum(entry["values"] is None for entry in meta["columns"].values())
+        print(f"{path}: {meta['rows']} rows, {len(meta['headers'])} columns ({blank} all blank) -> {store_path} "
+              f"({os.path.getsize(path)} -> {os.path.getsize(store_path)} bytes, {time.perf_counter() - start:.2f} s)")
+    return 0
+
+
+def cmd_info(args):
+    store = open_result_store(store_for(args.store))
+    try:
+        meta = store["meta"]
+        cycles = select_rows(store, fields=[])["cycle"]
+        span = f"cycles {cycles[0]}-{cycles[-1]}" if len(cycles) else "no rows"
+        print(f"{store['path']}: {meta['rows']} rows, {span}{'' if meta['sorted'] else ' (unsorted)'}")
+        print("  types: " + ", ".join(f"{msg_type} {count}" for msg_type, count in count_types(store).items()))
+        for key in meta["headers"]:
+            entry = meta["columns"][key]
+            if entry["values"] is None:
+                kind = "blank"
+            else:
+                kind = entry["dtype"] + (", with blanks" if entry["validity"] is not None else "")
+            print(f"  {key:<26} {kind}")
+    finally:
+        close_result_store(store)
+    return 0
+
+
+def cmd_query(args):
+    store = open_result_store(store_for(args.store))
+    try:
+        if args.count:
+            counts = count_types(store, args.cycles)
+            if args.type:
+                mask = type_mask(args.type)
+                counts = {msg_type: count for bit, (msg_type, count) in enumerate(counts.items()) if mask >> bit & 1}
+            for msg_type, count in counts.items():
+                print(f"{msg_type:<10} {count}")
+            return 0
+
+        fields = args.fields.split(",") if args.fields else None
+        selection = select_rows(store, args.cycles, args.type, fields)
+        rows = selection_rows(store, selection)
+        out = open(args.csv, "w", newline="") if args.csv else sys.stdout
+        try:
+            writer = csv.writer(out)
+            for count, row in enumerate(rows):
+                if args.limit and count > args.limit:
+                    break
+                writer.writerow(row)
+        finally:
+            if args.csv:
+                out.close()
+        if args.csv:
+            print(f"{len(selection['cycle'])} rows -> {args.csv}")
+    finally:
+        close_result_store(store)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar result store: convert logs and query them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="convert logs (.csv / .bin) into stores")
+    build.add_argument("logs", nargs="+")
+    build.add_argument("-o", "--out", help="store path (single log only; default: <log>" + STORE_SUFFIX + ")")
+    build.set_defaults(run=cmd_build)
+
+    info = commands.add_parser("info", help="rows, cycle span, type counts and column widths")
+    info.add_argument("store", help="store, or a log to convert first")
+    info.set_defaults(run=cmd_info)
+
+    query = commands.add_parser("query", help="select rows by cycle window, message type and field")
+    query.add_argument("store", help="store, or a log to convert first")
+    query.add_argument("--cycles", type=parse_cycles, help="first:last (inclusive; open ends allowed) or one cycle")
+    query.add_argument("--type", type=parse_types, help="comma-separated types: add / A / 0, ...")
+    query.add_argument("--fields", help="comma-separated columns (default: all)")
+    query.add_argument("--count", action="store_true", help="print rows per message type instead")
+    query.add_argument("--limit", type=int, default=0, help="print at most this many rows")
+    query.add_argument("--csv", help="write the rows to this file instead of stdout")
+    query.set_defaults(run=cmd_query)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
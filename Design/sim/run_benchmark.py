@@ -0,0 +1,231 @@
+# ============================================================
+# run_benchmark.py
+# ============================================================
+#
+# Description: Protocol-level benchmark suite. Runs test_benchmark.py for every
+#              (message mix, sequence length) point of the matrix in its own
+#              simulator process and collects the per-point records into one
+#              JSON report tagged with the RTL revision and simulator setup, for
+#              trend tracking and side-by-side comparison of two reports.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial benchmark matrix runner, JSON report and comparison.
+# [20261018-2] RZ: --sims runs the matrix on several simulators and compares their speed.
+# ============================================================
+#
+# Usage:
+#   python3 run_benchmark.py --label baseline
+#   python3 run_benchmark.py --mixes uniform add_heavy --lengths 1000 10000 --jobs 4
+#   python3 run_benchmark.py --label file_stim --file-stimulus
+#   python3 run_benchmark.py --compare bench/baseline.json bench/file_stim.json
+#   python3 run_benchmark.py --label rev42 --sims icarus verilator
+#   make benchmark
+#   make sim_compare
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from run_regression import SIM_DIR, SIMULATORS, parse_results_xml, resolve_simulator
+
+
+def plan_points(mixes, lengths):
+    return [{"name": f"{mix}_{length}", "mix": mix, "length": length}
+            for mix in mixes for length in lengths]
+
+
+def point_command(simulator, file_stimulus):
+    command = ["make", "-f", os.path.join(SIM_DIR, "Makefile"), "sim",
+               "MODULE=test_benchmark", "TOPLEVEL=test_wrapper", f"SIM={simulator}"]
+    if file_stimulus:
+        command.append("FILE_STIMULUS=1")
+    return command
+
+
+def point_env(point, seed):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SIM_DIR, env.get("PYTHONPATH")]))
+    env["BENCH_MIX"] = point["mix"]
+    env["BENCH_LENGTH"] = str(point["length"])
+    env["SIM_SEED"] = str(seed)
+    return env
+
+
+def run_point(point, out_dir, simulator, file_stimulus, seed):
+    """
+    Runs one benchmark point in out_dir/<point name> and returns its record
+    (None if the simulator did not produce one).
+    """
+    point_dir = os.path.join(out_dir, point["name"])
+    os.makedirs(point_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with open(os.path.join(point_dir, "sim.log"), "w") as log:
+        proc = subprocess.run(point_command(simulator, file_stimulus), cwd=point_dir,
+                              env=point_env(point, seed), stdout=log, stderr=subprocess.STDOUT)
+    process_wall_s = time.perf_counter() - start
+
+    record = None
+    record_path = os.path.join(point_dir, "benchmark.json")
+    if os.path.exists(record_path):
+        with open(record_path) as f:
+            record = json.load(f)
+    cases = parse_results_xml(os.path.join(point_dir, "results.xml"))
+    return {
+        **point,
+        "returncode": proc.returncode,
+        "passed": proc.returncode == 0 and bool(cases) and all(case["passed"] for case in cases),
+        "process_wall_s": process_wall_s,  # Includes compilation and simulator start-up
+        "record": record,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SIM_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(mixes, lengths, label="benchmark", simulator="auto", file_stimulus=False,
+                  jobs=1, seed=1, out_dir="bench"):
+    """
+    Runs the benchmark matrix and writes out_dir/<label>.json.
+
+    Jobs default to 1 so concurrent simulators do not distort the timing figures.
+
+    Returns:
+        The report dict.
+    """
+    simulator = resolve_simulator(simulator)
+    out_dir = os.path.abspath(out_dir)
+    run_dir = os.path.join(out_dir, label)
+    os.makedirs(run_dir, exist_ok=True)
+    points = plan_points(mixes, lengths)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda point: run_point(point, run_dir, simulator, file_stimulus, seed), points))
+
+    report = {
+        "label": label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": _git_revision(),
+        "simulator": simulator,
+        "file_stimulus": file_stimulus,
+        "seed": seed,
+        "parallel_jobs": jobs,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "wall_s": time.perf_counter() - start,
+        "points": results,
+    }
+    with open(os.path.join(out_dir, f"{label}.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def format_report(report):
+    lines = [f"{report['label']} ({report['simulator']}{', file stimulus' if report['file_stimulus'] else ''}, "
+             f"rev {report['git_revision']})",
+             f"{'point':<22} {'cycles/s':>10} {'msg/cycle':>10} {'lat mean':>9} {'lat max':>8} {'RSS MiB':>8}"]
+    for point in report["points"]:
+        record = point["record"]
+        if record is None:
+            lines.append(f"{point['name']:<22} FAILED (see {point['name']}/sim.log)")
+            continue
+        latency = record["latency_cycles"]["all"]
+        lines.append(f"{point['name']:<22} {record['cycles_per_second']:>10.0f} "
+                     f"{record['sustained_messages_per_cycle']:>10.4f} "
+                     f"{latency['mean'] if latency['mean'] is not None else float('nan'):>9.1f} "
+                     f"{str(latency['max']):>8} {record['peak_rss_mb']:>8.0f}")
+    return "\n".join(lines)
+
+
+def compare_reports(base, new):
+    """
+    Point-by-point comparison of two benchmark reports (speed ratio and latency
+    and throughput deltas, new minus base).
+    """
+    base_points = {point["name"]: point["record"] for point in base["points"]}
+    lines = [f"{base['label']} -> {new['label']}",
+             f"{'point':<22} {'speed x':>8} {'msg/cycle d':>12} {'lat mean d':>11} {'RSS d MiB':>10}"]
+    for point in new["points"]:
+        old, cur = base_points.get(point["name"]), point["record"]
+        if old is None or cur is None:
+            lines.append(f"{point['name']:<22} missing in one report")
+            continue
+        old_lat, cur_lat = old["latency_cycles"]["all"]["mean"], cur["latency_cycles"]["all"]["mean"]
+        lat_delta = cur_lat - old_lat if old_lat is not None and cur_lat is not None else float("nan")
+        speed = cur["cycles_per_second"] / old["cycles_per_second"] if old["cycles_per_second"] else float("nan")
+        lines.append(f"{point['name']:<22} {speed:>8.2f} "
+                     f"{cur['sustained_messages_per_cycle'] - old['sustained_messages_per_cycle']:>+12.4f} "
+                     f"{lat_delta:>+11.2f} {cur['peak_rss_mb'] - old['peak_rss_mb']:>+10.0f}")
+    return "\n".join(lines)
+
+
+def run_simulator_comparison(mixes, lengths, simulators, label="benchmark", file_stimulus=False,
+                             jobs=1, seed=1, out_dir="bench"):
+    """
+    Runs the identical matrix (same points and seed) on every simulator, as
+    out_dir/<label>_<simulator>.json.
+
+    Returns:
+        The reports in `simulators` order.
+    """
+    return [run_benchmark(mixes, lengths, f"{label}_{simulator}", simulator, file_stimulus, jobs, seed, out_dir)
+            for simulator in simulators]
+
+
+def main(argv=None):
+    from sim_config import BENCH_MIXES, BENCH_LENGTHS
+
+    parser = argparse.ArgumentParser(description="Run the protocol-level benchmark matrix.")
+    parser.add_argument("--mixes", nargs="+", choices=sorted(BENCH_MIXES), default=list(BENCH_MIXES))
+    parser.add_argument("--lengths", nargs="+", type=int, default=BENCH_LENGTHS)
+    parser.add_argument("--label", default="benchmark", help="report name, e.g. the RTL revision")
+    parser.add_argument("--sim", default="auto", choices=("auto",) + SIMULATORS, help="cocotb simulator")
+    parser.add_argument("--sims", nargs="+", choices=SIMULATORS,
+                        help="run the matrix on each simulator and compare against the first")
+    parser.add_argument("--file-stimulus", action="store_true", help="build with FILE_STIMULUS=1")
+    parser.add_argument("--jobs", type=int, default=1, help="concurrent simulators (timing is per process)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench", help="output directory")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two reports and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        print(compare_reports(base, new))
+        return 0
+
+    if args.sims:
+        reports = run_simulator_comparison(args.mixes, args.lengths, args.sims, args.label, args.file_stimulus,
+                                           args.jobs, args.seed, args.out)
+        for report in reports:
+            print(format_report(report))
+        for report in reports[1:]:
+            print(compare_reports(reports[0], report))
+        return 0 if all(point["passed"] for report in reports for point in report["points"]) else 1
+
+    report = run_benchmark(args.mixes, args.lengths, args.label, args.sim, args.file_stimulus,
+                           args.jobs, args.seed, args.out)
+    print(format_report(report))
+    return 0 if all(point["passed"] for point in report["points"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# ============================================================
+# run_order_book.py
+# ============================================================
+#
+# Description: Offline driver for the order-book stage (helpers/order_book_helper.py).
+#              Rebuilds books from a recorded parser CSV log (or its result
+#              store), or from a generated order flow without simulation, and
+#              prints update throughput as a software baseline for the planned
+#              hardware book stage. Order-flow runs are also checked against
+#              the generator's live-order set.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: CSV and generated-flow book rebuild with throughput report.
+# [20261018-2] RZ: --store: rebuild from a result store (query_results.py build).
+# ============================================================
+#
+# Usage:
+#   python3 run_order_book.py --csv parser_recorded_log.csv
+#   python3 run_order_book.py --store parser_recorded_log.itchcol
+#   python3 run_order_book.py --flow 1000000 --seed 7 --json book_report.json
+
+import argparse
+import json
+import sys
+
+
+def run_csv(path):
+    from helpers.order_book_helper import new_order_book, apply_parser_columns, load_parser_csv, build_book_report
+
+    book = new_order_book()
+    apply_parser_columns(book, load_parser_csv(path))
+    return book, build_book_report(book)
+
+
+def run_store(path):
+    from helpers.order_book_helper import new_order_book, apply_parser_columns, load_parser_store, build_book_report
+
+    book = new_order_book()
+    apply_parser_columns(book, load_parser_store(path))
+    return book, build_book_report(book)
+
+
+def run_flow(messages, seed, chunk_messages=65536):
+    """
+    Generates an order flow and applies every message as the parser would
+    report it, then checks the book against the generator state. Only the
+    book updates are timed, not generation or decoding.
+    """
+    from sim_config import ORDER_FLOW_PARAMS
+    from helpers.order_flow_helper import new_order_flow, iter_order_flow_workload
+    from helpers.order_book_helper import new_order_book, apply_schedule, build_book_report
+
+    flow = new_order_flow(ORDER_FLOW_PARAMS, seed)
+    book = new_order_book()
+    for chunk in iter_order_flow_workload(messages, ORDER_FLOW_PARAMS, chunk_messages, state=flow):
+        apply_schedule(book, chunk["injection_schedule"])
+    return book, build_book_report(book, flow)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild order books from parser output or a generated flow.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="parser CSV log (parser_recorded_log.csv)")
+    source.add_argument("--store", help="result store of a parser log (query_results.py build)")
+    source.add_argument("--flow", type=int, help="messages of generated order flow")
+    parser.add_argument("--seed", type=int, default=1, help="order-flow seed")
+    parser.add_argument("--depth", type=int, default=0, help="print this many levels of the busiest symbol")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    from helpers.order_book_helper import format_book_report, book_levels
+
+    if args.csv:
+        book, report = run_csv(args.csv)
+    elif args.store:
+        book, report = run_store(args.store)
+    else:
+        book, report = run_flow(args.flow, args.seed)
+    print(format_book_report(report))
+
+    if args.depth and book["symbol_names"]:
+        busiest = max(range(len(book["symbol_names"])),
+                      key=lambda index: len(book["ladders"][index * 2][0]) + len(book["ladders"][index * 2 + 1][0]))
+        symbol = book["symbol_names"][busiest]
+        levels = book_levels(book, symbol, args.depth)
+        print(f"  {symbol.to_bytes(8, 'big').decode('ascii', 'replace').strip()}:")
+        for (bid, ask) in zip(levels["bids"] + [None] * args.depth, levels["asks"] + [None] * args.depth):
+            if bid is None and ask is None:
+                break
+            print(f"    {str(bid or ''):<28} {str(ask or '')}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    check = report.get("generator_check")
+    return 0 if check is None or check["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+# ============================================================
+# run_regression.py
+# ============================================================
+#
+# Description: Sharded regression runner. Splits MSG_SEQUENCE (and optionally
+#              several seeds) into independent jobs, runs one cocotb simulator
+#              process per job in its own directory, and merges the recorded
+#              logs, mismatch reports and timing into one summary.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.4
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial parallel shard/seed runner with merged summary.
+# [20261018-2] RZ: Merge the per-job throughput reports.
+# [20261018-3] RZ: --sim (icarus / verilator / auto) passed to every job.
+# [20261018-4] RZ: Merge streamed binary recorded logs (RECORD_STREAM=bin) as CSV.
+# ============================================================
+#
+# Usage:
+#   python3 run_regression.py --test integrated --shards 32 --jobs 32
+#   python3 run_regression.py --test parser --shards 4 --seeds 8
+#   python3 run_regression.py --test parser --shards 8 --sim verilator
+#   make regression TEST=parser SHARDS=32
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Test name -> cocotb module, toplevel and the files the testbench leaves behind
+TESTS = {
+    "integrated": {
+        "module": "test_integrated",
+        "toplevel": "integrated",
+        "log": "recorded_log.csv",
+        "report": "mismatch_report.json",
+    },
+    "parser": {
+        "module": "test_parser_canonical",
+        "toplevel": "test_wrapper",
+        "log": "parser_recorded_log.csv",
+        "report": "parser_mismatch_report.json",
+    },
+}
+
+
+def plan_jobs(shards, seeds=1, base_seed=1):
+    """
+    One job per (seed, shard). Every shard of a seed sees the same MSG_SEQUENCE;
+    sim_config.py derives a distinct payload seed per shard.
+
+    Returns:
+        List[Dict] with name, shard_index, shard_count and seed.
+    """
+    return [
+        {
+            "name": f"seed{seed:04d}_shard{shard:03d}",
+            "shard_index": shard,
+            "shard_count": shards,
+            "seed": seed,
+        }
+        for seed in range(base_seed, base_seed + seeds)
+        for shard in range(shards)
+    ]
+
+
+# cocotb simulators the Makefile builds for
+SIMULATORS = ("icarus", "verilator")
+
+
+def resolve_simulator(simulator="auto"):
+    """
+    Maps "auto" to Verilator when it is installed, otherwise Icarus (the
+    same rule as SIM=auto in the Makefile); other names pass through.
+    """
+    if simulator != "auto":
+        return simulator
+    return "verilator" if shutil.which("verilator") else "icarus"
+
+
+def job_command(test, simulator="auto"):
+    spec = TESTS[test]
+    return ["make", "-f", os.path.join(SIM_DIR, "Makefile"), "sim",
+            f"MODULE={spec['module']}", f"TOPLEVEL={spec['toplevel']}", f"SIM={resolve_simulator(simulator)}"]
+
+
+def job_env(job):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SIM_DIR, env.get("PYTHONPATH")]))
+    env["SHARD_INDEX"] = str(job["shard_index"])
+    env["SHARD_COUNT"] = str(job["shard_count"])
+    env["SIM_SEED"] = str(job["seed"])
+    return env
+
+
+def parse_results_xml(path):
+    """
+    Reads the cocotb results.xml of one job.
+
+    Returns:
+        List[Dict] with name, passed, sim_time_ns and real_time_s per test case.
+    """
+    if not os.path.exists(path):
+        return []
+    cases = []
+    for case in ET.parse(path).getroot().iter("testcase"):
+        cases.append({
+            "name": case.get("name"),
+            "passed": case.find("failure") is None and case.find("error") is None,
+            "sim_time_ns": float(case.get("sim_time_ns", 0)),
+            "real_time_s": float(case.get("time", 0)),
+        })
+    return cases
+
+
+def run_job(job, test, out_dir, simulator="auto"):
+    """
+    Runs one simulator process in out_dir/<job name>. The directory isolates
+    sim_build, results.xml, dump.vcd and the testbench CSV/JSON outputs.
+    """
+    job_dir = os.path.join(out_dir, job["name"])
+    os.makedirs(job_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with open(os.path.join(job_dir, "sim.log"), "w") as log:
+        proc = subprocess.run(job_command(test, simulator), cwd=job_dir, env=job_env(job),
+                              stdout=log, stderr=subprocess.STDOUT)
+    wall_s = time.perf_counter() - start
+
+    report_path = os.path.join(job_dir, TESTS[test]["report"])
+    report = None
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            report = json.load(f)
+
+    cases = parse_results_xml(os.path.join(job_dir, "results.xml"))
+    return {
+        **job,
+        "dir": job_dir,
+        "returncode": proc.returncode,
+        "wall_s": wall_s,
+        "tests": cases,
+        "passed": proc.returncode == 0 and bool(cases) and all(case["passed"] for case in cases),
+        "report": report,
+    }
+
+
+def merge_reports(results, max_examples=20):
+    """
+    Sums the per-job mismatch reports; examples are tagged with their job name.
+    The result has the build_mismatch_report() layout.
+    """
+    merged = {
+        "passed": True,
+        "expected_events": 0,
+        "recorded_cycles": 0,
+        "missing_cycles": 0,
+        "field_mismatches": 0,
+        "unexpected_valids": 0,
+        "by_field": {},
+        "by_type": {},
+        "examples": [],
+        "unexpected_examples": [],
+    }
+    for result in results:
+        report = result["report"]
+        if report is None:
+            merged["passed"] = False
+            continue
+        merged["passed"] &= bool(report["passed"])
+        for key in ("expected_events", "recorded_cycles", "missing_cycles",
+                    "field_mismatches", "unexpected_valids"):
+            merged[key] += report[key]
+        for key in ("by_field", "by_type"):
+            for name, count in report[key].items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        for key in ("examples", "unexpected_examples"):
+            room = max_examples - len(merged[key])
+            merged[key].extend({**example, "shard": result["name"]} for example in report[key][:max(room, 0)])
+    merged["throughput"] = merge_throughput([result["report"].get("throughput") for result in results
+                                             if result["report"] is not None])
+    return merged
+
+
+def merge_throughput(throughputs):
+    """
+    Sums per-job throughput reports (gap_model_helper.build_throughput_report())
+    and recomputes the per-cycle rates over all jobs. None if no job has one.
+    """
+    throughputs = [throughput for throughput in throughputs if throughput]
+    if not throughputs:
+        return None
+    merged = {key: sum(throughput[key] for throughput in throughputs)
+              for key in ("injected_cycles", "idle_cycles", "bytes", "messages", "aborted_messages")}
+    merged["delivered_events"] = sum(throughput.get("delivered_events", 0) for throughput in throughputs)
+    cycles = merged["injected_cycles"]
+    for key, count in (("bytes_per_cycle", "bytes"), ("messages_per_cycle", "messages"),
+                       ("delivered_per_cycle", "delivered_events")):
+        merged[key] = merged[count] / cycles if cycles else 0.0
+    merged["sustained"] = all(throughput.get("sustained", False) for throughput in throughputs)
+    return merged
+
+
+def find_log(run_dir, log_name):
+    """
+    Path of a run's recorded log: the CSV, or the binary log a
+    RECORD_STREAM=bin run left instead. None when neither exists.
+    """
+    for name in (log_name, os.path.splitext(log_name)[0] + ".bin"):
+        path = os.path.join(run_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def merge_logs(results, log_name, merged_path):
+    """
+    Concatenates the per-job recorded CSV logs with a leading shard column
+    (binary logs are converted on the way). Cycles stay local to each job.
+    """
+    from helpers.log_writer_helper import iter_log_rows
+
+    writer = None
+    with open(merged_path, "w", newline="") as out:
+        for result in results:
+            path = find_log(result["dir"], log_name)
+            if path is None:
+                continue
+            rows = iter_log_rows(path)
+            header = next(rows, None)
+            if header is None:
+                continue
+            if writer is None:
+                writer = csv.writer(out)
+                writer.writerow(["shard"] + header)
+            for row in rows:
+                writer.writerow([result["name"]] + row)
+
+
+def _job_summary(result):
+    report = result["report"] or {}
+    summary = {key: value for key, value in result.items() if key != "report"}
+    summary["expected_events"] = report.get("expected_events")
+    summary["errors"] = (report["field_mismatches"] + report["unexpected_valids"]) if report else None
+    summary["bytes_per_cycle"] = (report.get("throughput") or {}).get("bytes_per_cycle")
+    return summary
+
+
+def run_regression(test="integrated", shards=1, jobs=None, seeds=1, base_seed=1,
+                   out_dir="regression", merge_log=True, simulator="auto"):
+    """
+    Runs every job with up to `jobs` simulator processes at once and writes
+    out_dir/summary.json (plus the merged log if merge_log).
+
+    Returns:
+        The summary dict.
+    """
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    planned = plan_jobs(shards, seeds, base_seed)
+    jobs = jobs or os.cpu_count() or 1
+    simulator = resolve_simulator(simulator)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda job: run_job(job, test, out_dir, simulator), planned))
+    wall_s = time.perf_counter() - start
+
+    if merge_log:
+        merge_logs(results, TESTS[test]["log"], os.path.join(out_dir, "merged_" + TESTS[test]["log"]))
+
+    busy_s = sum(result["wall_s"] for result in results)
+    summary = {
+        "test": test,
+        "simulator": simulator,
+        "shards": shards,
+        "seeds": seeds,
+        "parallel_jobs": jobs,
+        "passed": all(result["passed"] for result in results),
+        "wall_s": wall_s,
+        "serial_equivalent_s": busy_s,
+        "speedup": busy_s / wall_s if wall_s else 0.0,
+        "sim_time_ns": sum(case["sim_time_ns"] for result in results for case in result["tests"]),
+        "report": merge_reports(results),
+        "jobs": [_job_summary(result) for result in results],
+    }
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def format_summary(summary):
+    from helpers.compare_helper import format_mismatch_report
+
+    lines = [f"{'job':<24} {'result':<6} {'wall s':>8} {'events':>8} {'errors':>8}"]
+    for job in summary["jobs"]:
+        lines.append(f"{job['name']:<24} {'PASS' if job['passed'] else 'FAIL':<6} {job['wall_s']:>8.1f} "
+                     f"{str(job['expected_events']):>8} {str(job['errors']):>8}")
+    lines.append(f"{len(summary['jobs'])} jobs on {summary['parallel_jobs']} workers ({summary['simulator']}): "
+                 f"{summary['wall_s']:.1f} s wall, {summary['serial_equivalent_s']:.1f} s serial "
+                 f"({summary['speedup']:.1f}x)")
+    lines.append(format_mismatch_report(summary["report"]))
+    throughput = summary["report"]["throughput"]
+    if throughput:
+        lines.append(f"Throughput: {throughput['bytes_per_cycle']:.3f} bytes/cycle offered, "
+                     f"{throughput['delivered_per_cycle']:.4f} events/cycle delivered, "
+                     f"{throughput['aborted_messages']} messages split by gaps")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a sharded cocotb regression in parallel.")
+    parser.add_argument("--test", choices=sorted(TESTS), default="integrated")
+    parser.add_argument("--shards", type=int, default=1, help="slices of MSG_SEQUENCE per seed")
+    parser.add_argument("--jobs", type=int, default=None, help="concurrent simulators (default: CPU count)")
+    parser.add_argument("--seeds", type=int, default=1, help="number of seeds, each run on every shard")
+    parser.add_argument("--base-seed", type=int, default=1)
+    parser.add_argument("--out", default="regression", help="output directory")
+    parser.add_argument("--sim", default="auto", choices=("auto",) + SIMULATORS, help="cocotb simulator")
+    parser.add_argument("--no-merge-log", action="store_true", help="skip the merged recorded CSV")
+    parser.add_argument("--dry-run", action="store_true", help="print the job plan and exit")
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        for job in plan_jobs(args.shards, args.seeds, args.base_seed):
+            env = " ".join(f"{key}={job_env(job)[key]}" for key in ("SHARD_INDEX", "SHARD_COUNT", "SIM_SEED"))
+            print(f"{job['name']}: {env} {' '.join(job_command(args.test, args.sim))}")
+        return 0
+
+    summary = run_regression(args.test, args.shards, args.jobs, args.seeds, args.base_seed,
+                             args.out, merge_log=not args.no_merge_log, simulator=args.sim)
+    print(format_summary(summary))
+    return 0 if summary["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
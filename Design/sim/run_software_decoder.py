@@ -0,0 +1,181 @@
+# ============================================================
+# run_software_decoder.py
+# ============================================================
+#
+# Description: Offline driver for the software ITCH decoder
+#              (helpers/software_decoder_helper.py). Decodes a raw stream file
+#              (mmap, chunked) or a generated workload and prints decode
+#              throughput, the baseline the hardware parser is measured
+#              against. Generated workloads are also checked against the
+#              schedule-derived expected events.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.2
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: File/generated decode with throughput report and schedule check.
+# [20261018-2] RZ: --workers: process-pool file decode (parallel_decoder_helper.py), --scaling table.
+# ============================================================
+#
+# Usage:
+#   python3 run_software_decoder.py --messages 1000000 --seed 7
+#   python3 run_software_decoder.py --file stream.bin --json decoder_report.json
+#   python3 run_software_decoder.py --file stream.bin --workers 8
+#   python3 run_software_decoder.py --file stream.bin --scaling 1,2,4,8
+
+import argparse
+import json
+import mmap
+import sys
+import time
+
+
+def run_file(path, chunk_bytes=16 << 20):
+    """
+    Decodes a file of back-to-back messages in `chunk_bytes` slices.
+    """
+    import numpy as np
+
+    from helpers.payload_batch_helper import MSG_TYPES
+    from helpers.software_decoder_helper import iter_decode_stream
+
+    counts = [0] * len(MSG_TYPES)
+    messages = skipped = consumed = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        start = time.perf_counter()
+        for decoded in iter_decode_stream(view[i:i + chunk_bytes] for i in range(0, len(view), chunk_bytes)):
+            messages += decoded["count"]
+            skipped += decoded["skipped_bytes"]
+            consumed = decoded["stream_offset"] + decoded["consumed"]
+            for code, count in enumerate(np.bincount(decoded["types"], minlength=len(MSG_TYPES)).tolist()):
+                counts[code] += count
+            del decoded
+        elapsed = time.perf_counter() - start
+        del view
+
+    return {
+        "source": path,
+        "bytes": consumed,
+        "messages": messages,
+        "per_type": dict(zip(MSG_TYPES, counts)),
+        "skipped_bytes": skipped,
+        "seconds": elapsed,
+        "mb_per_second": consumed / elapsed / 1e6 if elapsed else 0.0,
+        "messages_per_second": messages / elapsed if elapsed else 0.0,
+    }
+
+
+def run_file_parallel(path, workers, chunk_bytes=32 << 20):
+    """
+    Decodes a file with the process pool (parallel_decoder_helper.py).
+    """
+    import os
+
+    import numpy as np
+
+    from helpers.payload_batch_helper import MSG_TYPES
+    from helpers.parallel_decoder_helper import iter_parallel_decode
+
+    counts = np.zeros(len(MSG_TYPES), dtype=np.int64)
+    messages = skipped = consumed = 0
+    stats = {}
+    for decoded in iter_parallel_decode(path, workers, chunk_bytes, stats):
+        messages += decoded["count"]
+        skipped += decoded["skipped_bytes"]
+        consumed = decoded["stop"]
+        counts += np.bincount(decoded["types"], minlength=len(MSG_TYPES))
+    elapsed = stats["seconds"]
+
+    return {
+        "source": f"{path} ({stats['workers']} workers, {stats['ranges']} ranges)",
+        "bytes": consumed,
+        "messages": messages,
+        "per_type": dict(zip(MSG_TYPES, counts.tolist())),
+        "skipped_bytes": skipped,
+        "repaired_boundaries": stats["repaired"],
+        "file_bytes": os.path.getsize(path),
+        "seconds": elapsed,
+        "mb_per_second": consumed / elapsed / 1e6 if elapsed else 0.0,
+        "messages_per_second": messages / elapsed if elapsed else 0.0,
+    }
+
+
+def run_generated(messages, seed, check=True):
+    """
+    Generates a seeded workload, times its decode and (with `check`)
+    compares the decoder's expected columns with the schedule's.
+    """
+    from ITCH_config import PARSER_HEADERS
+    from helpers.msg_sequence_helper import generate_msg_sequence
+    from helpers.full_workload_helper import run_full_payload_workload
+    from helpers.software_decoder_helper import decode_stream, decoded_expected_columns, software_decoder_throughput
+    from helpers.compare_helper import generate_expected_events_from_schedule, build_mismatch_report
+
+    workload = run_full_payload_workload(generate_msg_sequence(messages), seed=seed)
+    stream = bytes(workload["full_stream"])
+    report = {"source": f"generated ({messages} messages, seed {seed})",
+              **software_decoder_throughput(stream)}
+
+    if check:
+        expected = generate_expected_events_from_schedule(workload["injection_schedule"], parser_mode=True)
+        recorded = {event["cycle"]: event for event in expected}
+        columns = decoded_expected_columns(decode_stream(stream, records=False))
+        check_report = build_mismatch_report(recorded, columns, headers=PARSER_HEADERS)
+        report["schedule_check"] = {key: check_report[key] for key in
+                                    ("passed", "expected_events", "missing_cycles", "field_mismatches", "unexpected_valids")
+                                    if key in check_report}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Software ITCH decoder throughput and self-check.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="raw stream of back-to-back messages")
+    source.add_argument("--messages", type=int, help="messages of generated workload")
+    parser.add_argument("--seed", type=int, default=1, help="workload seed")
+    parser.add_argument("--workers", type=int, default=0, help="decode --file with this many processes")
+    parser.add_argument("--chunk-mb", type=int, default=32, help="bytes per worker range, in MiB")
+    parser.add_argument("--scaling", help="comma-separated worker counts to time on --file")
+    parser.add_argument("--no-check", action="store_true", help="skip the schedule check")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.scaling:
+        if not args.file:
+            parser.error("--scaling needs --file")
+        from helpers.parallel_decoder_helper import parallel_decoder_scaling
+
+        rows = parallel_decoder_scaling(args.file, [int(n) for n in args.scaling.split(",")], args.chunk_mb << 20)
+        print(f"{'workers':>8} {'seconds':>9} {'MB/s':>8} {'msgs/s':>11} {'speedup':>8}")
+        for row in rows:
+            print(f"{row['workers']:>8} {row['seconds']:>9.3f} {row['mb_per_second']:>8.1f} "
+                  f"{row['messages_per_second']:>11.0f} {row['speedup']:>7.2f}x")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(rows, f, indent=2)
+        return 0
+
+    if args.file:
+        report = run_file_parallel(args.file, args.workers, args.chunk_mb << 20) if args.workers else run_file(args.file)
+    else:
+        report = run_generated(args.messages, args.seed, not args.no_check)
+    print(f"Software decoder: {report['messages']} messages / {report['bytes']} bytes from {report['source']}")
+    print(f"  {report['mb_per_second']:.1f} MB/s, {report['messages_per_second']:.0f} messages/s")
+    if report.get("skipped_bytes"):
+        print(f"  skipped {report['skipped_bytes']} non-type bytes")
+    if report.get("repaired_boundaries"):
+        print(f"  {report['repaired_boundaries']} range boundaries re-decoded after a false resync")
+    check = report.get("schedule_check")
+    if check is not None:
+        print(f"  vs schedule: {'match' if check['passed'] else 'MISMATCH'} ({check['expected_events']} events)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if check is None or check["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
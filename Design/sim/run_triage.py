@@ -0,0 +1,200 @@
+# ============================================================
+# run_triage.py
+# ============================================================
+#
+# Description: Failure-window triage for a failing integrated / parser run.
+#              Takes the first mismatch cycle (from the run's mismatch report
+#              or --cycle), slices the same seeded workload around it
+#              (helpers/triage_helper.py), re-simulates only that slice from
+#              reset with an FST dump, and leaves a repro directory with the
+#              slice, waveform, recorded and expected rows and both reports.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.3
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Slice, re-simulate and bundle the window around a mismatch.
+# [20261018-2] RZ: Bundle the binary recorded log of a RECORD_STREAM=bin rerun.
+# [20261018-3] RZ: Bundle the slice's JSON sidecar (slice.json).
+# ============================================================
+#
+# Usage:
+#   SIM_SEED=7 python3 run_triage.py --test parser
+#   python3 run_triage.py --test integrated --seed 7 --cycle 28411
+#   python3 run_triage.py --test parser --seed 3 --shard 5 --shards 8 \
+#       --report regression/seed0003_shard005/parser_mismatch_report.json
+#   make triage TEST=parser SIM_SEED=7
+#
+# Run with the same environment as the failing run (GAP_MODEL, ORDER_FLOW_MESSAGES,
+# ITCH_REPLAY_FILE, WORKLOAD_CACHE, ...): the workload is rebuilt from it.
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from run_regression import TESTS, SIM_DIR, find_log, job_command, parse_results_xml, resolve_simulator
+
+# Files each testbench leaves in the run directory, besides the report
+EXPECTED_LOGS = {"integrated": "expected_events.csv", "parser": "parser_expected_events.csv"}
+
+
+def failing_cycle_from_report(path):
+    """
+    First mismatch of a saved mismatch report: the wave trigger cycle when the
+    run had one, otherwise the earliest example.
+    """
+    from helpers.wave_helper import first_mismatch_cycle
+
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("passed", True):
+        raise ValueError(f"{path} is a passing run; nothing to triage")
+    waves = report.get("waves") or {}
+    cycle = waves.get("trigger_cycle")
+    if cycle is None:
+        cycle = first_mismatch_cycle(report)
+    if cycle is None:
+        raise ValueError(f"{path} has no mismatch example with a cycle; pass --cycle")
+    return cycle
+
+
+def run_slice(test, out_dir, simulator="auto"):
+    """
+    Simulates the slice in out_dir (TRIAGE_SLICE=slice.pkl, WAVE=fst).
+
+    Returns:
+        (returncode, wall seconds)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SIM_DIR, env.get("PYTHONPATH")]))
+    env["TRIAGE_SLICE"] = os.path.join(out_dir, "slice.pkl")
+    env.update({"WAVE_WINDOW": "", "WAVE_TRIGGER": "0"})
+    start = time.perf_counter()
+    with open(os.path.join(out_dir, "sim.log"), "w") as log:
+        proc = subprocess.run(job_command(test, simulator) + ["WAVE=fst"], cwd=out_dir, env=env,
+                              stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, time.perf_counter() - start
+
+
+def build_bundle(test, out_dir, triage, simulator, returncode, wall_s):
+    """
+    Reads the rerun's outputs back and writes triage.json, the bundle's index.
+    """
+    spec = TESTS[test]
+    report = None
+    report_path = os.path.join(out_dir, spec["report"])
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            report = json.load(f)
+
+    from helpers.wave_helper import first_mismatch_cycle
+
+    rerun_cycle = first_mismatch_cycle(report) if report else None
+    recorded = find_log(out_dir, spec["log"])
+    files = {
+        "slice": "slice.pkl",
+        "slice_meta": "slice.json",
+        "waves": next((name for name in ("dump.fst", "dump.vcd") if os.path.exists(os.path.join(out_dir, name))), None),
+        "recorded": recorded and os.path.basename(recorded),
+        "expected": EXPECTED_LOGS[test],
+        "report": spec["report"],
+        "log": "sim.log",
+    }
+    bundle = {
+        "test": test,
+        "simulator": resolve_simulator(simulator),
+        "seed": os.environ.get("SIM_SEED"),
+        "shard_index": int(os.environ.get("SHARD_INDEX", "0")),
+        "shard_count": int(os.environ.get("SHARD_COUNT", "1")),
+        **triage,
+        "returncode": returncode,
+        "wall_s": wall_s,
+        "tests": parse_results_xml(os.path.join(out_dir, "results.xml")),
+        # The slice reproduces the failure when its own check fails too
+        "reproduced": report is not None and not report["passed"],
+        "rerun_first_mismatch": rerun_cycle,
+        "rerun_first_mismatch_original": None if rerun_cycle is None else rerun_cycle + triage["cycle_offset"],
+        "files": {key: name for key, name in files.items()
+                  if name and os.path.exists(os.path.join(out_dir, name))},
+        "rerun": f"TRIAGE_SLICE=slice.pkl make -f {os.path.join(SIM_DIR, 'Makefile')} sim "
+                 f"MODULE={spec['module']} TOPLEVEL={spec['toplevel']} WAVE=fst",
+    }
+    with open(os.path.join(out_dir, "triage.json"), "w") as f:
+        json.dump(bundle, f, indent=2)
+    return bundle
+
+
+def format_triage(bundle, out_dir):
+    lines = [
+        f"Triage {bundle['test']}: cycle {bundle['original_failing_cycle']} -> "
+        f"slice of {bundle['cycles']} cycles / {bundle['messages']} messages "
+        f"(slice cycle c = original cycle c + {bundle['cycle_offset']})",
+    ]
+    if "reproduced" in bundle:
+        if bundle["reproduced"]:
+            lines.append(f"  reproduced: first mismatch at slice cycle {bundle['rerun_first_mismatch']} "
+                         f"(original {bundle['rerun_first_mismatch_original']}), {bundle['wall_s']:.1f} s")
+        else:
+            lines.append(f"  NOT reproduced by the slice (returncode {bundle['returncode']}); "
+                         f"raise TRIAGE_WARMUP_MESSAGES or check {os.path.join(out_dir, 'sim.log')}")
+        if bundle["files"].get("waves"):
+            lines.append(f"  waves: {os.path.join(out_dir, bundle['files']['waves'])}")
+    lines.append(f"  bundle: {out_dir}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate the window around a failing cycle with waveforms.")
+    parser.add_argument("--test", choices=sorted(TESTS), default="integrated")
+    parser.add_argument("--report", help="mismatch report of the failing run (default: the test's report here)")
+    parser.add_argument("--cycle", type=int, help="failing cycle (instead of the report's first mismatch)")
+    parser.add_argument("--seed", type=int, help="SIM_SEED of the failing run (default: $SIM_SEED)")
+    parser.add_argument("--shard", type=int, help="SHARD_INDEX of the failing run")
+    parser.add_argument("--shards", type=int, help="SHARD_COUNT of the failing run")
+    parser.add_argument("--warmup", type=int, help="whole messages before the failing one "
+                                                   "(default: TRIAGE_WARMUP_MESSAGES)")
+    parser.add_argument("--out", help="repro directory (default: triage/<test>_cycle<N>)")
+    parser.add_argument("--sim", default="auto", help="icarus, verilator or auto")
+    parser.add_argument("--no-sim", action="store_true", help="only write the slice")
+    parser.add_argument("--keep-build", action="store_true", help="keep sim_build in the bundle")
+    args = parser.parse_args(argv)
+
+    # sim_config reads these at import time, so set them before any helper import
+    for name, value in (("SIM_SEED", args.seed), ("SHARD_INDEX", args.shard), ("SHARD_COUNT", args.shards)):
+        if value is not None:
+            os.environ[name] = str(value)
+    os.environ.pop("TRIAGE_SLICE", None)
+
+    cycle = args.cycle if args.cycle is not None else failing_cycle_from_report(args.report or TESTS[args.test]["report"])
+
+    from sim_config import TRIAGE_WARMUP_MESSAGES
+    from helpers.triage_helper import rebuild_workload, build_triage_slice, write_triage_slice
+
+    parser_mode = args.test == "parser"
+    warmup = TRIAGE_WARMUP_MESSAGES if args.warmup is None else args.warmup
+    triage_slice = build_triage_slice(cycle, rebuild_workload(parser_mode), parser_mode, warmup_messages=warmup)
+    triage = triage_slice["triage"]
+
+    out_dir = os.path.abspath(args.out or os.path.join("triage", f"{args.test}_cycle{cycle}"))
+    os.makedirs(out_dir, exist_ok=True)
+    write_triage_slice(triage_slice, os.path.join(out_dir, "slice.pkl"))
+
+    if args.no_sim:
+        print(format_triage({"test": args.test, **triage}, out_dir))
+        return 0
+
+    returncode, wall_s = run_slice(args.test, out_dir, args.sim)
+    if not args.keep_build:
+        shutil.rmtree(os.path.join(out_dir, "sim_build"), ignore_errors=True)
+    bundle = build_bundle(args.test, out_dir, triage, args.sim, returncode, wall_s)
+    print(format_triage(bundle, out_dir))
+    return 0 if bundle["reproduced"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,11 @@
 # Author: RZ
 # Start Date: 20250505
 # ============================================================
-from helpers.msg_sequence_helper import generate_msg_sequence, generate_permutation_coverage_sequence
+import json
+import os
+import random
+
+from helpers.msg_sequence_helper import generate_msg_sequence, generate_permutation_coverage_sequence, generate_transition_coverage_sequence, shard_sequence
 from ITCH_config import MSG_LENGTHS, SIM_HEADERS
 
 # Define global simulation period in ns  
@@ -16,14 +20,133 @@ SIM_CLK_PERIOD_NS = 10
 SIM_CYCLES = 300  # Number of cycles to run the simulation--placeholder
 RESET_CYCLES = 3  # Number of cycles to reset the DUT before starting the test
 MSG_MODE = 'rand'  # Message mode for payload generation (set or rand)
+# Expected events come from helpers/reference_model.py, which follows the decoders' speculative framing
+# (extra and missed valids on back-to-back streams). USE_REFERENCE_MODEL=0 checks against the schedule
+# instead, which assumes ideal framing and only holds when a gap precedes every message. Forced back on
+# below for workloads the schedule cannot describe at all
+USE_REFERENCE_MODEL = os.environ.get("USE_REFERENCE_MODEL", "1") == "1"
+STREAM_CHUNK_MESSAGES = 0  # >0: generate and inject the workload lazily, this many messages per chunk
+RECORD_SPARSE = False  # Recorders only log cycles where a valid is high (event-triggered)
+RECORD_CONTEXT_CYCLES = 0  # Sparse mode: extra cycles logged before/after each valid cycle
+ONLINE_SCOREBOARD = False  # Check outputs while simulating instead of recording the full log
+# "csv" / "bin": recorders stream their log to disk in batches from a writer thread
+# (helpers/log_writer_helper.py); "": whole log kept in memory and written at the end
+RECORD_STREAM = os.environ.get("RECORD_STREAM", "")
+if RECORD_STREAM not in ("", "csv", "bin"):
+    raise ValueError(f"RECORD_STREAM must be csv, bin or empty, got {RECORD_STREAM!r}")
+ONLINE_SCOREBOARD_TOLERANCE = 0  # Errors tolerated before the online scoreboard fails the test
+REPLAY_FILE = os.environ.get("ITCH_REPLAY_FILE", "")  # ITCH 5.0 capture replayed instead of MSG_SEQUENCE (parser test)
+REPLAY_TRANSLATE = True  # Re-pack supported types into the DUT layout; False injects raw bodies
+REPLAY_MSG_TYPES = None  # ITCH type characters to replay, e.g. "AXDUEP"; None keeps every message
+# Captures repeat a type back to back (A,A,A,D) and the DUT drops the repeats, which the
+# schedule does not know: replays, translated or raw, are always checked against the model
+if REPLAY_FILE:
+    USE_REFERENCE_MODEL = True
+FILE_STIMULUS = os.environ.get("FILE_STIMULUS", "0") == "1"  # Stream the workload from a file (make FILE_STIMULUS=1)
+STIMULUS_FILE = "stimulus.bin"  # Workload file read by rtl/stream_stimulus.v (its +STIM_FILE default)
+GAP_MODEL = os.environ.get("GAP_MODEL") or None  # valid_in gaps: None (back-to-back), "duty", "bernoulli" or "burst"
+GAP_SCOPE = os.environ.get("GAP_SCOPE", "message")  # "message": gaps between messages; "byte": anywhere (aborts, model-checked)
+GAP_PARAMS = {"duty": 0.5, "p_valid": 0.8, "burst_on": 64, "burst_off": 8}  # See helpers/gap_model_helper.py
+# Profiling (helpers/profile_helper.py): any of "phases", "cprofile", "tracemalloc", e.g. TB_PROFILE=phases,cprofile
+PROFILE_MODES = frozenset(filter(None, os.environ.get("TB_PROFILE", "").split(",")))
+PROFILE_TOP = 25  # Functions / allocation sites kept in the profile report
+
+# Sharded regression (run_regression.py): each simulator process gets its own slice and seed
+SHARD_INDEX = int(os.environ.get("SHARD_INDEX", "0"))
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "1"))
+SIM_SEED = int(os.environ["SIM_SEED"]) if os.environ.get("SIM_SEED") else None  # None: unseeded
+if SIM_SEED is not None:
+    random.seed(SIM_SEED)
+
+# >0: MSG_SEQUENCE covers every ordered k-gram of types (de Bruijn) instead of all permutations.
+# Includes back-to-back repeats of a type, which the DUT drops, so it is checked against the model
+TRANSITION_K = int(os.environ.get("TRANSITION_K", "0"))
+if TRANSITION_K:
+    USE_REFERENCE_MODEL = True
 
 # MSG_SEQUENCE = generate_msg_sequence(40)
 MSG_SEQUENCE = generate_permutation_coverage_sequence()  # permutation coverage sequence  
+if TRANSITION_K:
+    MSG_SEQUENCE = list(generate_transition_coverage_sequence(TRANSITION_K))
 
 # 
 # MSG_SEQUENCE = [    'delete',     'delete',     'add'    ] # message sequence for testing
 
+MSG_SEQUENCE = shard_sequence(MSG_SEQUENCE, SHARD_INDEX, SHARD_COUNT, overlap=max(TRANSITION_K - 1, 1))  # Keep k-grams across shard edges
+if SIM_SEED is not None:
+    random.seed(SIM_SEED * SHARD_COUNT + SHARD_INDEX)  # Distinct payloads per shard of the same seed
+GAP_SEED = None if SIM_SEED is None else SIM_SEED * SHARD_COUNT + SHARD_INDEX
+WORKLOAD_SEED = GAP_SEED  # Payload seed passed to the workload generators (None: unseeded)
+
+# On-disk workload cache (helpers/workload_cache_helper.py); needs SIM_SEED. Shared by reruns and shards
+WORKLOAD_CACHE = os.environ.get("WORKLOAD_CACHE", "0") == "1"
+WORKLOAD_CACHE_DIR = os.environ.get("WORKLOAD_CACHE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "workload_cache")
+
+# Benchmark suite (test_benchmark.py / run_benchmark.py): one (mix, length) point per simulator process
+BENCH_MIXES = {
+    "uniform":     None,
+    "add_heavy":   {"add": 6, "cancel": 2, "delete": 2, "replace": 1, "executed": 1, "trade": 1},
+    "execution":   {"add": 2, "cancel": 1, "delete": 1, "replace": 1, "executed": 4, "trade": 4},
+    "short_only":  {"add": 0, "cancel": 1, "delete": 1, "replace": 0, "executed": 0, "trade": 0},
+    "order_flow":  None,  # Stateful generator with ORDER_FLOW_PARAMS (test_benchmark.py)
+}
+BENCH_LENGTHS = [100, 1000, 10000]
+BENCH_MIX = os.environ.get("BENCH_MIX", "uniform")
+BENCH_LENGTH = int(os.environ.get("BENCH_LENGTH", "1000"))
+LATENCY_WINDOW = 8  # Cycles after a message's last byte within which its parsed_valid is attributed to it
+
+# Rebuild order books from the parser output (helpers/order_book_helper.py, parser test)
+ORDER_BOOK = os.environ.get("ORDER_BOOK", "0") == "1"
+
+# Stateful order flow (helpers/order_flow_helper.py): >0 replaces MSG_SEQUENCE with this many
+# messages referencing live orders. Same-type repeats are frequent and the DUT drops them,
+# so these runs are always checked against the model
+ORDER_FLOW_MESSAGES = int(os.environ.get("ORDER_FLOW_MESSAGES", "0"))
+if ORDER_FLOW_MESSAGES:
+    USE_REFERENCE_MODEL = True
+ORDER_FLOW_PARAMS = {
+    "mix":         {"add": 45, "cancel": 3, "delete": 40, "replace": 8, "executed": 3, "trade": 1},
+    "transitions": None,  # {prev type: {next type: weight}}; None draws every type from "mix"
+    "max_live":    100_000,
+    "symbols":     500,
+    "zipf_s":      1.1,
+    "odd_lot":     0.15,
+    "round_lot_p": 0.6,
+    "max_lots":    100,
+    "depth_p":     0.3,
+    "mean_gap_ns": 2_000,
+}
+
+# Waveforms (helpers/wave_helper.py); WAVE, WAVE_WINDOW and WAVE_TRIGGER come from the Makefile
+WAVE = os.environ.get("WAVE", "none") or "none"  # "vcd" / "fst" dump (+WAVES plusarg); "none": headless
+WAVE_WINDOW = os.environ.get("WAVE_WINDOW", "")  # "first:last" absolute cycles; "" dumps the whole run
+WAVE_TRIGGER = os.environ.get("WAVE_TRIGGER", "0") == "1"  # Dump from the first online-scoreboard mismatch
+WAVE_PRE_CYCLES = 200  # Cycles before a mismatch in the suggested rerun window
+WAVE_POST_CYCLES = 200  # Cycles dumped (and simulated on) after a triggering mismatch
+
+# Failure-window triage (run_triage.py, helpers/triage_helper.py): TRIAGE_SLICE replays a
+# slice of a failing run instead of the workload, recording every cycle for the repro bundle
+TRIAGE_SLICE = os.environ.get("TRIAGE_SLICE", "")
+TRIAGE_WARMUP_MESSAGES = 8  # Whole messages replayed before the failing one (decoder suppression state)
+if TRIAGE_SLICE:
+    ONLINE_SCOREBOARD = False
+    GAP_MODEL = None  # The slice already carries the failing run's valid_in gaps
+
 
 
 # Total cycles to run the simulation
-SIM_CYCLES = sum(MSG_LENGTHS[msg] for msg in MSG_SEQUENCE) + RESET_CYCLES + 20  
\ No newline at end of file
+SIM_CYCLES = sum(MSG_LENGTHS[msg] for msg in MSG_SEQUENCE) + RESET_CYCLES + 20  
+if ORDER_FLOW_MESSAGES:
+    SIM_CYCLES = ORDER_FLOW_MESSAGES * max(MSG_LENGTHS.values()) + RESET_CYCLES + 20  # Upper bound
+if REPLAY_FILE:
+    # Upper bound: replayed bytes never exceed the capture size (prefixes dropped, translation shrinks)
+    SIM_CYCLES = os.path.getsize(REPLAY_FILE) + RESET_CYCLES + 20
+if GAP_MODEL:
+    # Random idle cycles: no bound up front. The monitors (helpers/recorder.py monitor_cycles())
+    # run until the testbench ends, 20 drain cycles after the last gapped chunk
+    SIM_CYCLES = None
+if TRIAGE_SLICE:
+    # Exact: the slice is the whole injected stream. Read from the slice's JSON
+    # sidecar (triage_helper.triage_meta_path()) rather than unpickling it here
+    with open(os.path.splitext(TRIAGE_SLICE)[0] + ".json") as _f:
+        SIM_CYCLES = json.load(_f)["cycles"] + RESET_CYCLES + 20
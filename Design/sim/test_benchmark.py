@@ -0,0 +1,97 @@
+# ============================================================
+# test_benchmark.py
+# ============================================================
+#
+# Description: Protocol-level benchmark of the parser (test_wrapper toplevel).
+#              Injects one (message mix, sequence length) point of the benchmark
+#              matrix, records parser outputs and writes benchmark.json with
+#              per-type latency, sustained throughput, simulation speed and
+#              peak RSS. Driven over the whole matrix by run_benchmark.py.
+# Author: RZ
+# Start Date: 20261018
+# Version: 0.4
+#
+# Changelog
+# ============================================================
+# [20261018-1] RZ: Initial benchmark point testbench with JSON record.
+# [20261018-2] RZ: order_flow mix from the stateful order-flow generator.
+# [20261018-3] RZ: Simulator name in the record.
+# [20261018-4] RZ: Type-mix workloads take WORKLOAD_SEED too.
+# ============================================================
+
+
+import itertools
+import time
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotb.utils import get_sim_time
+
+from helpers.reset_helper import reset_dut
+from helpers.msg_sequence_helper import generate_msg_sequence
+from helpers.full_workload_helper import run_full_payload_workload
+from helpers.order_flow_helper import iter_order_flow_workload
+from helpers.recorder_parser import record_parser_outputs, get_recorded_columns
+from helpers.stimulus_file_helper import open_stimulus_file, write_stimulus_chunk, run_file_stimulus
+from helpers.gap_model_helper import new_gap_state, apply_gap_model
+from helpers.benchmark_helper import build_benchmark_record, format_benchmark_record, write_benchmark_record
+from sim_config import SIM_CLK_PERIOD_NS, RESET_CYCLES, FILE_STIMULUS, STIMULUS_FILE
+from sim_config import BENCH_MIXES, BENCH_MIX, BENCH_LENGTH, GAP_MODEL, GAP_SCOPE, GAP_PARAMS, GAP_SEED
+from sim_config import ORDER_FLOW_PARAMS, WORKLOAD_SEED
+
+
+@cocotb.test()
+async def test_benchmark_point(dut):
+    dut._log.info(f"Benchmark point: mix {BENCH_MIX}, {BENCH_LENGTH} messages")
+
+    cocotb.start_soon(Clock(dut.clk, SIM_CLK_PERIOD_NS, units="ns").start())
+
+    if not FILE_STIMULUS:
+        dut.valid_in.value = 0
+        dut.byte_in.value = 0
+
+    await reset_dut(dut)
+
+    # Workload generation is not part of the measured span
+    if BENCH_MIX == "order_flow":
+        workload = next(iter_order_flow_workload(BENCH_LENGTH, ORDER_FLOW_PARAMS, chunk_messages=BENCH_LENGTH,
+                                                 seed=WORKLOAD_SEED))
+    else:
+        workload = run_full_payload_workload(generate_msg_sequence(BENCH_LENGTH, BENCH_MIXES[BENCH_MIX]),
+                                             seed=WORKLOAD_SEED)
+    gaps = new_gap_state(GAP_MODEL, GAP_PARAMS, GAP_SCOPE, seed=GAP_SEED)
+    chunk = apply_gap_model(gaps, workload)
+    full_stream = chunk["full_stream"]
+    valid_mask = chunk["valid_mask"]
+
+    cocotb.start_soon(record_parser_outputs(dut, total_cycles=len(full_stream) + RESET_CYCLES + 20))
+
+    start_ns = get_sim_time('ns')
+    start_wall = time.perf_counter()
+
+    if FILE_STIMULUS:
+        with open_stimulus_file(STIMULUS_FILE) as stimulus:
+            write_stimulus_chunk(stimulus, full_stream, valid_mask)
+        await run_file_stimulus(dut, timeout_cycles=len(full_stream) + 1)
+    else:
+        for byte, valid in zip(full_stream, valid_mask or itertools.repeat(1)):
+            dut.valid_in.value = valid
+            dut.byte_in.value = byte
+            await RisingEdge(dut.clk)
+        dut.valid_in.value = 0
+
+    for _ in range(20):
+        await RisingEdge(dut.clk)
+
+    wall_s = time.perf_counter() - start_wall
+    sim_cycles = int((get_sim_time('ns') - start_ns) // SIM_CLK_PERIOD_NS)
+
+    record = build_benchmark_record(BENCH_MIX, chunk["injection_schedule"], get_recorded_columns(),
+                                    gaps["bytes"], gaps["cycles"], sim_cycles, wall_s)
+    record["length"] = BENCH_LENGTH
+    record["gap_model"] = GAP_MODEL
+    record["file_stimulus"] = FILE_STIMULUS
+    record["simulator"] = cocotb.SIM_NAME
+    dut._log.info(format_benchmark_record(record))
+    write_benchmark_record(record, "benchmark.json")
@@ -7,7 +7,7 @@
 #              Outputs cycle-aligned logs and expected CSV events for validation.
 # Author: RZ
 # Start Date: 20250504
-# Version: 0.6
+# Version: 0.27
 #
 # Changelog
 # ============================================================
@@ -17,19 +17,57 @@
 # [20250505-1] RZ: Refactored code for modularity and clarity.
 # [20250505-2] RZ: Improved logging and error handling.
 # [20250507-1] RZ: Added detailed comments and documentation for clarity.
+# [20261018-1] RZ: Optional expected events from the cycle-accurate reference model.
+# [20261018-2] RZ: Optional chunked workload injection (STREAM_CHUNK_MESSAGES).
+# [20261018-3] RZ: Scoreboard on raw recorder columns; log the full mismatch report.
+# [20261018-4] RZ: Optional online scoreboard (ONLINE_SCOREBOARD) checking outputs while running.
+# [20261018-5] RZ: Save the mismatch report as JSON for the sharded regression runner.
+# [20261018-6] RZ: Optional file-backed stimulus (FILE_STIMULUS) instead of per-byte writes.
+# [20261018-7] RZ: valid_in gap models (GAP_MODEL) and per-run throughput report.
+# [20261018-8] RZ: Opt-in phase profiling (TB_PROFILE) with cProfile/tracemalloc report.
+# [20261018-9] RZ: Seeded workloads (WORKLOAD_SEED) and on-disk workload cache (WORKLOAD_CACHE).
+# [20261018-10] RZ: Log and report the k-gram transition coverage of MSG_SEQUENCE.
+# [20261018-11] RZ: Stateful order-flow workload (ORDER_FLOW_MESSAGES).
+# [20261018-12] RZ: Headless by default; windowed/triggered waveform capture (WAVE_WINDOW, WAVE_TRIGGER).
+# [20261018-13] RZ: Replay a failure-window slice (TRIAGE_SLICE) for run_triage.py.
+# [20261018-14] RZ: Streamed recorded/expected logs (RECORD_STREAM=csv|bin) written while simulating.
+# [20261018-15] RZ: Explicit report headers (empty runs); dropped unused compare imports.
+# [20261018-16] RZ: Expected events kept as per-chunk integer columns, not row dicts.
+# [20261018-17] RZ: Columnar expected events from the workload cache; streamed expected log takes columns.
+# [20261018-18] RZ: RECORD_STREAM runs compare the streamed logs window by window instead of reading them back.
+# [20261018-19] RZ: Reference-model expected events taken as columns.
+# [20261018-20] RZ: Gapped runs: monitors run until the test ends; file stimulus timeout from the injected cycle count.
+# [20261018-21] RZ: Report tail (throughput, coverage, waves, order book, profile, assert) shared via report_helper.finish_testbench_report().
 # ============================================================
 
 
+import itertools
+
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge
 from cocotb.utils import get_sim_time
 
 from helpers.reset_helper import reset_dut
-from helpers.recorder import record_all_internal_valids, get_recorded_log
-from helpers.full_workload_helper import run_full_payload_workload
-from helpers.compare_helper import compare_against_expected, generate_expected_events_with_fields, generate_expected_events_from_schedule
-from sim_config import SIM_CLK_PERIOD_NS, MSG_SEQUENCE, SIM_CYCLES, RESET_CYCLES
+from helpers.recorder import record_all_internal_valids, get_recorded_log, get_recorded_columns, finish_recorded_log
+from helpers.full_workload_helper import run_full_payload_workload, iter_payload_workload
+from helpers.compare_helper import build_mismatch_report, build_windowed_mismatch_report, expected_to_columns, concat_expected_columns, valid_headers, generate_expected_events_from_schedule
+from helpers.reference_model import generate_expected_events_from_model, new_reference_model
+from helpers.scoreboard_helper import new_online_scoreboard, push_expected, run_online_scoreboard, finish_online_scoreboard
+from helpers.stimulus_file_helper import open_stimulus_file, write_stimulus_chunk, run_file_stimulus
+from helpers.gap_model_helper import new_gap_state, apply_gap_model
+from helpers.workload_cache_helper import iter_cached_workload
+from helpers.order_flow_helper import iter_order_flow_workload
+from helpers.msg_sequence_helper import transition_coverage, format_transition_coverage
+from helpers.profile_helper import start_profiling, phase
+from helpers.wave_helper import start_wave_capture
+from helpers.triage_helper import load_triage_slice
+from helpers.log_writer_helper import open_log_writer, submit_expected_columns, close_log_writer, iter_log_columns, iter_expected_columns, write_log_columns
+from helpers.report_helper import finish_testbench_report
+from sim_config import SIM_CLK_PERIOD_NS, MSG_SEQUENCE, SIM_CYCLES, RESET_CYCLES, USE_REFERENCE_MODEL, STREAM_CHUNK_MESSAGES, ONLINE_SCOREBOARD
+from sim_config import FILE_STIMULUS, STIMULUS_FILE, GAP_MODEL, GAP_SCOPE, GAP_PARAMS, GAP_SEED
+from sim_config import WORKLOAD_SEED, WORKLOAD_CACHE, TRANSITION_K, ORDER_FLOW_MESSAGES, ORDER_FLOW_PARAMS
+from sim_config import WAVE_TRIGGER, WAVE_POST_CYCLES, TRIAGE_SLICE, RECORD_STREAM
 from ITCH_config import MSG_LENGTHS, SIM_HEADERS
 import csv
 
@@ -38,6 +76,10 @@ import csv
 @cocotb.test()
 async def test_full_permutations(dut):
     dut._log.info("Starting full workload test")
+    coverage = None if ORDER_FLOW_MESSAGES or TRIAGE_SLICE else transition_coverage(MSG_SEQUENCE, max(TRANSITION_K, 2))
+    if coverage:
+        dut._log.info(format_transition_coverage(coverage))
+    start_profiling()
 
     # Start the clock
     cocotb.start_soon(Clock(dut.clk, SIM_CLK_PERIOD_NS, units="ns").start())
@@ -45,46 +87,122 @@ async def test_full_permutations(dut):
     # Reset DUT
     await reset_dut(dut)
 
-    # Generate message stream and expected outputs (includes parsed fields)
-    result = run_full_payload_workload(MSG_SEQUENCE)
-    full_stream = result["full_stream"]
-    injection_schedule = result["injection_schedule"]
-    expected_events = generate_expected_events_from_schedule(injection_schedule)
-
-
-    # Start recording before any injection
-    cocotb.start_soon(record_all_internal_valids(dut, total_cycles=SIM_CYCLES))
-
-    # Inject full byte stream serially
-    for byte in full_stream:
-        dut.valid_in.value = 1
-        dut.byte_in.value = byte
-        await RisingEdge(dut.clk)
-    dut.valid_in.value = 0
+    # Generate message stream: whole workload, or lazily in chunks for long soak runs
+    if TRIAGE_SLICE:
+        # Failure window of an earlier run, with its own expected events (run_triage.py)
+        workload = [load_triage_slice(TRIAGE_SLICE)]
+    elif ORDER_FLOW_MESSAGES:
+        # Production-like flow: cancels, deletes, replaces and executions reference live orders
+        workload = iter_order_flow_workload(ORDER_FLOW_MESSAGES, ORDER_FLOW_PARAMS,
+                                            chunk_messages=STREAM_CHUNK_MESSAGES or 4096, seed=WORKLOAD_SEED)
+    elif WORKLOAD_CACHE:
+        # Ungapped schedule-derived expected events come back columnar with the cached workload
+        cached_events = "integrated" if GAP_MODEL is None and not USE_REFERENCE_MODEL else None
+        workload = iter_cached_workload(MSG_SEQUENCE, WORKLOAD_SEED, STREAM_CHUNK_MESSAGES, events=cached_events)
+    elif STREAM_CHUNK_MESSAGES:
+        workload = iter_payload_workload(MSG_SEQUENCE, chunk_messages=STREAM_CHUNK_MESSAGES, seed=WORKLOAD_SEED)
+    else:
+        workload = [run_full_payload_workload(MSG_SEQUENCE, seed=WORKLOAD_SEED)]
+    model = new_reference_model()
+    expected_parts = []  # Per-chunk expected columns (compare_helper.expected_to_columns()), unless streamed
+
+
+    # Streaming mode: rows go to disk in batches while the simulation runs, and
+    # are checked from there window by window (neither log is held in memory)
+    recorded_path = f"recorded_log.{RECORD_STREAM}" if RECORD_STREAM else None
+    expected_path = "expected_events.csv"
+    expected_sink = open_log_writer(expected_path, SIM_HEADERS, flags=valid_headers(SIM_HEADERS)) \
+        if RECORD_STREAM and not ONLINE_SCOREBOARD else None
+
+    # Start recording (or online checking) before any injection
+    if ONLINE_SCOREBOARD:
+        scoreboard = new_online_scoreboard()
+        cocotb.start_soon(run_online_scoreboard(dut, scoreboard, total_cycles=SIM_CYCLES,
+                                                grace_cycles=WAVE_POST_CYCLES if WAVE_TRIGGER else 0))
+    else:
+        cocotb.start_soon(record_all_internal_valids(dut, total_cycles=SIM_CYCLES, stream_path=recorded_path))
+    waves = start_wave_capture(dut, scoreboard if ONLINE_SCOREBOARD else None)
+
+    # Gaps inside messages abort them and disturb decoder resync: only the model predicts that
+    gaps = new_gap_state(GAP_MODEL, GAP_PARAMS, GAP_SCOPE, seed=GAP_SEED)
+    use_model = USE_REFERENCE_MODEL or (GAP_MODEL is not None and GAP_SCOPE == "byte")
+
+    # File mode: the workload is written out and clocked in by rtl/stream_stimulus.v
+    if FILE_STIMULUS:
+        stimulus = open_stimulus_file(STIMULUS_FILE)
+
+    for chunk in workload:
+        chunk = apply_gap_model(gaps, chunk)
+        full_stream = chunk["full_stream"]
+        valid_mask = chunk["valid_mask"]
+        injection_schedule = chunk["injection_schedule"]
+
+        # Expected outputs (includes parsed fields) for this part of the stream
+        if "expected_events" in chunk:
+            chunk_events = chunk["expected_events"]
+        elif use_model:
+            chunk_events = generate_expected_events_from_model(full_stream, valid_mask, model=model, columns=True)
+        else:
+            chunk_events = generate_expected_events_from_schedule(injection_schedule)
+        if ONLINE_SCOREBOARD:
+            push_expected(scoreboard, chunk_events)
+        else:
+            chunk_columns = expected_to_columns(chunk_events, SIM_HEADERS)
+            if expected_sink is not None:
+                submit_expected_columns(expected_sink, chunk_columns)
+            else:
+                expected_parts.append(chunk_columns)
+
+        if FILE_STIMULUS:
+            write_stimulus_chunk(stimulus, full_stream, valid_mask)
+            continue
+
+        # Inject byte stream serially
+        with phase("injection", "wall"):
+            for byte, valid in zip(full_stream, valid_mask or itertools.repeat(1)):
+                dut.valid_in.value = valid
+                dut.byte_in.value = byte
+                await RisingEdge(dut.clk)
+
+    if FILE_STIMULUS:
+        stimulus.close()
+        with phase("injection", "wall"):
+            await run_file_stimulus(dut, timeout_cycles=gaps["cycles"] + 1)
+    else:
+        dut.valid_in.value = 0
 
     # Let the system run a bit after last injection
     for _ in range(20):
         await RisingEdge(dut.clk)
 
-    # Retrieve and compare recorded results
-    recorded_log = get_recorded_log()
-
-
-
-    # Write recorded log to CSV
-    with open("recorded_log.csv", "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=SIM_HEADERS)
-        writer.writeheader()
-        for cycle in sorted(recorded_log):
-            row = {"cycle": cycle}
-            row.update(recorded_log[cycle])
-            writer.writerow(row)
-
-    # Write expected events to CSV
-    with open("expected_events.csv", "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=SIM_HEADERS)
-        writer.writeheader()
-        for event in expected_events:
-            writer.writerow(event)
-
-    compare_against_expected(recorded_log, expected_events)
+    # Online mode has already checked every cycle (only unreached events remain);
+    # otherwise retrieve and compare the recorded results
+    if ONLINE_SCOREBOARD:
+        report = finish_online_scoreboard(scoreboard)
+    elif RECORD_STREAM:
+        # Logs are already on disk: wait for the writer threads, then compare them batch by batch
+        with phase("csv_write"):
+            finish_recorded_log()
+            close_log_writer(expected_sink)
+        report = build_windowed_mismatch_report(iter_log_columns(recorded_path), iter_expected_columns(expected_path),
+                                                SIM_HEADERS)
+    else:
+        expected_columns = concat_expected_columns(expected_parts, SIM_HEADERS)
+        with phase("csv_write"):
+            recorded_log = get_recorded_log()
+
+            # Write recorded log to CSV
+            with open("recorded_log.csv", "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=SIM_HEADERS)
+                writer.writeheader()
+                for cycle in sorted(recorded_log):
+                    row = {"cycle": cycle}
+                    row.update(recorded_log[cycle])
+                    writer.writerow(row)
+
+            # Write expected events to CSV
+            write_log_columns(expected_path, SIM_HEADERS, expected_columns, flags=valid_headers(SIM_HEADERS))
+        recorded_columns = get_recorded_columns()
+        report = build_mismatch_report(recorded_columns, expected_columns, headers=SIM_HEADERS)
+
+    finish_testbench_report(dut, report, gaps, coverage, waves, "mismatch_report.json", "profile_report.json")